@@ -0,0 +1,117 @@
+import random
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List
+
+# Vocabulaire des titres synthétiques : sujets, formats et accroches courants sur YouTube FR
+SUBJECTS = [
+    'cuisine', 'recette', 'gâteau', 'pâtisserie', 'voyage', 'japon', 'maroc', 'vanlife',
+    'finance', 'bourse', 'immobilier', 'crypto', 'budget', 'épargne', 'fitness', 'musculation',
+    'course', 'yoga', 'nutrition', 'jardinage', 'bricolage', 'rénovation', 'décoration',
+    'programmation', 'python', 'javascript', 'intelligence', 'artificielle', 'smartphone',
+    'ordinateur', 'montage', 'photographie', 'gaming', 'minecraft', 'football', 'histoire',
+    'science', 'astronomie', 'écologie', 'maquillage', 'mode', 'parentalité', 'productivité',
+    'méditation', 'lecture', 'cinéma', 'musique', 'guitare', 'piano', 'voiture', 'vélo'
+]
+ADJECTIVES = [
+    'facile', 'rapide', 'incroyable', 'ultime', 'complet', 'secret', 'simple', 'parfait',
+    'meilleur', 'nouveau', 'gratuit', 'pratique', 'efficace', 'étonnant', 'économique'
+]
+TEMPLATES = [
+    "Comment réussir {subject} {adjective} en {number} minutes",
+    "{number} astuces {adjective}s pour la {subject}",
+    "Pourquoi la {subject} est {adjective} ?",
+    "J'ai testé la {subject} pendant {number} jours",
+    "Le guide {adjective} de la {subject} [{year}]",
+    "{subject} : les erreurs à éviter",
+    "Ma routine {subject} {adjective} 🔥",
+    "TOUT SAVOIR SUR LA {subject_upper}",
+    "{subject} et {other} : le comparatif {adjective}",
+    "Qui gagne ? {subject} vs {other}",
+    "Tutoriel {subject} pour débutants (partie {number})",
+    "Où commencer avec la {subject} en {year}",
+]
+DESCRIPTION_SENTENCES = [
+    "Dans cette vidéo, on parle de {subject} et de {other}.",
+    "Abonnez-vous pour ne rien manquer des prochaines vidéos sur la {subject}.",
+    "Tous les liens sont dans la description, n'hésitez pas à commenter.",
+    "Merci à notre partenaire pour le soutien de la chaîne.",
+    "Chapitres : introduction, conseils {adjective}s, conclusion.",
+]
+
+
+def generate_title(rng: random.Random, subject: str) -> str:
+    template = rng.choice(TEMPLATES)
+    return template.format(
+        subject=subject,
+        subject_upper=subject.upper(),
+        other=rng.choice(SUBJECTS),
+        adjective=rng.choice(ADJECTIVES),
+        number=rng.randint(2, 30),
+        year=rng.randint(2019, 2025)
+    )
+
+
+def generate_videos(size: int, seed: int = 42, videos_per_channel: int = 250) -> List[Dict]:
+    """Corpus reproductible de `size` vidéos réparties sur plusieurs chaînes.
+
+    Les vues suivent une loi log-normale propre à chaque chaîne (quelques
+    vidéos virales, beaucoup de vidéos modestes), les likes et commentaires
+    sont une fraction bruitée des vues, et les publications sont espacées de
+    quelques jours. Chaque chaîne a ses sujets de prédilection, ce qui donne
+    aux content gaps des écarts réalistes entre chaînes.
+    """
+    rng = random.Random(seed)
+    channels = max(1, size // videos_per_channel)
+    start = datetime(2020, 1, 1, tzinfo=timezone.utc)
+    profiles = []
+    for index in range(channels):
+        profiles.append({
+            'channel_id': f'UC{seed:04d}{index:018d}',
+            'subjects': rng.sample(SUBJECTS, 6),
+            'median_views': rng.lognormvariate(9, 1.2),
+            'like_rate': rng.uniform(0.01, 0.06),
+            'comment_rate': rng.uniform(0.001, 0.01),
+            'published_at': start + timedelta(days=rng.randint(0, 365)),
+            'interval_days': rng.uniform(1, 10)
+        })
+
+    videos = []
+    for index in range(size):
+        profile = profiles[index % channels]
+        subject = rng.choice(profile['subjects']) if rng.random() < 0.8 else rng.choice(SUBJECTS)
+        views = int(profile['median_views'] * rng.lognormvariate(0, 1.0))
+        profile['published_at'] += timedelta(
+            days=rng.expovariate(1 / profile['interval_days']),
+            hours=rng.randint(0, 23)
+        )
+        description = ' '.join(
+            sentence.format(subject=subject, other=rng.choice(SUBJECTS), adjective=rng.choice(ADJECTIVES))
+            for sentence in rng.sample(DESCRIPTION_SENTENCES, 3)
+        )
+        videos.append({
+            'id': f'vid{seed:04d}{index:09d}',
+            'video_id': f'vid{seed:04d}{index:09d}',
+            'channel_id': profile['channel_id'],
+            'title': generate_title(rng, subject),
+            'description': description,
+            'published_at': profile['published_at'].isoformat().replace('+00:00', 'Z'),
+            'view_count': views,
+            'like_count': int(views * profile['like_rate'] * rng.uniform(0.5, 1.5)),
+            'comment_count': int(views * profile['comment_rate'] * rng.uniform(0.5, 1.5)),
+            'keywords': [subject] + rng.sample(ADJECTIVES, 1)
+        })
+    return videos
+
+
+def generate_statistics(videos: List[Dict], fraction: float = 0.1, seed: int = 42) -> Dict[str, Dict]:
+    """Rafraîchissement de statistiques pour une fraction des vidéos (vues en hausse)."""
+    rng = random.Random(seed + 1)
+    refreshed = rng.sample(videos, max(1, int(len(videos) * fraction)))
+    return {
+        video['video_id']: {
+            'view_count': int(video['view_count'] * rng.uniform(1.0, 1.3)),
+            'like_count': int(video['like_count'] * rng.uniform(1.0, 1.2)),
+            'comment_count': int(video['comment_count'] * rng.uniform(1.0, 1.1))
+        }
+        for video in refreshed
+    }
@@ -0,0 +1,212 @@
+"""Micro-benchmarks des chemins chauds de l'analyse.
+
+Exemples :
+    python -m benchmarks.run                                  # 1k, 10k et 100k vidéos
+    python -m benchmarks.run --sizes 1000 10000 --save-baseline
+    python -m benchmarks.run --sizes 1000 10000 --check --threshold 0.2
+
+Tout s'exécute hors ligne : le modèle spaCy est désactivé (méthode de repli)
+sauf si --spacy-model est fourni, et le stockage utilisé est le backend en
+mémoire.
+"""
+import argparse
+import gc
+import json
+import logging
+import os
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+
+DEFAULT_SIZES = [1000, 10000, 100000]
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), 'baselines', 'baseline.json')
+
+
+def configure_environment(spacy_model: str):
+    """À appeler avant tout import de src : SPACY_MODEL est lu à l'import de text_processor."""
+    os.environ['SPACY_MODEL'] = spacy_model
+
+
+def measure(run: Callable, setup: Optional[Callable], repeat: int) -> Dict:
+    """Durées de `repeat` exécutions de run(setup()), la préparation n'étant pas chronométrée."""
+    durations = []
+    for _ in range(repeat):
+        argument = setup() if setup else None
+        gc.collect()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            run(argument)
+            durations.append(time.perf_counter() - start)
+        finally:
+            gc.enable()
+    return {
+        'median_s': statistics.median(durations),
+        'min_s': min(durations),
+        'max_s': max(durations),
+        'runs': repeat
+    }
+
+
+def build_stages(videos: List[Dict], seed: int) -> List[Tuple[str, Callable, Optional[Callable]]]:
+    """Étapes mesurées : (nom, fonction chronométrée, préparation non chronométrée)."""
+    from benchmarks.corpus import generate_statistics
+    from src.analyzers.content_analyzer import ContentAnalyzer
+    from src.services.memory_storage_service import InMemoryStorageService
+    from src.utils import text_processor
+
+    analyzer = ContentAnalyzer()
+    titles = [video['title'] for video in videos]
+    channel_id = videos[0]['channel_id']
+    statistics_update = generate_statistics(videos, seed=seed)
+
+    def cold_cache(make: Optional[Callable] = None) -> Callable:
+        # Cache de mots-clés vidé : chaque titre repasse par l'extraction
+        def setup():
+            value = make() if make else None
+            text_processor._keyword_cache.clear()
+            return value
+        return setup
+
+    def warm_cache():
+        text_processor.extract_keywords_batch(titles)
+
+    def dataframe():
+        return analyzer._prepare_dataframe(videos)
+
+    def index():
+        storage = InMemoryStorageService(snapshot_path='')
+        storage.bulk_index_videos(videos)
+        return storage
+
+    # Index partagé par les étapes en lecture seule ; les étapes qui le modifient ont le leur
+    indexed = index()
+
+    return [
+        ('analyzer.prepare_dataframe', lambda _: analyzer._prepare_dataframe(videos), None),
+        ('analyzer.performance', analyzer._analyze_performance, dataframe),
+        ('analyzer.content_patterns', analyzer._analyze_content_patterns, cold_cache(dataframe)),
+        ('analyzer.temporal_patterns', analyzer._analyze_temporal_patterns, dataframe),
+        ('analyzer.engagement', analyzer._analyze_engagement, dataframe),
+        ('analyzer.video_features', analyzer._compute_video_features, cold_cache(dataframe)),
+        ('analyzer.channel_and_videos', lambda _: analyzer.analyze_channel_and_videos(videos), cold_cache()),
+        ('keywords.extract_single', lambda _: [text_processor.extract_keywords(title) for title in titles],
+         cold_cache()),
+        ('keywords.extract_batch', lambda _: text_processor.extract_keywords_batch(titles), cold_cache()),
+        ('keywords.extract_batch_cached', lambda _: text_processor.extract_keywords_batch(titles), warm_cache),
+        ('keywords.count', lambda _: text_processor.count_keywords(titles), cold_cache()),
+        ('storage.bulk_index', lambda storage: storage.bulk_index_videos(videos),
+         lambda: InMemoryStorageService(snapshot_path='')),
+        ('storage.update_statistics', lambda storage: storage.update_video_statistics(statistics_update), index),
+        ('storage.find_content_gaps', lambda _: indexed.find_content_gaps(channel_id), None),
+        ('storage.search_by_topic', lambda _: indexed.search_videos_by_topic('recette facile', size=20), None),
+        ('storage.channel_videos', lambda _: indexed.get_channel_videos(channel_id, size=50), None),
+        ('storage.channel_summary', lambda _: indexed.get_channel_summary(channel_id), None),
+    ]
+
+
+def run_benchmarks(sizes: List[int], repeat: int, seed: int, only: Optional[List[str]] = None) -> Dict:
+    from benchmarks.corpus import generate_videos
+
+    results: Dict[str, Dict[str, Dict]] = {}
+    for size in sizes:
+        videos = generate_videos(size, seed=seed)
+        results[str(size)] = {}
+        for name, run, setup in build_stages(videos, seed):
+            if only and not any(name.startswith(prefix) for prefix in only):
+                continue
+            results[str(size)][name] = measure(run, setup, repeat)
+            print(f"  {size:>7} {name:<32} {results[str(size)][name]['median_s'] * 1000:>10.2f} ms", flush=True)
+    return results
+
+
+def compare(results: Dict, baseline: Dict, threshold: float, min_delta: float) -> List[Dict]:
+    """Étapes plus lentes que la référence de plus de `threshold` (et d'au moins `min_delta` secondes)."""
+    regressions = []
+    for size, stages in results.items():
+        for name, current in stages.items():
+            reference = baseline.get('results', {}).get(size, {}).get(name)
+            if reference is None:
+                continue
+            delta = current['median_s'] - reference['median_s']
+            ratio = current['median_s'] / reference['median_s'] if reference['median_s'] else float('inf')
+            if ratio > 1 + threshold and delta > min_delta:
+                regressions.append({
+                    'size': size,
+                    'stage': name,
+                    'baseline_s': reference['median_s'],
+                    'current_s': current['median_s'],
+                    'ratio': ratio
+                })
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Micro-benchmarks de l'analyse de chaînes (hors ligne)")
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES,
+                        help="Tailles des corpus synthétiques (nombre de vidéos)")
+    parser.add_argument('--repeat', type=int, default=5, help="Exécutions par étape (la médiane est retenue)")
+    parser.add_argument('--seed', type=int, default=42, help="Graine des corpus synthétiques")
+    parser.add_argument('--only', nargs='+', help="Préfixes des étapes à mesurer (ex: analyzer. storage.)")
+    parser.add_argument('--output', help="Fichier JSON où écrire les résultats")
+    parser.add_argument('--save-baseline', nargs='?', const=DEFAULT_BASELINE, metavar='PATH',
+                        help="Enregistre les résultats comme référence")
+    parser.add_argument('--check', nargs='?', const=DEFAULT_BASELINE, metavar='PATH',
+                        help="Compare à la référence et échoue en cas de régression")
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help="Ralentissement relatif toléré avant échec (0.2 = +20 %%)")
+    parser.add_argument('--min-delta', type=float, default=0.005,
+                        help="Écart absolu minimal, en secondes, pour signaler une régression")
+    parser.add_argument('--spacy-model', default='',
+                        help="Modèle spaCy à utiliser (vide par défaut : méthode de repli, hors ligne)")
+    args = parser.parse_args(argv)
+    if args.save_baseline and args.check:
+        # La référence serait écrasée par les résultats avant d'être comparée
+        parser.error("--save-baseline et --check ne peuvent pas être utilisés ensemble")
+
+    configure_environment(args.spacy_model)
+    logging.basicConfig(level=logging.ERROR)
+
+    print(f"Benchmarks (graine {args.seed}, {args.repeat} exécutions par étape)")
+    report = {
+        'meta': {
+            'created_at': datetime.now(timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'seed': args.seed,
+            'repeat': args.repeat,
+            'spacy_model': args.spacy_model or None
+        },
+        'results': run_benchmarks(args.sizes, args.repeat, args.seed, args.only)
+    }
+
+    for path in filter(None, [args.output, args.save_baseline]):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"Résultats enregistrés dans {path}")
+
+    if args.check:
+        with open(args.check, encoding='utf-8') as f:
+            baseline = json.load(f)
+        if {key: baseline['meta'].get(key) for key in ('seed', 'spacy_model')} != \
+                {key: report['meta'][key] for key in ('seed', 'spacy_model')}:
+            print("Attention : la référence a été mesurée avec une autre graine ou un autre modèle spaCy")
+        regressions = compare(report['results'], baseline, args.threshold, args.min_delta)
+        for regression in regressions:
+            print(
+                f"RÉGRESSION {regression['size']:>7} {regression['stage']:<32} "
+                f"{regression['baseline_s'] * 1000:.2f} ms -> {regression['current_s'] * 1000:.2f} ms "
+                f"(x{regression['ratio']:.2f})"
+            )
+        if regressions:
+            return 1
+        print(f"Aucune régression au-delà de +{args.threshold:.0%}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
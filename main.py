@@ -1,21 +1,67 @@
 from fastapi import FastAPI, Request, HTTPException
+from fastapi.responses import Response, StreamingResponse
 from fastapi.templating import Jinja2Templates
 from fastapi.staticfiles import StaticFiles
-from src.scrapers.youtube_scraper import YouTubeScraper
-from src.analyzers.content_analyzer import ContentAnalyzer
+from starlette.routing import Match
 from pathlib import Path
 import uvicorn
-from src.services.elasticsearch_service import ElasticsearchService
-from src.services.ai_service import AIService
+from src.scrapers.quota_scheduler import BACKGROUND, QuotaExhausted, get_scheduler, priority_lane
+from src.services.analysis_cache import STALE, CachedAnalysis
+from src.services.job_queue import Job, JobQueue, JobQueueFull
+from src.services.service_pool import ServicePool, ServiceUnavailable
+from src.utils import metrics
+import asyncio
+import base64
+import binascii
+import json
 import logging
+import os
 import re
+import time
+from contextlib import asynccontextmanager
 from urllib.parse import unquote
+from typing import Any, AsyncIterator, Awaitable, Dict, List, Optional, Tuple, TypeVar
+from pydantic import BaseModel
 
 # Configuration du logging
 logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="Content Gap Finder")
+T = TypeVar('T')
+
+# Nombre de vidéos existantes renvoyées par page de /api/analyze-topic
+TOPIC_PAGE_SIZE = 5
+
+# Nombre maximal de chaînes par comparaison
+MAX_COMPARED_CHANNELS = int(os.getenv('COMPETITOR_MAX_CHANNELS', 25))
+
+# Intervalle de vérification de la connexion du client pendant les appels longs
+DISCONNECT_POLL_INTERVAL = float(os.getenv('DISCONNECT_POLL_INTERVAL', 0.5))
+
+# L'en-tête Server-Timing détaille les durées internes : désactivable si l'API est exposée publiquement
+SERVER_TIMING_ENABLED = os.getenv('SERVER_TIMING_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+
+CACHE_HIT_RATIO = metrics.registry.gauge('cache_hit_ratio', "Part des lectures servies par le cache", ('cache',))
+CACHE_LOOKUPS = metrics.registry.gauge('cache_lookups', "Lectures du cache depuis le démarrage", ('cache', 'result'))
+CACHE_ENTRIES = metrics.registry.gauge('cache_entries', "Entrées présentes dans le cache", ('cache',))
+QUOTA_REMAINING = metrics.registry.gauge(
+    'youtube_quota_remaining_units', "Unités de quota YouTube disponibles par clé", ('key',)
+)
+JOBS = metrics.registry.gauge('jobs', "Tâches d'analyse en arrière-plan par état", ('state',))
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Les services sont partagés par toutes les requêtes
+    app.state.services = ServicePool()
+    await app.state.services.startup()
+    # Analyses exécutées en arrière-plan par un nombre borné de workers
+    app.state.jobs = JobQueue(run_analysis_job)
+    app.state.jobs.start()
+    yield
+    await app.state.jobs.stop()
+    await app.state.services.shutdown()
+
+app = FastAPI(title="Content Gap Finder", lifespan=lifespan)
 
 # Configuration des dossiers statiques et templates
 app.mount("/static", StaticFiles(directory="static", html=True), name="static")
@@ -30,10 +76,41 @@ async def add_no_cache_headers(request: Request, call_next):
         response.headers["Expires"] = "0"
     return response
 
+def route_template(request: Request) -> str:
+    """Chemin déclaré de la route (ex: /api/jobs/{job_id}), pour borner le nombre de séries."""
+    for route in request.app.routes:
+        match, _ = route.matches(request.scope)
+        if match == Match.FULL:
+            return route.path
+    return 'unmatched'
+
+@app.middleware("http")
+async def record_request_timings(request: Request, call_next):
+    """Mesure chaque requête et détaille ses durées par composant dans l'en-tête Server-Timing.
+
+    Pour les réponses en streaming, seules les opérations terminées avant
+    l'envoi des en-têtes y figurent.
+    """
+    token = metrics.start_request_timing()
+    start = time.perf_counter()
+    try:
+        response = await call_next(request)
+    finally:
+        timings = metrics.finish_request_timing(token)
+    total = time.perf_counter() - start
+
+    if metrics.METRICS_ENABLED:
+        metrics.HTTP_REQUEST_DURATION.observe(
+            total, method=request.method, route=route_template(request), status=str(response.status_code)
+        )
+    if SERVER_TIMING_ENABLED:
+        response.headers['Server-Timing'] = metrics.server_timing_header(timings, total)
+    return response
+
 templates = Jinja2Templates(directory="templates")
 
-def extract_channel_id(url: str) -> str:
-    """Extrait l'ID de la chaîne à partir de différents formats d'URL YouTube."""
+def extract_channel_reference(url: str) -> Tuple[str, str]:
+    """Extrait l'identifiant de la chaîne et son type à partir de différents formats d'URL YouTube."""
     # Nettoyage et décodage de l'URL
     url = unquote(url.strip())
     logger.debug(f"URL après nettoyage: {url}")
@@ -51,97 +128,281 @@ def extract_channel_id(url: str) -> str:
         if match:
             result = match.group(1)
             logger.debug(f"Match trouvé ({pattern_type}): {result}")
-            return result
+            return result, pattern_type
 
     logger.error(f"Aucun pattern ne correspond à l'URL: {url}")
     raise ValueError("Format d'URL YouTube non valide")
 
+def extract_channel_id(url: str) -> str:
+    """Extrait l'ID de la chaîne à partir de différents formats d'URL YouTube."""
+    return extract_channel_reference(url)[0]
+
+async def run_until_disconnected(request: Request, awaitable: Awaitable[T]) -> T:
+    """Attend le résultat, en annulant le travail si le client HTTP se déconnecte entre-temps."""
+    task = asyncio.ensure_future(awaitable)
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=DISCONNECT_POLL_INTERVAL)
+            if done:
+                return task.result()
+            if await request.is_disconnected():
+                logger.info(f"Client déconnecté, annulation de {request.url.path}")
+                raise HTTPException(status_code=499, detail="Client déconnecté")
+    finally:
+        if not task.done():
+            task.cancel()
+
 @app.get("/")
 async def home(request: Request):
     return templates.TemplateResponse("index.html", {"request": request})
 
 @app.get("/api/health")
-async def health_check():
-    return {"status": "ok"}
+async def health_check(request: Request):
+    health = await request.app.state.services.health()
+    jobs = getattr(request.app.state, 'jobs', None)
+    if jobs is not None:
+        health['jobs'] = jobs.stats()
+    return health
+
+@app.get("/metrics")
+async def prometheus_metrics(request: Request):
+    """Métriques au format texte de Prometheus : latences par composant, caches, quota et tâches."""
+    services = request.app.state.services
+    caches = await asyncio.to_thread(services.cache_stats)
+    for name, stats in caches.items():
+        CACHE_HIT_RATIO.set(stats.get('hit_rate', 0.0), cache=name)
+        CACHE_LOOKUPS.set(stats.get('hits', 0), cache=name, result='hit')
+        CACHE_LOOKUPS.set(stats.get('misses', 0), cache=name, result='miss')
+        if 'stale_hits' in stats:
+            CACHE_LOOKUPS.set(stats['stale_hits'], cache=name, result='stale')
+        CACHE_ENTRIES.set(stats.get('entries', 0), cache=name)
+
+    for key in get_scheduler().stats()['keys']:
+        QUOTA_REMAINING.set(key['remaining_units'], key=key['key'])
+
+    jobs = getattr(request.app.state, 'jobs', None)
+    if jobs is not None:
+        stats = jobs.stats()
+        for state in ('queued', 'running', 'stored'):
+            JOBS.set(stats[state], state=state)
+
+    return Response(metrics.render_metrics(), media_type='text/plain; version=0.0.4; charset=utf-8')
+
+def parse_channel_url(channel_url: str) -> Tuple[str, str]:
+    """Valide l'URL reçue et retourne l'identifiant de la chaîne et son type."""
+    logger.info(f"URL reçue (brute): {channel_url}")
+
+    if not channel_url:
+        raise ValueError("URL non fournie")
+
+    if "youtube.com" not in channel_url.lower():
+        raise ValueError("L'URL doit être une URL YouTube valide")
+
+    channel_identifier, identifier_type = extract_channel_reference(channel_url)
+    logger.info(f"Identifiant extrait: {channel_identifier} ({identifier_type})")
+    return channel_identifier, identifier_type
+
+async def analyze_channel_stages(services: ServicePool,
+                                 channel_identifier: str,
+                                 identifier_type: str,
+                                 request: Optional[Request] = None) -> AsyncIterator[Tuple[str, Any]]:
+    """Pipeline d'analyse d'une chaîne, produisant chaque section dès qu'elle est prête.
+
+    Les sections sont émises dans l'ordre : channel_info, performance_metrics,
+    temporal_patterns, content_patterns, engagement_analysis, content_gaps,
+    ai_suggestions. Si `request` est fourni, l'appel LLM est annulé quand le
+    client se déconnecte.
+    """
+    scraper = services.scraper
+    analyzer = services.analyzer
+    storage = services.storage
+    ai_service = services.ai_service
+
+    # Récupérer les informations de la chaîne
+    channel_info = await scraper.get_channel_info(channel_identifier, identifier_type)
+    if not channel_info:
+        raise ValueError("Impossible de récupérer les informations de la chaîne")
+    yield 'channel_info', {
+        'title': channel_info.get('title', ''),
+        'subscriber_count': int(channel_info.get('subscriber_count', 0)),
+        'video_count': int(channel_info.get('video_count', 0)),
+        'view_count': int(channel_info.get('view_count', 0))
+    }
+
+    # Synchronisation incrémentale : seules les nouvelles vidéos sont téléchargées
+    videos = await services.sync_service.sync_channel(channel_info['id'], max_results=50)
+
+    # Analyser le contenu de la chaîne et de chaque vidéo en une seule passe.
+    # Le travail CPU et les appels au stockage sont exécutés hors de la boucle
+    # pour ne pas bloquer les requêtes concurrentes (notamment leurs appels LLM).
+    analysis, video_features = await asyncio.to_thread(analyzer.analyze_channel_and_videos, videos)
+    yield 'performance_metrics', analysis.get('performance_metrics', {})
+    yield 'temporal_patterns', analysis.get('temporal_patterns', {
+        'best_days': 'Non déterminé',
+        'best_hours': 0,
+        'posting_frequency': 'Non déterminé'
+    })
+    yield 'content_patterns', analysis.get('content_patterns', {
+        'common_keywords': [],
+        'title_patterns': {},
+        'video_categories': []
+    })
+    yield 'engagement_analysis', analysis.get('engagement_analysis', {
+        'high_engagement_topics': [],
+        'engagement_trend': 'stable'
+    })
+
+    # Indexer les vidéos en une seule requête bulk
+    await asyncio.to_thread(storage.bulk_index_videos, [
+        {
+            **video,
+            'channel_id': channel_info['id'],
+            'engagement_rate': features.get('engagement_rate', 0.0),
+            'keywords': features.get('keywords', []),
+            'analysis': features
+        }
+        for video, features in zip(videos, video_features)
+    ])
+
+    # Trouver les opportunités de contenu
+    content_gaps = await asyncio.to_thread(storage.find_content_gaps, channel_info['id'])
+    yield 'content_gaps', content_gaps or []
+
+    # Générer des suggestions d'IA (annulé si le client abandonne la requête)
+    suggestions = ai_service.generate_content_suggestions(channel_info, content_gaps)
+    if request is not None:
+        ai_suggestions = await run_until_disconnected(request, suggestions)
+    else:
+        ai_suggestions = await suggestions
+    yield 'ai_suggestions', ai_suggestions or []
+
+def build_analysis_response(sections: Dict[str, Any]) -> Dict:
+    """Assemble les sections produites par le pipeline en réponse d'analyse."""
+    return {
+        'channel_info': sections['channel_info'],
+        'analysis': {
+            'performance_metrics': sections['performance_metrics'],
+            'content_patterns': sections['content_patterns'],
+            'temporal_patterns': sections['temporal_patterns'],
+            'engagement_analysis': sections['engagement_analysis']
+        },
+        'content_gaps': sections['content_gaps'],
+        'ai_suggestions': sections['ai_suggestions']
+    }
+
+def response_sections(response: Dict) -> List[Tuple[str, Any]]:
+    """Sections d'une réponse d'analyse, dans l'ordre d'émission du pipeline."""
+    analysis = response['analysis']
+    return [
+        ('channel_info', response['channel_info']),
+        ('performance_metrics', analysis['performance_metrics']),
+        ('temporal_patterns', analysis['temporal_patterns']),
+        ('content_patterns', analysis['content_patterns']),
+        ('engagement_analysis', analysis['engagement_analysis']),
+        ('content_gaps', response['content_gaps']),
+        ('ai_suggestions', response['ai_suggestions'])
+    ]
+
+async def get_cached_analysis(services: ServicePool,
+                              channel_identifier: str,
+                              identifier_type: str) -> Tuple[Optional[CachedAnalysis], Optional[str]]:
+    """Réponse en cache pour la version courante des données de la chaîne, sans appel à l'API YouTube."""
+    cache = services.analysis_cache
+    channel_id = await asyncio.to_thread(services.scraper.resolver.lookup, channel_identifier, identifier_type)
+    if not channel_id:
+        return None, None
+    sync_state = await asyncio.to_thread(services.storage.get_sync_state, channel_id)
+    return cache.get(channel_id, cache.make_version(sync_state))
+
+async def cache_analysis(services: ServicePool,
+                         channel_identifier: str,
+                         identifier_type: str,
+                         response: Dict) -> Optional[CachedAnalysis]:
+    """Met en cache une réponse calculée, pour la version des données qui vient d'être synchronisée."""
+    cache = services.analysis_cache
+    channel_id = await asyncio.to_thread(services.scraper.resolver.lookup, channel_identifier, identifier_type)
+    if not channel_id:
+        return None
+    sync_state = await asyncio.to_thread(services.storage.get_sync_state, channel_id)
+    version = cache.make_version(sync_state)
+    if version is None:
+        return None
+    return cache.set(channel_id, version, response)
+
+def refresh_in_background(request: Request, entry: CachedAnalysis):
+    """Recalcule une réponse périmée via la file de tâches (dédupliquée par chaîne)."""
+    try:
+        request.app.state.jobs.submit(entry.channel_id, channel_identifier=entry.channel_id, identifier_type='channel')
+    except JobQueueFull as e:
+        logger.warning(f"Rafraîchissement de {entry.channel_id} reporté: {e}")
+
+def cached_response(request: Request,
+                    entry: CachedAnalysis,
+                    cache_status: str,
+                    content: str,
+                    media_type: str) -> Response:
+    """Sert une réponse en cache, ou 304 si le client possède déjà cette version."""
+    headers = {
+        'ETag': entry.etag,
+        'Cache-Control': f"private, max-age={request.app.state.services.analysis_cache.max_age(entry)}",
+        'X-Cache': cache_status
+    }
+    if_none_match = request.headers.get('if-none-match', '')
+    client_etags = {tag.strip().removeprefix('W/') for tag in if_none_match.split(',')}
+    if entry.etag in client_etags or '*' in client_etags:
+        return Response(status_code=304, headers=headers)
+    return Response(content=content, media_type=media_type, headers=headers)
+
+def cached_json_response(request: Request, entry: CachedAnalysis, cache_status: str) -> Response:
+    return cached_response(request, entry, cache_status, entry.body, "application/json")
+
+async def run_analysis_job(job: Job) -> Dict:
+    """Exécute le pipeline d'analyse pour une tâche de la file, en suivant l'avancement."""
+    services = app.state.services
+    sections = {}
+    # Les analyses en arrière-plan cèdent le quota YouTube aux analyses interactives
+    with priority_lane(BACKGROUND):
+        stages = analyze_channel_stages(services, job.params['channel_identifier'], job.params['identifier_type'])
+        async for stage, payload in stages:
+            sections[stage] = payload
+            job.stages.append(stage)
+    response = build_analysis_response(sections)
+    await cache_analysis(services, job.params['channel_identifier'], job.params['identifier_type'], response)
+    return response
 
 @app.get("/api/analyze-channel")
-async def analyze_channel(channel_url: str):
+async def analyze_channel(request: Request, channel_url: str):
     try:
-        # Validation de l'URL
-        logger.info(f"URL reçue (brute): {channel_url}")
-        
-        if not channel_url:
-            raise ValueError("URL non fournie")
-        
-        if "youtube.com" not in channel_url.lower():
-            raise ValueError("L'URL doit être une URL YouTube valide")
+        channel_identifier, identifier_type = parse_channel_url(channel_url)
+        services = request.app.state.services
 
-        channel_identifier = extract_channel_id(channel_url)
-        logger.info(f"Identifiant extrait: {channel_identifier}")
-        
-        scraper = YouTubeScraper()
-        analyzer = ContentAnalyzer()
-        es_service = ElasticsearchService()
-        ai_service = AIService()
-        
-        # Récupérer les informations de la chaîne
-        channel_info = scraper.get_channel_info(channel_identifier)
-        if not channel_info:
-            raise ValueError("Impossible de récupérer les informations de la chaîne")
-            
-        videos = scraper.get_channel_videos(channel_info['id'], max_results=50)
-        
-        # Analyser le contenu
-        analysis = analyzer.analyze_channel_content(videos)
-        
-        # Indexer les vidéos dans Elasticsearch
-        for video in videos:
-            es_service.index_video({
-                **video,
-                'channel_id': channel_info['id'],
-                'analysis': analyzer.analyze_channel_content([video])
-            })
-        
-        # Trouver les opportunités de contenu
-        content_gaps = es_service.find_content_gaps(channel_info['id'])
-        
-        # Générer des suggestions d'IA
-        ai_suggestions = await ai_service.generate_content_suggestions(
-            channel_info,
-            content_gaps
-        )
-        
-        # Formater la réponse
-        response = {
-            'channel_info': {
-                'title': channel_info.get('title', ''),
-                'subscriber_count': int(channel_info.get('subscriber_count', 0)),
-                'video_count': int(channel_info.get('video_count', 0)),
-                'view_count': int(channel_info.get('view_count', 0))
-            },
-            'analysis': {
-                'performance_metrics': analysis.get('performance_metrics', {}),
-                'content_patterns': analysis.get('content_patterns', {
-                    'common_keywords': [],
-                    'title_patterns': {},
-                    'video_categories': []
-                }),
-                'temporal_patterns': analysis.get('temporal_patterns', {
-                    'best_days': 'Non déterminé',
-                    'best_hours': 0,
-                    'posting_frequency': 'Non déterminé'
-                }),
-                'engagement_analysis': analysis.get('engagement_analysis', {
-                    'high_engagement_topics': [],
-                    'engagement_trend': 'stable'
-                })
-            },
-            'content_gaps': content_gaps or [],
-            'ai_suggestions': ai_suggestions or []
-        }
-        
+        # Réponse déjà calculée pour les données actuelles de la chaîne ; si elle est
+        # périmée, elle est servie immédiatement et recalculée en arrière-plan
+        entry, cache_status = await get_cached_analysis(services, channel_identifier, identifier_type)
+        if entry is not None:
+            if cache_status == STALE:
+                refresh_in_background(request, entry)
+            return cached_json_response(request, entry, cache_status)
+
+        sections = {}
+        stages = analyze_channel_stages(services, channel_identifier, identifier_type, request)
+        async for stage, payload in stages:
+            sections[stage] = payload
+
+        response = build_analysis_response(sections)
+        entry = await cache_analysis(services, channel_identifier, identifier_type, response)
+        if entry is not None:
+            return cached_json_response(request, entry, 'MISS')
         return response
-        
+
+    except HTTPException:
+        raise
+    except QuotaExhausted as e:
+        logger.warning(str(e))
+        raise HTTPException(status_code=503, detail="Quota de l'API YouTube épuisé, réessayez plus tard")
+    except ServiceUnavailable as e:
+        logger.warning(str(e))
+        raise HTTPException(status_code=503, detail="Service temporairement indisponible, réessayez plus tard")
     except ValueError as e:
         logger.error(f"Erreur de validation: {str(e)}")
         raise HTTPException(status_code=400, detail=str(e))
@@ -149,26 +410,205 @@ async def analyze_channel(channel_url: str):
         logger.error(f"Erreur inattendue: {str(e)}")
         raise HTTPException(status_code=500, detail="Une erreur est survenue lors de l'analyse")
 
+@app.get("/api/analyze-channel/stream")
+async def analyze_channel_stream(request: Request, channel_url: str):
+    """Variante NDJSON de /api/analyze-channel : une ligne {"event", "data"} par section prête."""
+    try:
+        channel_identifier, identifier_type = parse_channel_url(channel_url)
+        services = request.app.state.services
+
+        entry, cache_status = await get_cached_analysis(services, channel_identifier, identifier_type)
+        if entry is not None:
+            if cache_status == STALE:
+                refresh_in_background(request, entry)
+            lines = [
+                json.dumps({'event': stage, 'data': payload}, ensure_ascii=False) + "\n"
+                for stage, payload in response_sections(json.loads(entry.body))
+            ]
+            lines.append(json.dumps({'event': 'done', 'data': None}) + "\n")
+            return cached_response(request, entry, cache_status, "".join(lines), "application/x-ndjson")
+
+        stages = analyze_channel_stages(services, channel_identifier, identifier_type, request)
+        # La première section est attendue avant de répondre pour que les erreurs
+        # de validation (URL, chaîne introuvable) gardent leur code HTTP
+        first = await stages.__anext__()
+    except QuotaExhausted as e:
+        logger.warning(str(e))
+        raise HTTPException(status_code=503, detail="Quota de l'API YouTube épuisé, réessayez plus tard")
+    except ServiceUnavailable as e:
+        logger.warning(str(e))
+        raise HTTPException(status_code=503, detail="Service temporairement indisponible, réessayez plus tard")
+    except ValueError as e:
+        logger.error(f"Erreur de validation: {str(e)}")
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Erreur inattendue: {str(e)}")
+        raise HTTPException(status_code=500, detail="Une erreur est survenue lors de l'analyse")
+
+    async def events():
+        stage, payload = first
+        sections = {stage: payload}
+        yield json.dumps({'event': stage, 'data': payload}, ensure_ascii=False) + "\n"
+        try:
+            async for stage, payload in stages:
+                sections[stage] = payload
+                yield json.dumps({'event': stage, 'data': payload}, ensure_ascii=False) + "\n"
+            await cache_analysis(services, channel_identifier, identifier_type, build_analysis_response(sections))
+        except Exception as e:
+            # Les en-têtes sont déjà envoyés : l'erreur est transmise comme un événement
+            logger.error(f"Erreur inattendue pendant le streaming: {str(e)}")
+            yield json.dumps({'event': 'error', 'data': {'detail': "Une erreur est survenue lors de l'analyse"}}) + "\n"
+        finally:
+            await stages.aclose()
+        yield json.dumps({'event': 'done', 'data': None}) + "\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="application/x-ndjson",
+        # Empêche la mise en tampon par un éventuel reverse proxy
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.post("/api/jobs/analyze-channel", status_code=202)
+async def submit_analysis_job(request: Request, channel_url: str):
+    """Soumet une analyse en arrière-plan ; les soumissions pour une même chaîne partagent la même tâche."""
+    try:
+        channel_identifier, identifier_type = parse_channel_url(channel_url)
+        # La tâche est identifiée par l'ID de chaîne pour que les différentes URL d'une chaîne soient regroupées
+        channel_id = await request.app.state.services.scraper.resolve_channel_id(channel_identifier, identifier_type)
+        job = request.app.state.jobs.submit(
+            channel_id,
+            channel_identifier=channel_id,
+            identifier_type='channel' if channel_id != channel_identifier else identifier_type
+        )
+    except ValueError as e:
+        logger.error(f"Erreur de validation: {str(e)}")
+        raise HTTPException(status_code=400, detail=str(e))
+    except QuotaExhausted as e:
+        logger.warning(str(e))
+        raise HTTPException(status_code=503, detail="Quota de l'API YouTube épuisé, réessayez plus tard")
+    except ServiceUnavailable as e:
+        logger.warning(str(e))
+        raise HTTPException(status_code=503, detail="Service temporairement indisponible, réessayez plus tard")
+    except JobQueueFull as e:
+        logger.warning(str(e))
+        raise HTTPException(status_code=503, detail=str(e))
+
+    return {'job_id': job.id, 'status': job.status}
+
+@app.get("/api/jobs/{job_id}")
+async def get_analysis_job(request: Request, job_id: str):
+    job = request.app.state.jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Tâche inconnue ou expirée")
+    return job.to_dict()
+
+@app.get("/api/channels/{channel_id}/summary")
+async def get_channel_summary(request: Request, channel_id: str):
+    """Résumé matérialisé d'une chaîne, tenu à jour à chaque indexation, sans ré-analyser ses vidéos."""
+    try:
+        storage = request.app.state.services.storage
+    except ServiceUnavailable as e:
+        logger.warning(str(e))
+        raise HTTPException(status_code=503, detail="Service temporairement indisponible, réessayez plus tard")
+    summary = await asyncio.to_thread(storage.get_channel_summary, channel_id)
+    if summary is None:
+        raise HTTPException(status_code=404, detail="Aucune vidéo indexée pour cette chaîne")
+    return summary
+
+class CompareChannelsRequest(BaseModel):
+    channel_urls: List[str]
+    max_results: int = 50
+    quota_budget: Optional[int] = None
+
+@app.post("/api/compare-channels")
+async def compare_channels(request: Request, payload: CompareChannelsRequest):
+    """Compare plusieurs chaînes côte à côte et identifie les opportunités de chacune face aux autres."""
+    try:
+        if not payload.channel_urls:
+            raise ValueError("Aucune URL fournie")
+        if len(payload.channel_urls) > MAX_COMPARED_CHANNELS:
+            raise ValueError(f"Au plus {MAX_COMPARED_CHANNELS} chaînes peuvent être comparées")
+
+        # Les URL en double ne sont récupérées qu'une fois
+        references = list(dict.fromkeys(parse_channel_url(url) for url in payload.channel_urls))
+        services = request.app.state.services
+        return await run_until_disconnected(
+            request,
+            services.competitor_service.compare_channels(
+                references,
+                max_results=payload.max_results,
+                quota_budget=payload.quota_budget
+            )
+        )
+    except HTTPException:
+        raise
+    except ServiceUnavailable as e:
+        logger.warning(str(e))
+        raise HTTPException(status_code=503, detail="Service temporairement indisponible, réessayez plus tard")
+    except ValueError as e:
+        logger.error(f"Erreur de validation: {str(e)}")
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Erreur inattendue: {str(e)}")
+        raise HTTPException(status_code=500, detail="Une erreur est survenue lors de la comparaison")
+
+def encode_topic_cursor(cursor: Optional[Dict]) -> Optional[str]:
+    """Curseur de pagination du stockage, sous forme opaque pour le client."""
+    if cursor is None:
+        return None
+    return base64.urlsafe_b64encode(json.dumps(cursor).encode()).decode()
+
+def decode_topic_cursor(cursor: str) -> Dict:
+    try:
+        decoded = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (binascii.Error, ValueError):
+        raise HTTPException(status_code=400, detail="Curseur invalide")
+    if not isinstance(decoded, dict) or 'search_after' not in decoded:
+        raise HTTPException(status_code=400, detail="Curseur invalide")
+    return decoded
+
 @app.get("/api/analyze-topic")
-async def analyze_topic(topic: str):
+async def analyze_topic(request: Request, topic: str, cursor: Optional[str] = None):
     try:
-        es_service = ElasticsearchService()
-        ai_service = AIService()
+        services = request.app.state.services
+        storage = services.storage
+        ai_service = services.ai_service
+
+        # Pages suivantes des vidéos existantes : l'analyse a déjà été renvoyée avec la première page
+        if cursor:
+            page = await asyncio.to_thread(
+                storage.search_videos_by_topic_page, topic, TOPIC_PAGE_SIZE, decode_topic_cursor(cursor)
+            )
+            return {
+                "topic": topic,
+                "existing_videos": page['videos'],
+                "next_cursor": encode_topic_cursor(page['cursor'])
+            }
         
         # Rechercher les vidéos existantes sur ce sujet
-        existing_videos = es_service.search_videos_by_topic(topic)
+        existing_videos, page = await asyncio.gather(
+            asyncio.to_thread(storage.search_videos_by_topic, topic),
+            asyncio.to_thread(storage.search_videos_by_topic_page, topic, TOPIC_PAGE_SIZE)
+        )
         
         # Analyser la concurrence
-        competition_analysis = await ai_service.analyze_competition(
-            topic,
-            existing_videos
+        competition_analysis = await run_until_disconnected(
+            request,
+            ai_service.analyze_competition(topic, existing_videos)
         )
         
         return {
             "topic": topic,
             "competition_analysis": competition_analysis,
-            "existing_videos": existing_videos[:5]  # Limiter à 5 exemples
+            "existing_videos": page['videos'],
+            "next_cursor": encode_topic_cursor(page['cursor'])
         }
+    except HTTPException:
+        raise
+    except ServiceUnavailable as e:
+        logger.warning(str(e))
+        raise HTTPException(status_code=503, detail="Service temporairement indisponible, réessayez plus tard")
     except Exception as e:
         logger.error(f"Erreur lors de l'analyse du sujet: {e}")
         raise HTTPException(status_code=400, detail=str(e))
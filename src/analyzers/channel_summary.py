@@ -0,0 +1,161 @@
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
+from src.utils.quantile_sketch import DDSketch
+
+SUMMED_FIELDS = ('view_count', 'like_count', 'comment_count')
+
+
+def format_posting_frequency(avg_days: int) -> str:
+    """Libellé de la fréquence de publication à partir de l'intervalle moyen en jours."""
+    if avg_days <= 1:
+        return "Quotidienne"
+    elif avg_days <= 7:
+        return f"{avg_days:.1f} jours"
+    elif avg_days <= 30:
+        return f"{(avg_days/7):.1f} semaines"
+    else:
+        return f"{(avg_days/30):.1f} mois"
+
+
+def _parse_date(value: Optional[str]) -> Optional[datetime]:
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        return None
+
+
+class ChannelSummary:
+    """Agrégats d'une chaîne maintenus incrémentalement, vidéo par vidéo.
+
+    Les moyennes reposent sur des sommes et des comptes, et les médianes sur
+    des DDSketch : deux résumés se fusionnent par simple addition, et la
+    contribution d'une vidéo peut être retirée quand ses statistiques changent.
+    Les dates de première et dernière publication ne font que s'étendre.
+    """
+
+    def __init__(self, channel_id: str):
+        self.channel_id = channel_id
+        self.video_count = 0
+        self.sums = {field: 0 for field in SUMMED_FIELDS}
+        self.engagement_sum = 0.0
+        self.views_sketch = DDSketch()
+        self.engagement_sketch = DDSketch()
+        self.keywords: Counter = Counter()
+        self.first_published_at: Optional[str] = None
+        self.last_published_at: Optional[str] = None
+
+    @staticmethod
+    def engagement_rate(document: Dict) -> float:
+        views = int(document.get('view_count') or 0)
+        return (int(document.get('like_count') or 0) + int(document.get('comment_count') or 0)) / max(views, 1)
+
+    def add_video(self, document: Dict):
+        self._apply(document, 1)
+        self._extend_dates(document.get('published_at'))
+
+    def remove_video(self, document: Dict):
+        self._apply(document, -1)
+
+    def update_video(self, previous: Dict, document: Dict):
+        """Remplace la contribution d'une vidéo (ex: statistiques rafraîchies)."""
+        self.remove_video(previous)
+        self.add_video(document)
+
+    def _apply(self, document: Dict, sign: int):
+        self.video_count += sign
+        for field in SUMMED_FIELDS:
+            self.sums[field] += sign * int(document.get(field) or 0)
+        engagement = self.engagement_rate(document)
+        self.engagement_sum += sign * engagement
+
+        views = int(document.get('view_count') or 0)
+        if sign > 0:
+            self.views_sketch.add(views)
+            self.engagement_sketch.add(engagement)
+        else:
+            self.views_sketch.remove(views)
+            self.engagement_sketch.remove(engagement)
+
+        for keyword in set(document.get('keywords') or []):
+            self.keywords[keyword] += sign
+            if self.keywords[keyword] <= 0:
+                del self.keywords[keyword]
+
+    def merge(self, other: 'ChannelSummary'):
+        self.video_count += other.video_count
+        for field in SUMMED_FIELDS:
+            self.sums[field] += other.sums[field]
+        self.engagement_sum += other.engagement_sum
+        self.views_sketch.merge(other.views_sketch)
+        self.engagement_sketch.merge(other.engagement_sketch)
+        self.keywords.update(other.keywords)
+        for date in (other.first_published_at, other.last_published_at):
+            self._extend_dates(date)
+
+    def _extend_dates(self, date: Optional[str]):
+        published_at = _parse_date(date)
+        if published_at is None:
+            return
+        if self.first_published_at is None or published_at < _parse_date(self.first_published_at):
+            self.first_published_at = published_at.isoformat()
+        if self.last_published_at is None or published_at > _parse_date(self.last_published_at):
+            self.last_published_at = published_at.isoformat()
+
+    def posting_frequency(self) -> str:
+        first = _parse_date(self.first_published_at)
+        last = _parse_date(self.last_published_at)
+        if self.video_count < 2 or first is None or last is None:
+            return "Données insuffisantes"
+        return format_posting_frequency(((last - first) / (self.video_count - 1)).days)
+
+    def to_document(self, top_keywords: int = 10) -> Dict:
+        """Document résumé, lisible sans ré-agréger les vidéos."""
+        count = max(self.video_count, 0)
+        average = lambda total: total / count if count else 0.0
+        return {
+            'channel_id': self.channel_id,
+            'video_count': count,
+            'average_views': average(self.sums['view_count']),
+            'median_views': self.views_sketch.quantile(0.5) or 0.0,
+            'p90_views': self.views_sketch.quantile(0.9) or 0.0,
+            'average_likes': average(self.sums['like_count']),
+            'average_comments': average(self.sums['comment_count']),
+            'average_engagement_rate': average(self.engagement_sum),
+            'median_engagement_rate': self.engagement_sketch.quantile(0.5) or 0.0,
+            'total_views': self.sums['view_count'],
+            'first_published_at': self.first_published_at,
+            'last_published_at': self.last_published_at,
+            'posting_frequency': self.posting_frequency(),
+            'top_keywords': [keyword for keyword, _ in self.keywords.most_common(top_keywords)],
+            'updated_at': datetime.now(timezone.utc).isoformat()
+        }
+
+    def to_state(self) -> Dict:
+        """État complet (sérialisable) permettant de reprendre les mises à jour incrémentales."""
+        return {
+            'video_count': self.video_count,
+            'sums': dict(self.sums),
+            'engagement_sum': self.engagement_sum,
+            'views_sketch': self.views_sketch.to_dict(),
+            'engagement_sketch': self.engagement_sketch.to_dict(),
+            'keywords': dict(self.keywords),
+            'first_published_at': self.first_published_at,
+            'last_published_at': self.last_published_at
+        }
+
+    @classmethod
+    def from_state(cls, channel_id: str, state: Dict) -> 'ChannelSummary':
+        summary = cls(channel_id)
+        summary.video_count = state.get('video_count', 0)
+        summary.sums.update(state.get('sums', {}))
+        summary.engagement_sum = state.get('engagement_sum', 0.0)
+        summary.views_sketch = DDSketch.from_dict(state.get('views_sketch', {}))
+        summary.engagement_sketch = DDSketch.from_dict(state.get('engagement_sketch', {}))
+        summary.keywords = Counter(state.get('keywords', {}))
+        summary.first_published_at = state.get('first_published_at')
+        summary.last_published_at = state.get('last_published_at')
+        return summary
@@ -0,0 +1,148 @@
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+import asyncio
+import logging
+import multiprocessing
+import os
+
+from src.analyzers.content_analyzer import ContentAnalyzer
+from src.analyzers.gap_ranker import rank_content_gaps
+
+logger = logging.getLogger(__name__)
+
+# Métriques comparées entre chaînes : (nom, section de l'analyse, clé)
+COMPARED_METRICS = [
+    ('average_views', 'performance_metrics', 'average_views'),
+    ('median_views', 'performance_metrics', 'median_views'),
+    ('average_likes', 'performance_metrics', 'average_likes'),
+    ('average_comments', 'performance_metrics', 'average_comments'),
+    ('average_engagement_rate', 'engagement_analysis', 'average_engagement_rate'),
+]
+
+# Analyseur propre à chaque processus du pool, construit au premier appel
+_process_analyzer: Optional[ContentAnalyzer] = None
+
+
+def analyze_videos(videos: List[Dict]) -> Tuple[Dict, List[Dict]]:
+    """Point d'entrée exécuté dans les processus du pool."""
+    global _process_analyzer
+    if _process_analyzer is None:
+        _process_analyzer = ContentAnalyzer()
+    return _process_analyzer.analyze_channel_and_videos(videos)
+
+
+class CompetitorAnalyzer:
+    """Analyse plusieurs chaînes en parallèle sur plusieurs cœurs et les compare."""
+
+    def __init__(self, max_workers: Optional[int] = None):
+        self.max_workers = max_workers or int(os.getenv('ANALYZER_PROCESSES', os.cpu_count() or 1))
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # Le pool est créé depuis un serveur qui a déjà des threads (to_thread, sessions HTTP) :
+            # un fork copierait leurs verrous dans l'état où ils se trouvent
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context('spawn')
+            )
+        return self._executor
+
+    async def analyze_channels(self, videos_by_channel: Dict[str, List[Dict]]) -> Dict[str, Tuple[Dict, List[Dict]]]:
+        """Analyse chaque chaîne dans un processus distinct ; retourne {channel_id: (analyse, caractéristiques)}."""
+        loop = asyncio.get_running_loop()
+        channel_ids = list(videos_by_channel)
+        results = await asyncio.gather(*[
+            loop.run_in_executor(self.executor, analyze_videos, videos_by_channel[channel_id])
+            for channel_id in channel_ids
+        ])
+        return dict(zip(channel_ids, results))
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def compare(self, channels: List[Dict]) -> Dict:
+        """Compare côte à côte des chaînes analysées.
+
+        Chaque élément de `channels` contient `channel_id`, `videos`, `analysis`
+        et `video_features`. Retourne, pour chaque métrique, la valeur de chaque
+        chaîne et la chaîne en tête, ainsi que les sujets partagés et les
+        opportunités de chaque chaîne par rapport aux autres.
+        """
+        comparison = {}
+        for name, section, key in COMPARED_METRICS:
+            values = {
+                channel['channel_id']: channel['analysis'].get(section, {}).get(key, 0)
+                for channel in channels
+            }
+            comparison[name] = {
+                'values': values,
+                'leader': max(values, key=values.get) if values else None
+            }
+
+        topic_stats = self._topic_stats(channels)
+        return {
+            'metrics': comparison,
+            'shared_topics': self._shared_topics(topic_stats, len(channels)),
+            'cross_channel_gaps': {
+                channel['channel_id']: self._channel_gaps(channel, topic_stats, len(channels))
+                for channel in channels
+            }
+        }
+
+    @staticmethod
+    def _topic_stats(channels: List[Dict]) -> Dict[str, Dict[str, Dict]]:
+        """Pour chaque sujet et chaque chaîne : nombre de vidéos, vues et engagement cumulés."""
+        stats: Dict[str, Dict[str, Dict]] = defaultdict(dict)
+        for channel in channels:
+            for video, features in zip(channel['videos'], channel['video_features']):
+                for keyword in set(features.get('keywords', [])):
+                    entry = stats[keyword].setdefault(
+                        channel['channel_id'], {'videos': 0, 'views': 0, 'engagement': 0.0}
+                    )
+                    entry['videos'] += 1
+                    entry['views'] += int(video.get('view_count', 0) or 0)
+                    entry['engagement'] += features.get('engagement_rate', 0.0)
+        return stats
+
+    @staticmethod
+    def _shared_topics(topic_stats: Dict[str, Dict[str, Dict]], total_channels: int, size: int = 10) -> List[Dict]:
+        """Sujets abordés par au moins la moitié des chaînes comparées."""
+        if total_channels < 2:
+            return []
+        shared = [
+            {'topic': topic, 'channels': len(per_channel)}
+            for topic, per_channel in topic_stats.items()
+            if len(per_channel) >= max(2, total_channels / 2)
+        ]
+        shared.sort(key=lambda topic: topic['channels'], reverse=True)
+        return shared[:size]
+
+    @staticmethod
+    def _channel_gaps(channel: Dict, topic_stats: Dict[str, Dict[str, Dict]], total_channels: int) -> List[Dict]:
+        """Sujets qui performent chez les autres chaînes comparées et que cette chaîne couvre peu."""
+        channel_id = channel['channel_id']
+        candidates = []
+        for topic, per_channel in topic_stats.items():
+            others = [entry for other_id, entry in per_channel.items() if other_id != channel_id]
+            videos = sum(entry['videos'] for entry in others)
+            if videos < 2:
+                continue
+            candidates.append({
+                'topic': topic,
+                'avg_views': sum(entry['views'] for entry in others) / videos,
+                'avg_engagement': sum(entry['engagement'] for entry in others) / videos,
+                'channels': len(others)
+            })
+
+        channel_terms = Counter({
+            topic: per_channel[channel_id]['videos']
+            for topic, per_channel in topic_stats.items()
+            if channel_id in per_channel
+        })
+        channel_avg_views = channel['analysis'].get('performance_metrics', {}).get('average_views', 0)
+        return rank_content_gaps(candidates, channel_terms, channel_avg_views, total_channels - 1, size=10)
@@ -1,14 +1,29 @@
-from typing import List, Dict
+from typing import List, Dict, Tuple
 import pandas as pd
 from collections import Counter
 import re
 from datetime import datetime
 import numpy as np
-from src.utils.text_processor import extract_keywords
+from src.analyzers.channel_summary import format_posting_frequency
+from src.utils.metrics import timed
+from src.utils.text_processor import count_keywords, extract_keywords_batch
 import logging
 
 logger = logging.getLogger(__name__)
 
+EMOJI_PATTERN = re.compile("["
+    u"\U0001F600-\U0001F64F"  # emoticons
+    u"\U0001F300-\U0001F5FF"  # symbols & pictographs
+    u"\U0001F680-\U0001F6FF"  # transport & map symbols
+    u"\U0001F1E0-\U0001F1FF"  # flags (iOS)
+    "]+", flags=re.UNICODE)
+QUESTION_PATTERN = re.compile(r'quoi|comment|pourquoi|qui|où|quand|\?')
+BRACKET_PATTERN = re.compile(r'[\[\]()]')
+DIGIT_PATTERN = re.compile(r'\d')
+WORD_PATTERN = re.compile(r'\S+')
+# Majuscules latines, y compris les capitales accentuées du français
+UPPERCASE_PATTERN = re.compile(r'[A-ZÀ-ÖØ-ÞŒŸ]')
+
 class ContentAnalyzer:
     def __init__(self):
         self.common_words = set(['le', 'la', 'les', 'un', 'une', 'des', 'et', 'ou', 'mais'])
@@ -16,13 +31,34 @@ class ContentAnalyzer:
     def analyze_channel_content(self, videos: List[Dict]) -> Dict:
         """Analyse complète du contenu d'une chaîne."""
         if not videos:
-            return {
-                'performance_metrics': {},
-                'content_patterns': {},
-                'temporal_patterns': {},
-                'engagement_analysis': {}
-            }
+            return self._empty_analysis()
+            
+        return self._analyze_dataframe(self._prepare_dataframe(videos))
+
+    def analyze_channel_and_videos(self, videos: List[Dict]) -> Tuple[Dict, List[Dict]]:
+        """Analyse la chaîne et calcule les caractéristiques de chaque vidéo en une seule passe.
+
+        Retourne l'analyse de la chaîne (même format que analyze_channel_content)
+        et la liste des caractéristiques par vidéo, dans l'ordre de `videos`.
+        """
+        if not videos:
+            return self._empty_analysis(), []
             
+        df = self._prepare_dataframe(videos)
+        video_features = self._compute_video_features(df)
+        return self._analyze_dataframe(df), video_features
+
+    def _empty_analysis(self) -> Dict:
+        return {
+            'performance_metrics': {},
+            'content_patterns': {},
+            'temporal_patterns': {},
+            'engagement_analysis': {}
+        }
+
+    @timed('analyzer')
+    def _prepare_dataframe(self, videos: List[Dict]) -> pd.DataFrame:
+        """Construit le DataFrame des vidéos et calcule les colonnes dérivées."""
         df = pd.DataFrame(videos)
         
         # Convertir les colonnes numériques
@@ -30,6 +66,11 @@ class ContentAnalyzer:
         for col in numeric_columns:
             df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0).astype(int)
         
+        df['title'] = df['title'].fillna('').astype(str)
+        self._add_title_features(df)
+        return df
+
+    def _analyze_dataframe(self, df: pd.DataFrame) -> Dict:
         return {
             'performance_metrics': self._analyze_performance(df),
             'content_patterns': self._analyze_content_patterns(df),
@@ -37,6 +78,51 @@ class ContentAnalyzer:
             'engagement_analysis': self._analyze_engagement(df)
         }
 
+    @timed('analyzer')
+    def _compute_video_features(self, df: pd.DataFrame) -> List[Dict]:
+        """Caractéristiques par vidéo (engagement, mots-clés, formats de titre, horaire de publication)."""
+        try:
+            engagement = (df['like_count'] + df['comment_count']) / df['view_count'].clip(lower=1)
+            published = pd.to_datetime(df['published_at'], errors='coerce', utc=True)
+            hours = published.dt.hour
+            days = published.dt.day_name()
+            keywords = extract_keywords_batch(df['title'].tolist())
+            # Après une synchronisation, les nouvelles vidéos (API) n'ont que 'id', les vidéos stockées ont aussi 'video_id'
+            if 'video_id' not in df:
+                video_ids = df['id']
+            elif 'id' in df:
+                video_ids = df['video_id'].fillna(df['id'])
+            else:
+                video_ids = df['video_id']
+            
+            return [
+                {
+                    'video_id': video_id,
+                    'engagement_rate': float(rate),
+                    'keywords': video_keywords,
+                    'title_word_count': int(word_count),
+                    'title_formats': {
+                        'question': bool(question),
+                        'number': bool(number),
+                        'brackets': bool(brackets),
+                        'emoji': bool(emoji),
+                        'caps': bool(caps)
+                    },
+                    'publish_hour': int(hour) if pd.notna(hour) else None,
+                    'publish_day': day if isinstance(day, str) else None
+                }
+                for video_id, rate, video_keywords, word_count, question, number, brackets, emoji, caps, hour, day
+                in zip(
+                    video_ids, engagement, keywords, df['title_word_count'],
+                    df['title_has_question_word'], df['title_has_number'], df['title_has_brackets'],
+                    df['title_has_emoji'], df['title_is_caps'], hours, days
+                )
+            ]
+        except Exception as e:
+            logger.error(f"Erreur lors du calcul des caractéristiques des vidéos: {e}")
+            return [{} for _ in range(len(df))]
+
+    @timed('analyzer')
     def _analyze_performance(self, df: pd.DataFrame) -> Dict:
         """Analyse les métriques de performance."""
         try:
@@ -57,15 +143,16 @@ class ContentAnalyzer:
                 'top_performing_videos': []
             }
 
+    @timed('analyzer')
     def _analyze_content_patterns(self, df: pd.DataFrame) -> Dict:
         """Analyse les patterns dans les titres et descriptions."""
         try:
-            titles = ' '.join(df['title'].fillna('').tolist())
-            keywords = extract_keywords(titles)
+            # Agrégation des mots-clés par titre (partagés via le cache avec les autres étapes)
+            keyword_counts = count_keywords(df['title'].fillna('').tolist())
             
             return {
-                'common_keywords': keywords[:10],
-                'title_patterns': self._analyze_titles(df['title'].fillna('').tolist()),
+                'common_keywords': [kw for kw, _ in keyword_counts.most_common(10)],
+                'title_patterns': self._analyze_titles(df),
                 'video_categories': self._categorize_content(df)
             }
         except Exception as e:
@@ -76,6 +163,7 @@ class ContentAnalyzer:
                 'video_categories': []
             }
 
+    @timed('analyzer')
     def _analyze_temporal_patterns(self, df: pd.DataFrame) -> Dict:
         """Analyse les patterns temporels de publication."""
         try:
@@ -97,6 +185,7 @@ class ContentAnalyzer:
                 'posting_frequency': "N/A"
             }
 
+    @timed('analyzer')
     def _analyze_engagement(self, df: pd.DataFrame) -> Dict:
         """Analyse l'engagement des vidéos."""
         try:
@@ -125,17 +214,27 @@ class ContentAnalyzer:
             logger.error(f"Erreur lors de la récupération des meilleures vidéos: {e}")
             return []
 
-    def _analyze_titles(self, titles: List[str]) -> Dict:
+    def _add_title_features(self, df: pd.DataFrame):
+        """Calcule en une passe vectorisée les caractéristiques de chaque titre."""
+        titles = df['title']
+        lowered = titles.str.lower()
+        lengths = titles.str.len()
+        
+        df['title_word_count'] = titles.str.count(WORD_PATTERN)
+        df['title_is_question'] = titles.str.contains('?', regex=False)
+        df['title_has_question_word'] = lowered.str.contains(QUESTION_PATTERN)
+        df['title_has_number'] = titles.str.contains(DIGIT_PATTERN)
+        df['title_has_brackets'] = titles.str.contains(BRACKET_PATTERN)
+        df['title_has_emoji'] = titles.str.contains(EMOJI_PATTERN)
+        df['title_is_caps'] = titles.str.isupper() | (titles.str.count(UPPERCASE_PATTERN) > lengths * 0.5)
+
+    def _analyze_titles(self, df: pd.DataFrame) -> Dict:
         """Analyse les patterns dans les titres."""
         try:
-            lengths = [len(title.split()) for title in titles]
-            formats = self._identify_title_formats(titles)
-            questions = self._count_question_titles(titles)
-            
             return {
-                'average_length': float(np.mean(lengths)),
-                'common_formats': formats,
-                'question_percentage': questions
+                'average_length': float(df['title_word_count'].mean()),
+                'common_formats': self._identify_title_formats(df),
+                'question_percentage': self._count_question_titles(df)
             }
         except Exception as e:
             logger.error(f"Erreur lors de l'analyse des titres: {e}")
@@ -145,48 +244,28 @@ class ContentAnalyzer:
                 'question_percentage': 0.0
             }
 
-    def _identify_title_formats(self, titles: List[str]) -> Dict[str, int]:
+    def _identify_title_formats(self, df: pd.DataFrame) -> Dict[str, float]:
         """Identifie les formats courants dans les titres."""
         try:
-            formats = {
-                'questions': 0,
-                'numbers': 0,
-                'brackets': 0,
-                'emojis': 0,
-                'caps': 0
+            columns = {
+                'questions': 'title_has_question_word',
+                'numbers': 'title_has_number',
+                'brackets': 'title_has_brackets',
+                'emojis': 'title_has_emoji',
+                'caps': 'title_is_caps'
             }
-            
-            emoji_pattern = re.compile("["
-                u"\U0001F600-\U0001F64F"  # emoticons
-                u"\U0001F300-\U0001F5FF"  # symbols & pictographs
-                u"\U0001F680-\U0001F6FF"  # transport & map symbols
-                u"\U0001F1E0-\U0001F1FF"  # flags (iOS)
-                "]+", flags=re.UNICODE)
-            
-            for title in titles:
-                if any(q in title.lower() for q in ['quoi', 'comment', 'pourquoi', 'qui', 'où', 'quand', '?']):
-                    formats['questions'] += 1
-                if any(c.isdigit() for c in title):
-                    formats['numbers'] += 1
-                if '[' in title or ']' in title or '(' in title or ')' in title:
-                    formats['brackets'] += 1
-                if emoji_pattern.search(title):
-                    formats['emojis'] += 1
-                if title.isupper() or sum(1 for c in title if c.isupper()) > len(title) * 0.5:
-                    formats['caps'] += 1
-            
-            total = len(titles) or 1
-            return {k: (v / total) * 100 for k, v in formats.items()}
+            if df.empty:
+                return {name: 0.0 for name in columns}
+            return {name: float(df[column].mean()) * 100 for name, column in columns.items()}
             
         except Exception as e:
             logger.error(f"Erreur lors de l'identification des formats de titre: {e}")
             return {}
 
-    def _count_question_titles(self, titles: List[str]) -> float:
+    def _count_question_titles(self, df: pd.DataFrame) -> float:
         """Compte le pourcentage de titres qui sont des questions."""
         try:
-            question_count = sum(1 for title in titles if '?' in title)
-            return (question_count / len(titles)) * 100 if titles else 0
+            return float(df['title_is_question'].mean()) * 100 if not df.empty else 0
         except Exception as e:
             logger.error(f"Erreur lors du comptage des titres questions: {e}")
             return 0.0
@@ -195,8 +274,7 @@ class ContentAnalyzer:
         """Catégorise le contenu en thèmes."""
         try:
             all_keywords = []
-            for title in df['title']:
-                keywords = extract_keywords(title)
+            for keywords in extract_keywords_batch(df['title'].fillna('').tolist()):
                 all_keywords.extend(keywords)
             
             keyword_counts = Counter(all_keywords)
@@ -222,17 +300,8 @@ class ContentAnalyzer:
                 
             dates = pd.to_datetime(df['published_at'])
             intervals = dates.diff()[1:]  # Ignorer la première différence qui sera NaT
-            avg_days = intervals.mean().days
-            
-            if avg_days <= 1:
-                return "Quotidienne"
-            elif avg_days <= 7:
-                return f"{avg_days:.1f} jours"
-            elif avg_days <= 30:
-                return f"{(avg_days/7):.1f} semaines"
-            else:
-                return f"{(avg_days/30):.1f} mois"
-                
+            return format_posting_frequency(intervals.mean().days)
+
         except Exception as e:
             logger.error(f"Erreur lors du calcul de la fréquence de publication: {e}")
             return "Non déterminé"
@@ -243,9 +312,10 @@ class ContentAnalyzer:
             df['total_engagement'] = df['like_count'] + df['comment_count']
             high_engagement = df.nlargest(5, 'total_engagement')
             
+            keywords_per_title = extract_keywords_batch(high_engagement['title'].fillna('').tolist())
+            
             topics = []
-            for _, video in high_engagement.iterrows():
-                keywords = extract_keywords(video['title'])
+            for keywords, (_, video) in zip(keywords_per_title, high_engagement.iterrows()):
                 topics.append({
                     'topic': ' '.join(keywords[:3]),
                     'engagement': int(video['total_engagement']),
@@ -0,0 +1,61 @@
+from typing import Dict, List
+import math
+
+
+def _potential_label(avg_views: float, channel_avg_views: float) -> str:
+    """Potentiel d'un sujet, relatif aux vues moyennes de la chaîne."""
+    ratio = avg_views / max(channel_avg_views, 1)
+    if ratio >= 2:
+        return "élevé"
+    if ratio >= 1:
+        return "moyen"
+    return "faible"
+
+
+def _competition_label(channels: int, total_channels: int) -> str:
+    """Niveau de compétition selon la part des chaînes qui couvrent déjà le sujet."""
+    if total_channels <= 0:
+        return "inconnu"
+    share = channels / total_channels
+    if share >= 0.5:
+        return "élevé"
+    if share >= 0.2:
+        return "moyen"
+    return "faible"
+
+
+def rank_content_gaps(candidates: List[Dict],
+                      channel_terms: Dict[str, int],
+                      channel_avg_views: float,
+                      total_channels: int,
+                      size: int = 20) -> List[Dict]:
+    """Classe les sujets candidats en opportunités de contenu.
+
+    Chaque candidat contient `topic`, `avg_views`, `avg_engagement`, `channels`
+    (nombre de chaînes concurrentes qui l'abordent) et éventuellement
+    `significance` (score significant_terms). Le score favorise les sujets qui
+    performent chez les concurrents, avec un bon engagement, et que la chaîne
+    couvre peu.
+    """
+    gaps = []
+    for candidate in candidates:
+        topic = candidate['topic']
+        avg_views = candidate.get('avg_views') or 0.0
+        avg_engagement = candidate.get('avg_engagement') or 0.0
+        channels = candidate.get('channels') or 0
+
+        score = (
+            math.log1p(avg_views)
+            * (1 + 10 * avg_engagement)
+            * (1 + candidate.get('significance', 0.0))
+            / (1 + channel_terms.get(topic, 0))
+        )
+        gaps.append({
+            'topic': topic,
+            'potential': _potential_label(avg_views, channel_avg_views),
+            'competition': _competition_label(channels, total_channels),
+            'score': round(score, 4)
+        })
+
+    gaps.sort(key=lambda gap: gap['score'], reverse=True)
+    return gaps[:size]
@@ -0,0 +1,177 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Durée de vie (en secondes) des réponses par endpoint de l'API YouTube
+DEFAULT_TTLS = {
+    'search.list': 24 * 3600,
+    'channels.list': 6 * 3600,
+    'playlistItems.list': 15 * 60,
+    'videos.list': 3600,
+}
+DEFAULT_TTL = 3600
+# Nombre de dates d'accès accumulées avant écriture groupée
+ACCESS_FLUSH_SIZE = 256
+
+
+@dataclass
+class CacheEntry:
+    key: str
+    response: Dict
+    etag: Optional[str]
+    expires_at: float
+
+    @property
+    def fresh(self) -> bool:
+        return time.time() < self.expires_at
+
+
+class ApiResponseCache:
+    """Cache persistant (SQLite) des réponses de l'API YouTube Data."""
+
+    def __init__(self,
+                 path: Optional[str] = None,
+                 max_size_bytes: Optional[int] = None,
+                 ttls: Optional[Dict[str, int]] = None):
+        self.path = path or os.getenv('YOUTUBE_CACHE_PATH', '.cache/youtube_api.sqlite')
+        self.max_size_bytes = max_size_bytes or int(os.getenv('YOUTUBE_CACHE_MAX_BYTES', 50 * 1024 * 1024))
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self.evictions = 0
+
+        if self.path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._lock = threading.Lock()
+        # Dates d'accès des lectures, écrites par lots plutôt qu'à chaque hit
+        self._pending_access: Dict[str, float] = {}
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                endpoint TEXT NOT NULL,
+                body TEXT NOT NULL,
+                etag TEXT,
+                size INTEGER NOT NULL,
+                expires_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )"""
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_access ON responses(last_access)")
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(endpoint: str, params: Dict) -> str:
+        """Calcule la clé de cache à partir de l'endpoint et des paramètres."""
+        payload = json.dumps({'endpoint': endpoint, 'params': params}, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def ttl_for(self, endpoint: str) -> int:
+        return self.ttls.get(endpoint, DEFAULT_TTL)
+
+    def get(self, endpoint: str, params: Dict) -> Optional[CacheEntry]:
+        """Retourne l'entrée en cache (éventuellement expirée) ou None."""
+        key = self.make_key(endpoint, params)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT body, etag, expires_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self._pending_access[key] = time.time()
+            if len(self._pending_access) >= ACCESS_FLUSH_SIZE:
+                self._flush_access()
+                self._conn.commit()
+
+        entry = CacheEntry(key=key, response=json.loads(row[0]), etag=row[1], expires_at=row[2])
+        if entry.fresh:
+            self.hits += 1
+        else:
+            self.misses += 1
+        return entry
+
+    def set(self, endpoint: str, params: Dict, response: Dict):
+        """Enregistre une réponse et applique la limite de taille."""
+        key = self.make_key(endpoint, params)
+        body = json.dumps(response, ensure_ascii=False)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, endpoint, body, etag, size, expires_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, endpoint, body, response.get('etag'), len(body), now + self.ttl_for(endpoint), now)
+            )
+            self._pending_access.pop(key, None)
+            # L'éviction LRU a besoin des dates d'accès à jour
+            self._flush_access()
+            self._evict()
+            self._conn.commit()
+
+    def revalidated(self, entry: CacheEntry, endpoint: str):
+        """Prolonge une entrée confirmée par l'API (réponse 304 Not Modified)."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "UPDATE responses SET expires_at = ?, last_access = ? WHERE key = ?",
+                (now + self.ttl_for(endpoint), now, entry.key)
+            )
+            self._pending_access.pop(entry.key, None)
+            self._conn.commit()
+        self.revalidations += 1
+
+    def _flush_access(self):
+        """Écrit les dates d'accès en attente (à appeler sous le verrou, sans commit)."""
+        if not self._pending_access:
+            return
+        self._conn.executemany(
+            "UPDATE responses SET last_access = ? WHERE key = ?",
+            [(accessed_at, key) for key, accessed_at in self._pending_access.items()]
+        )
+        self._pending_access.clear()
+
+    def _evict(self):
+        """Supprime les entrées les moins récemment utilisées au-delà de la taille maximale."""
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_size_bytes:
+            return
+        rows = self._conn.execute("SELECT key, size FROM responses ORDER BY last_access ASC").fetchall()
+        for key, size in rows:
+            if total <= self.max_size_bytes:
+                break
+            self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            total -= size
+            self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._pending_access.clear()
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+
+    def stats(self) -> Dict:
+        """Retourne les compteurs du cache."""
+        with self._lock:
+            entries, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()
+        lookups = self.hits + self.misses
+        return {
+            'entries': entries,
+            'size_bytes': size,
+            'hits': self.hits,
+            'misses': self.misses,
+            'revalidations': self.revalidations,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / lookups if lookups else 0.0
+        }
@@ -0,0 +1,296 @@
+import asyncio
+import logging
+import os
+from typing import Dict, List, Optional
+
+import aiohttp
+from dotenv import load_dotenv
+
+from src.scrapers.api_cache import ApiResponseCache
+from src.scrapers.channel_resolver import ChannelResolver
+from src.scrapers.quota_scheduler import QuotaExhausted, QuotaScheduler, get_scheduler, is_quota_error
+from src.scrapers.formatters import format_channel, format_statistics, format_video
+from src.utils.metrics import timer
+
+load_dotenv()
+logger = logging.getLogger(__name__)
+
+API_BASE_URL = 'https://www.googleapis.com/youtube/v3'
+
+_shared_session: Optional[aiohttp.ClientSession] = None
+
+
+def get_shared_session() -> aiohttp.ClientSession:
+    """Retourne la session HTTP partagée (pool de connexions keep-alive)."""
+    global _shared_session
+    if _shared_session is None or _shared_session.closed:
+        connector = aiohttp.TCPConnector(
+            limit=int(os.getenv('YOUTUBE_HTTP_POOL_SIZE', 20)),
+            ttl_dns_cache=300
+        )
+        timeout = aiohttp.ClientTimeout(total=float(os.getenv('YOUTUBE_HTTP_TIMEOUT', 30)))
+        _shared_session = aiohttp.ClientSession(connector=connector, timeout=timeout)
+    return _shared_session
+
+
+async def close_shared_session():
+    """Ferme la session HTTP partagée (à l'arrêt de l'application)."""
+    global _shared_session
+    if _shared_session is not None and not _shared_session.closed:
+        await _shared_session.close()
+    _shared_session = None
+
+
+class YouTubeApiError(Exception):
+    """Erreur HTTP renvoyée par l'API YouTube Data."""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(f"{status}: {message}")
+        self.status = status
+
+
+class AsyncYouTubeScraper:
+    """Client asynchrone de l'API YouTube Data (clés, quota et cache partagés)."""
+
+    def __init__(self,
+                 cache: Optional[ApiResponseCache] = None,
+                 resolver: Optional[ChannelResolver] = None,
+                 session: Optional[aiohttp.ClientSession] = None,
+                 max_concurrency: Optional[int] = None,
+                 scheduler: Optional[QuotaScheduler] = None):
+        self.scheduler = scheduler or get_scheduler()
+        if not self.scheduler.keys:
+            raise ValueError("YOUTUBE_API_KEY n'est pas définie")
+        if cache is None and os.getenv('YOUTUBE_CACHE_ENABLED', 'true').lower() != 'false':
+            cache = ApiResponseCache()
+        self.cache = cache
+        self.resolver = resolver or ChannelResolver()
+        self._session = session
+        self._semaphore = asyncio.Semaphore(max_concurrency or int(os.getenv('YOUTUBE_MAX_CONCURRENCY', 8)))
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        return self._session or get_shared_session()
+
+    async def _execute(self, endpoint: str, **params) -> Dict:
+        """Exécute un appel à l'API (ex: 'videos.list') en passant par le cache."""
+        # Le cache et l'index des chaînes sont en SQLite : leurs appels sont faits hors de la boucle
+        entry = await asyncio.to_thread(self.cache.get, endpoint, params) if self.cache else None
+        if entry and entry.fresh:
+            return entry.response
+
+        resource, _ = endpoint.split('.')
+        query = {key: value for key, value in params.items() if value is not None}
+        headers = {'If-None-Match': entry.etag} if entry and entry.etag else {}
+
+        # Une clé refusée pour dépassement de quota est écartée et l'appel est retenté avec une autre
+        exhausted_keys = set()
+        while True:
+            query['key'] = await self.scheduler.acquire(endpoint, exclude=exhausted_keys)
+            async with self._semaphore:
+                with timer('youtube', endpoint):
+                    async with self.session.get(f"{API_BASE_URL}/{resource}", params=query, headers=headers) as response:
+                        if response.status == 304 and entry:
+                            logger.debug(f"Réponse inchangée pour {endpoint}, réutilisation du cache")
+                            await asyncio.to_thread(self.cache.revalidated, entry, endpoint)
+                            return entry.response
+                        if response.status >= 400:
+                            body = await response.text()
+                            if is_quota_error(response.status, body):
+                                self.scheduler.mark_exhausted(query['key'])
+                                exhausted_keys.add(query['key'])
+                                continue
+                            raise YouTubeApiError(response.status, body)
+                        data = await response.json()
+                        break
+
+        if self.cache:
+            await asyncio.to_thread(self.cache.set, endpoint, params, data)
+        return data
+
+    async def resolve_channel_id(self, channel_identifier: str, identifier_type: Optional[str] = None) -> str:
+        """Résout un identifiant (@handle, nom d'utilisateur, ID) en channelId."""
+        channel_id = await asyncio.to_thread(self.resolver.lookup, channel_identifier, identifier_type)
+        if channel_id:
+            logger.debug(f"ID de chaîne connu pour {channel_identifier}: {channel_id}")
+            return channel_id
+
+        for method, endpoint, params in self.resolver.lookup_plan(channel_identifier, identifier_type):
+            try:
+                response = await self._execute(endpoint, **params)
+            except YouTubeApiError as e:
+                logger.warning(f"Erreur lors de la résolution via {endpoint}: {e}")
+                continue
+
+            channel_id = self.resolver.extract_channel_id(endpoint, response)
+            if channel_id:
+                logger.debug(f"ID de chaîne trouvé pour {channel_identifier} via {method}: {channel_id}")
+                await asyncio.to_thread(self.resolver.remember, channel_identifier, channel_id, method, identifier_type)
+                return channel_id
+
+        logger.debug(f"Utilisation directe de l'identifiant: {channel_identifier}")
+        return channel_identifier
+
+    async def get_channel_info(self, channel_identifier: str, identifier_type: Optional[str] = None) -> Dict:
+        """Récupère les informations de base d'une chaîne YouTube."""
+        try:
+            channel_id = await self.resolve_channel_id(channel_identifier, identifier_type)
+            response = await self._execute(
+                'channels.list',
+                part="snippet,statistics,contentDetails",
+                id=channel_id
+            )
+
+            if not response.get('items'):
+                raise ValueError(f"Chaîne non trouvée pour l'identifiant: {channel_identifier}")
+
+            return format_channel(channel_id, response['items'][0])
+        except YouTubeApiError as e:
+            logger.error(f"Erreur API YouTube: {e}")
+            raise ValueError(f"Erreur lors de l'accès à l'API YouTube: {str(e)}")
+        except QuotaExhausted:
+            raise
+        except Exception as e:
+            logger.error(f"Erreur inattendue: {e}")
+            raise ValueError(f"Erreur lors de la récupération des informations de la chaîne: {str(e)}")
+
+    async def get_channel_videos(self, channel_id: str, max_results: int = 50) -> List[Dict]:
+        """Récupère les dernières vidéos d'une chaîne.
+
+        Les détails de chaque page sont récupérés pendant que la page suivante
+        de la playlist est chargée.
+        """
+        try:
+            playlist_id = await self._get_uploads_playlist_id(channel_id)
+
+            detail_tasks = []
+            collected = 0
+            next_page_token = None
+
+            try:
+                while collected < max_results:
+                    response = await self._execute(
+                        'playlistItems.list',
+                        part="snippet,contentDetails",
+                        playlistId=playlist_id,
+                        maxResults=min(50, max_results - collected),
+                        pageToken=next_page_token
+                    )
+
+                    video_ids = [item['contentDetails']['videoId'] for item in response['items']]
+                    collected += len(video_ids)
+                    detail_tasks.append(asyncio.create_task(self._get_videos_details(video_ids)))
+
+                    next_page_token = response.get('nextPageToken')
+                    if not next_page_token or not video_ids:
+                        break
+
+                pages = await asyncio.gather(*detail_tasks)
+            finally:
+                # En cas d'échec d'une page, les détails en cours n'ont plus d'utilité : on les annule
+                # et on récupère leurs exceptions pour qu'elles ne restent pas orphelines
+                for task in detail_tasks:
+                    task.cancel()
+                if detail_tasks:
+                    await asyncio.gather(*detail_tasks, return_exceptions=True)
+            return [video for page in pages for video in page]
+        except QuotaExhausted:
+            raise
+        except Exception as e:
+            logger.error(f"Erreur lors de la récupération des vidéos: {e}")
+            return []
+
+    async def sync_channel_videos(self, channel_id: str, known_video_ids: List[str], max_results: int = 50) -> Dict:
+        """Synchronisation incrémentale des vidéos d'une chaîne.
+
+        Parcourt la playlist des uploads (de la plus récente à la plus ancienne)
+        et s'arrête à la première vidéo déjà connue. Pour les vidéos connues,
+        seules les statistiques sont rafraîchies.
+        """
+        try:
+            playlist_id = await self._get_uploads_playlist_id(channel_id)
+            known = set(known_video_ids)
+
+            new_video_ids = []
+            next_page_token = None
+            reached_known = False
+
+            while len(new_video_ids) < max_results and not reached_known:
+                response = await self._execute(
+                    'playlistItems.list',
+                    part="contentDetails",
+                    playlistId=playlist_id,
+                    maxResults=min(50, max_results - len(new_video_ids)),
+                    pageToken=next_page_token
+                )
+
+                for item in response['items']:
+                    video_id = item['contentDetails']['videoId']
+                    if video_id in known:
+                        reached_known = True
+                        break
+                    new_video_ids.append(video_id)
+
+                next_page_token = response.get('nextPageToken')
+                if not next_page_token:
+                    break
+
+            # La fenêtre se compte en positions de la playlist : les vidéos connues complètent les nouvelles
+            refresh_ids = known_video_ids[:max(0, max_results - len(new_video_ids))]
+            new_videos, statistics = await asyncio.gather(
+                self._get_videos_details(new_video_ids),
+                self._get_videos_statistics(refresh_ids)
+            )
+            return {'new_videos': new_videos, 'statistics': statistics}
+        except QuotaExhausted:
+            raise
+        except Exception as e:
+            logger.error(f"Erreur lors de la synchronisation des vidéos: {e}")
+            return {'new_videos': [], 'statistics': {}}
+
+    async def _get_videos_details(self, video_ids: List[str]) -> List[Dict]:
+        """Récupère les détails de plusieurs vidéos (50 IDs par appel, lots en parallèle)."""
+        batches = [video_ids[start:start + 50] for start in range(0, len(video_ids), 50)]
+        responses = await asyncio.gather(*(
+            self._execute(
+                'videos.list',
+                part="snippet,statistics,contentDetails",
+                id=','.join(batch)
+            )
+            for batch in batches
+        ))
+
+        videos = []
+        for batch, response in zip(batches, responses):
+            items_by_id = {item['id']: item for item in response.get('items', [])}
+            for video_id in batch:
+                video_data = items_by_id.get(video_id)
+                if video_data:
+                    videos.append(format_video(video_data))
+        return videos
+
+    async def _get_videos_statistics(self, video_ids: List[str]) -> Dict[str, Dict]:
+        """Récupère uniquement les statistiques de plusieurs vidéos (50 IDs par appel)."""
+        batches = [video_ids[start:start + 50] for start in range(0, len(video_ids), 50)]
+        responses = await asyncio.gather(*(
+            self._execute(
+                'videos.list',
+                part="statistics",
+                id=','.join(batch)
+            )
+            for batch in batches
+        ))
+        return {
+            item['id']: format_statistics(item)
+            for response in responses
+            for item in response.get('items', [])
+        }
+
+    async def _get_uploads_playlist_id(self, channel_id: str) -> str:
+        """Récupère l'ID de la playlist des uploads d'une chaîne."""
+        response = await self._execute(
+            'channels.list',
+            part="snippet,statistics,contentDetails",
+            id=channel_id
+        )
+        return response['items'][0]['contentDetails']['relatedPlaylists']['uploads']
@@ -0,0 +1,110 @@
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+CHANNEL_ID_PATTERN = re.compile(r'^UC[\w-]{22}$')
+
+# Type d'identifiant extrait de l'URL -> type de clé dans l'index
+IDENTIFIER_KINDS = {
+    'username': 'handle',  # youtube.com/@foo
+    'user': 'user',  # youtube.com/user/foo
+    'custom': 'custom',  # youtube.com/c/foo
+    'channel': 'channel',
+}
+
+
+class ChannelResolver:
+    """Résout les identifiants de chaîne (@handle, /user/, /c/, UC...) en channelId.
+
+    Les résolutions réussies sont conservées dans un index SQLite local, ce qui
+    rend les recherches suivantes gratuites en quota.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.getenv('CHANNEL_INDEX_PATH', '.cache/channel_index.sqlite')
+        if self.path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS channel_identifiers (
+                kind TEXT NOT NULL,
+                name TEXT NOT NULL,
+                channel_id TEXT NOT NULL,
+                method TEXT NOT NULL,
+                resolved_at REAL NOT NULL,
+                PRIMARY KEY (kind, name)
+            )"""
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def is_channel_id(identifier: str) -> bool:
+        return bool(CHANNEL_ID_PATTERN.match(identifier or ''))
+
+    @staticmethod
+    def _key(identifier: str, identifier_type: Optional[str] = None) -> Tuple[str, str]:
+        """Clé (type, nom) de l'index : @foo, /user/foo et /c/foo peuvent désigner des chaînes différentes."""
+        # Sans type, l'identifiant est traité comme un handle (premier essai de lookup_plan)
+        kind = IDENTIFIER_KINDS.get(identifier_type, 'handle')
+        # Les handles et noms d'utilisateur YouTube ne sont pas sensibles à la casse
+        return kind, identifier.strip().lstrip('@').lower()
+
+    def lookup(self, identifier: str, identifier_type: Optional[str] = None) -> Optional[str]:
+        """Retourne le channelId connu pour cet identifiant, sans appel réseau."""
+        if self.is_channel_id(identifier):
+            return identifier
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT channel_id FROM channel_identifiers WHERE kind = ? AND name = ?",
+                self._key(identifier, identifier_type)
+            ).fetchone()
+        return row[0] if row else None
+
+    def remember(self, identifier: str, channel_id: str, method: str, identifier_type: Optional[str] = None):
+        """Enregistre une résolution dans l'index local."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO channel_identifiers (kind, name, channel_id, method, resolved_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (*self._key(identifier, identifier_type), channel_id, method, time.time())
+            )
+            self._conn.commit()
+
+    def lookup_plan(self, identifier: str, identifier_type: Optional[str] = None) -> List[Tuple[str, str, Dict]]:
+        """Liste ordonnée des appels (méthode, endpoint, paramètres) à tenter, du moins coûteux au plus coûteux.
+
+        channels.list coûte 1 unité de quota, search.list en coûte 100 et
+        n'est donc utilisé qu'en dernier recours.
+        """
+        name = identifier.strip().lstrip('@')
+        by_handle = ('forHandle', 'channels.list', {'part': 'id', 'forHandle': f'@{name}'})
+        by_username = ('forUsername', 'channels.list', {'part': 'id', 'forUsername': name})
+        by_search = ('search', 'search.list', {'part': 'id', 'q': identifier, 'type': 'channel', 'maxResults': 1})
+
+        if identifier_type == 'user':
+            return [by_username, by_handle, by_search]
+        return [by_handle, by_username, by_search]
+
+    @staticmethod
+    def extract_channel_id(endpoint: str, response: Dict) -> Optional[str]:
+        """Extrait le channelId d'une réponse channels.list ou search.list."""
+        items = response.get('items') or []
+        if not items:
+            return None
+        if endpoint == 'search.list':
+            return items[0]['id'].get('channelId')
+        return items[0].get('id')
+
+    def stats(self) -> Dict:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT method, COUNT(*) FROM channel_identifiers GROUP BY method"
+            ).fetchall()
+        return {'entries': sum(count for _, count in rows), 'by_method': dict(rows)}
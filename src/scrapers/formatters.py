@@ -0,0 +1,31 @@
+from typing import Dict
+
+
+def format_channel(channel_id: str, channel_data: Dict) -> Dict:
+    """Convertit une ressource chaîne de l'API en dictionnaire simplifié."""
+    return {
+        'id': channel_id,
+        'title': channel_data['snippet']['title'],
+        'description': channel_data['snippet']['description'],
+        'subscriber_count': channel_data['statistics'].get('subscriberCount', '0'),
+        'video_count': channel_data['statistics'].get('videoCount', '0'),
+        'view_count': channel_data['statistics'].get('viewCount', '0')
+    }
+
+def format_statistics(video_data: Dict) -> Dict:
+    """Extrait les statistiques d'une ressource vidéo de l'API."""
+    return {
+        'view_count': video_data['statistics'].get('viewCount', '0'),
+        'like_count': video_data['statistics'].get('likeCount', '0'),
+        'comment_count': video_data['statistics'].get('commentCount', '0')
+    }
+
+def format_video(video_data: Dict) -> Dict:
+    """Convertit une ressource vidéo de l'API en dictionnaire simplifié."""
+    return {
+        'id': video_data['id'],
+        'title': video_data['snippet']['title'],
+        'description': video_data['snippet']['description'],
+        **format_statistics(video_data),
+        'published_at': video_data['snippet']['publishedAt']
+    }
@@ -0,0 +1,451 @@
+import asyncio
+import contextvars
+import hashlib
+import logging
+import math
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+logger = logging.getLogger(__name__)
+
+# Coût en unités de quota de l'API YouTube Data v3 par endpoint
+QUOTA_COSTS = {
+    'channels.list': 1,
+    'playlistItems.list': 1,
+    'videos.list': 1,
+    'search.list': 100,
+}
+DEFAULT_COST = 1
+
+# Files de priorité : les analyses interactives passent avant les tâches de fond
+INTERACTIVE = 'interactive'
+BACKGROUND = 'background'
+
+# Le quota journalier est remis à zéro à minuit, heure du Pacifique
+QUOTA_RESET_TZ = ZoneInfo('America/Los_Angeles')
+# Intervalle minimal (en secondes) entre deux écritures de la consommation sur disque
+QUOTA_FLUSH_INTERVAL = float(os.getenv('YOUTUBE_QUOTA_FLUSH_INTERVAL', 5))
+
+current_priority: contextvars.ContextVar[str] = contextvars.ContextVar('youtube_priority', default=INTERACTIVE)
+
+
+@contextmanager
+def priority_lane(priority: str):
+    """Exécute les appels à l'API du bloc (et des tâches qu'il crée) dans la file indiquée."""
+    token = current_priority.set(priority)
+    try:
+        yield
+    finally:
+        current_priority.reset(token)
+
+
+def quota_cost(endpoint: str) -> int:
+    return QUOTA_COSTS.get(endpoint, DEFAULT_COST)
+
+
+class QuotaExhausted(Exception):
+    """Aucune clé d'API ne dispose du quota nécessaire dans le délai d'attente autorisé."""
+
+
+class QuotaBudget:
+    """Budget d'unités partagé par un groupe d'appels (ex: une comparaison de chaînes).
+
+    Chaque membre du groupe réserve son coût attendu ; un appel imprévu (ex:
+    repli sur search.list) est prélevé sur le reste du budget au moment où il
+    a lieu, et la part non utilisée d'une réservation est rendue.
+    """
+
+    def __init__(self, units: int):
+        self.units = units
+        self.spent = 0
+        self.reserved = 0
+        self._lock = threading.Lock()
+
+    @property
+    def available(self) -> int:
+        return self.units - self.spent - self.reserved
+
+    def reserve(self, units: int) -> Optional['QuotaReservation']:
+        """Réserve `units` unités, ou retourne None si le budget restant ne le permet pas."""
+        with self._lock:
+            if units > self.available:
+                return None
+            self.reserved += units
+        return QuotaReservation(self, units)
+
+
+class QuotaReservation:
+    """Part d'un QuotaBudget attribuée à un membre du groupe, débitée à chaque appel réel."""
+
+    def __init__(self, budget: QuotaBudget, units: int):
+        self.budget = budget
+        self.remaining = units
+        self.spent = 0
+
+    def charge(self, units: int):
+        with self.budget._lock:
+            from_reservation = min(units, self.remaining)
+            if units - from_reservation > self.budget.available:
+                raise QuotaExhausted("Budget de quota épuisé")
+            self.remaining -= from_reservation
+            self.budget.reserved -= from_reservation
+            self.budget.spent += units
+            self.spent += units
+
+    def refund(self, units: int):
+        """Rend les unités d'un appel finalement non effectué."""
+        with self.budget._lock:
+            self.budget.spent -= units
+            self.spent -= units
+            self.remaining += units
+            self.budget.reserved += units
+
+    def release(self):
+        """Rend la part non utilisée de la réservation au budget."""
+        with self.budget._lock:
+            self.budget.reserved -= self.remaining
+            self.remaining = 0
+
+
+current_reservation: contextvars.ContextVar[Optional[QuotaReservation]] = contextvars.ContextVar(
+    'youtube_quota_reservation', default=None
+)
+
+
+@contextmanager
+def quota_reservation(reservation: QuotaReservation):
+    """Débite les appels à l'API du bloc (et des tâches qu'il crée) sur la réservation, puis la libère."""
+    token = current_reservation.set(reservation)
+    try:
+        yield reservation
+    finally:
+        current_reservation.reset(token)
+        reservation.release()
+
+
+def quota_day() -> str:
+    """Journée de quota en cours (date du Pacifique)."""
+    return datetime.now(QUOTA_RESET_TZ).date().isoformat()
+
+
+def seconds_since_reset() -> float:
+    """Secondes écoulées depuis la dernière remise à zéro du quota (minuit, heure du Pacifique)."""
+    now = datetime.now(QUOTA_RESET_TZ)
+    return (now - datetime.combine(now.date(), datetime.min.time(), tzinfo=QUOTA_RESET_TZ)).total_seconds()
+
+
+class QuotaLedger:
+    """Unités consommées par clé et par journée de quota, persistées en SQLite.
+
+    Permet à un redémarrage de reprendre la consommation du jour au lieu de
+    repartir avec une rafale complète. Les clés sont stockées hachées. Les
+    unités sont accumulées en mémoire et écrites au plus toutes les
+    QUOTA_FLUSH_INTERVAL secondes : un arrêt brutal peut en perdre autant.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.getenv('YOUTUBE_QUOTA_PATH', '.cache/youtube_quota.sqlite')
+        if self.path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._pending: Dict[Tuple[str, str], int] = {}
+        self._exhausted: Dict[Tuple[str, str], int] = {}
+        self._flushed_at = time.monotonic()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS quota_usage (
+                key_hash TEXT NOT NULL,
+                day TEXT NOT NULL,
+                units INTEGER NOT NULL,
+                PRIMARY KEY (key_hash, day)
+            )"""
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def _hash(key: str) -> str:
+        return hashlib.sha256(key.encode('utf-8')).hexdigest()
+
+    def spent(self, key: str, day: Optional[str] = None) -> int:
+        entry = (self._hash(key), day or quota_day())
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT units FROM quota_usage WHERE key_hash = ? AND day = ?", entry
+            ).fetchone()
+            spent = (row[0] if row else 0) + self._pending.get(entry, 0)
+            return max(spent, self._exhausted.get(entry, 0))
+
+    def add(self, key: str, units: int):
+        """Enregistre une consommation en mémoire (écrite par flush())."""
+        entry = (self._hash(key), quota_day())
+        with self._lock:
+            self._pending[entry] = self._pending.get(entry, 0) + units
+
+    def mark_exhausted(self, key: str, daily_quota: int):
+        """Compte la journée comme entièrement consommée (refus quotaExceeded de l'API)."""
+        entry = (self._hash(key), quota_day())
+        with self._lock:
+            self._exhausted[entry] = daily_quota
+
+    def flush_due(self) -> bool:
+        return bool(self._pending or self._exhausted) and time.monotonic() - self._flushed_at >= QUOTA_FLUSH_INTERVAL
+
+    def flush(self):
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            exhausted, self._exhausted = self._exhausted, {}
+            self._flushed_at = time.monotonic()
+            try:
+                self._conn.executemany(
+                    """INSERT INTO quota_usage (key_hash, day, units) VALUES (?, ?, ?)
+                       ON CONFLICT(key_hash, day) DO UPDATE SET units = units + excluded.units""",
+                    [(key_hash, day, units) for (key_hash, day), units in pending.items()]
+                )
+                self._conn.executemany(
+                    """INSERT INTO quota_usage (key_hash, day, units) VALUES (?, ?, ?)
+                       ON CONFLICT(key_hash, day) DO UPDATE SET units = MAX(units, excluded.units)""",
+                    [(key_hash, day, units) for (key_hash, day), units in exhausted.items()]
+                )
+                self._conn.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"Écriture de la consommation de quota impossible: {e}")
+
+
+class KeyBucket:
+    """Seau à jetons d'une clé d'API.
+
+    La capacité (rafale) plus le remplissage sur 24 h égalent le quota
+    journalier : la consommation sur toute fenêtre de 24 h ne peut donc pas
+    dépasser le quota.
+    """
+
+    def __init__(self, key: str, daily_quota: int, burst: int, spent_today: int = 0):
+        self.key = key
+        self.capacity = burst
+        self.rate = max(daily_quota - burst, 0) / 86400
+        # Après un redémarrage, le seau est reconstitué comme s'il était plein à la remise
+        # à zéro du quota, sans dépasser ce qui reste du quota du jour
+        refilled = burst + seconds_since_reset() * self.rate - spent_today
+        self.tokens = float(max(min(burst, refilled, daily_quota - spent_today), 0))
+        self.updated_at = time.monotonic()
+        self.exhausted_until: Optional[datetime] = None
+        self.units_spent = 0
+        self.calls = 0
+
+    @property
+    def label(self) -> str:
+        return f"…{self.key[-4:]}"
+
+    def refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def available(self) -> bool:
+        if self.exhausted_until is None:
+            return True
+        if datetime.now(QUOTA_RESET_TZ) >= self.exhausted_until:
+            self.exhausted_until = None
+            return True
+        return False
+
+    def time_to(self, tokens: float) -> float:
+        """Délai avant que le seau contienne `tokens` jetons."""
+        missing = tokens - self.tokens
+        if missing <= 0:
+            return 0.0
+        return missing / self.rate if self.rate else math.inf
+
+
+class QuotaScheduler:
+    """Planifie les appels à l'API YouTube selon leur coût en quota.
+
+    Chaque clé d'API a son propre seau à jetons ; chaque appel est attribué à
+    la clé qui dispose du plus de quota. Les appels de la file de fond ne
+    peuvent pas entamer la réserve destinée aux analyses interactives, et
+    cèdent la place dès qu'un appel interactif attend. Un appel qui ne peut
+    pas être servi dans le délai d'attente de sa file lève QuotaExhausted.
+
+    Si un QuotaLedger est fourni (par défaut, sauf YOUTUBE_QUOTA_PATH vide),
+    la consommation du jour est persistée et reprise au démarrage.
+    """
+
+    def __init__(self,
+                 keys: Optional[List[str]] = None,
+                 daily_quota: Optional[int] = None,
+                 burst: Optional[int] = None,
+                 interactive_reserve: Optional[int] = None,
+                 max_wait: Optional[Dict[str, float]] = None,
+                 ledger: Optional[QuotaLedger] = None):
+        if keys is None:
+            keys = [key.strip() for key in os.getenv('YOUTUBE_API_KEYS', '').split(',') if key.strip()]
+            if not keys and os.getenv('YOUTUBE_API_KEY'):
+                keys = [os.getenv('YOUTUBE_API_KEY')]
+        self.daily_quota = daily_quota or int(os.getenv('YOUTUBE_DAILY_QUOTA', 10000))
+        burst = burst or int(os.getenv('YOUTUBE_QUOTA_BURST', self.daily_quota // 5))
+        self.interactive_reserve = (
+            interactive_reserve if interactive_reserve is not None
+            else int(os.getenv('YOUTUBE_QUOTA_INTERACTIVE_RESERVE', burst // 5))
+        )
+        self.max_wait = max_wait or {
+            INTERACTIVE: float(os.getenv('YOUTUBE_QUOTA_MAX_WAIT', 5)),
+            BACKGROUND: float(os.getenv('YOUTUBE_QUOTA_BACKGROUND_MAX_WAIT', 300)),
+        }
+        if ledger is None and os.getenv('YOUTUBE_QUOTA_PATH', '.cache/youtube_quota.sqlite'):
+            try:
+                ledger = QuotaLedger()
+            except sqlite3.Error as e:
+                logger.warning(f"Consommation de quota non persistée: {e}")
+        self.ledger = ledger
+        self.buckets: Dict[str, KeyBucket] = {
+            key: KeyBucket(key, self.daily_quota, burst, ledger.spent(key) if ledger else 0) for key in keys
+        }
+
+        self._lock = threading.Lock()
+        self._waiting = {INTERACTIVE: 0, BACKGROUND: 0}
+        self.units_by_endpoint: Dict[str, int] = {}
+        self.waits = 0
+        self.rejected = 0
+
+    @property
+    def keys(self) -> List[str]:
+        return list(self.buckets)
+
+    def _try_acquire(self, endpoint: str, priority: str, exclude: Iterable[str]) -> Tuple[Optional[str], float]:
+        """Réserve le coût de l'appel sur une clé ; sinon retourne le délai d'attente estimé."""
+        cost = quota_cost(endpoint)
+        floor = self.interactive_reserve if priority == BACKGROUND else 0
+        now = time.monotonic()
+        with self._lock:
+            if priority == BACKGROUND and self._waiting[INTERACTIVE]:
+                return None, 0.1
+
+            # Une clé dont la rafale ne couvre pas le coût (plus la réserve) ne pourra jamais servir l'appel
+            candidates = [
+                bucket for key, bucket in self.buckets.items()
+                if key not in exclude and bucket.available() and bucket.capacity - floor >= cost
+            ]
+            if not candidates:
+                return None, math.inf
+            for bucket in candidates:
+                bucket.refill(now)
+
+            bucket = max(candidates, key=lambda candidate: candidate.tokens)
+            if bucket.tokens - cost < floor:
+                return None, min(candidate.time_to(cost + floor) for candidate in candidates)
+
+            bucket.tokens -= cost
+            bucket.units_spent += cost
+            bucket.calls += 1
+            self.units_by_endpoint[endpoint] = self.units_by_endpoint.get(endpoint, 0) + cost
+            if self.ledger:
+                self.ledger.add(bucket.key, cost)
+            return bucket.key, 0.0
+
+    def _reject(self, endpoint: str, priority: str):
+        with self._lock:
+            self.rejected += 1
+        raise QuotaExhausted(f"Quota YouTube insuffisant pour {endpoint} (file {priority})")
+
+    @staticmethod
+    def _charge_reservation(endpoint: str) -> Optional[QuotaReservation]:
+        """Débite l'appel sur la réservation du contexte courant, s'il y en a une."""
+        reservation = current_reservation.get()
+        if reservation:
+            reservation.charge(quota_cost(endpoint))
+        return reservation
+
+    async def acquire(self, endpoint: str, priority: Optional[str] = None, exclude: Iterable[str] = ()) -> str:
+        """Attend qu'une clé puisse payer l'appel et retourne cette clé."""
+        priority = priority or current_priority.get()
+        deadline = time.monotonic() + self.max_wait[priority]
+        reservation = self._charge_reservation(endpoint)
+        with self._lock:
+            self._waiting[priority] += 1
+        try:
+            while True:
+                key, wait = self._try_acquire(endpoint, priority, exclude)
+                if key:
+                    if self.ledger and self.ledger.flush_due():
+                        await asyncio.to_thread(self.ledger.flush)
+                    return key
+                if time.monotonic() + wait > deadline:
+                    self._reject(endpoint, priority)
+                self.waits += 1
+                await asyncio.sleep(min(wait, 1.0))
+        except BaseException:
+            if reservation:
+                reservation.refund(quota_cost(endpoint))
+            raise
+        finally:
+            with self._lock:
+                self._waiting[priority] -= 1
+
+    def mark_exhausted(self, key: str):
+        """Retire une clé jusqu'à la remise à zéro du quota, après un refus quotaExceeded de l'API."""
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            return
+        now = datetime.now(QUOTA_RESET_TZ)
+        with self._lock:
+            bucket.tokens = 0.0
+            bucket.exhausted_until = datetime.combine(
+                now.date() + timedelta(days=1), datetime.min.time(), tzinfo=QUOTA_RESET_TZ
+            )
+        logger.warning(f"Quota épuisé pour la clé {bucket.label} jusqu'à {bucket.exhausted_until.isoformat()}")
+        if self.ledger:
+            self.ledger.mark_exhausted(key, self.daily_quota)
+
+    def flush(self):
+        """Écrit la consommation en attente (bloquant, à appeler hors de la boucle)."""
+        if self.ledger:
+            self.ledger.flush()
+
+    def stats(self) -> Dict:
+        now = time.monotonic()
+        with self._lock:
+            keys = []
+            for bucket in self.buckets.values():
+                bucket.refill(now)
+                keys.append({
+                    'key': bucket.label,
+                    'remaining_units': 0 if not bucket.available() else int(bucket.tokens),
+                    'capacity': bucket.capacity,
+                    'refill_per_hour': round(bucket.rate * 3600, 1),
+                    'units_spent': bucket.units_spent,
+                    'calls': bucket.calls,
+                    'exhausted_until': bucket.exhausted_until.isoformat() if bucket.exhausted_until else None
+                })
+            return {
+                'daily_quota_per_key': self.daily_quota,
+                'remaining_units': sum(key['remaining_units'] for key in keys),
+                'interactive_reserve': self.interactive_reserve,
+                'keys': keys,
+                'units_by_endpoint': dict(self.units_by_endpoint),
+                'waiting': dict(self._waiting),
+                'waits': self.waits,
+                'rejected': self.rejected
+            }
+
+
+_default_scheduler: Optional[QuotaScheduler] = None
+_default_lock = threading.Lock()
+
+
+def get_scheduler() -> QuotaScheduler:
+    """Planificateur partagé par tous les clients de l'API (les seaux doivent être communs)."""
+    global _default_scheduler
+    with _default_lock:
+        if _default_scheduler is None:
+            _default_scheduler = QuotaScheduler()
+        return _default_scheduler
+
+
+def is_quota_error(status: int, body: str) -> bool:
+    """Indique si une erreur de l'API correspond à un dépassement de quota."""
+    return status == 403 and ('quotaExceeded' in body or 'dailyLimitExceeded' in body)
@@ -1,18 +1,53 @@
-from typing import List, Dict
+from typing import List, Dict, Optional
+import asyncio
 import json
 import logging
 import os
+import random
 from dotenv import load_dotenv
-from together import Together
+from together import AsyncTogether
+from together import error as together_error
+from src.services.llm_cache import LLMResponseCache
+from src.utils.metrics import timer
 
 load_dotenv()
 
+MODEL = "meta-llama/Llama-3.3-70B-Instruct-Turbo"
+GENERATION_PARAMS = {'temperature': 0.7, 'max_tokens': 1000}
+SYSTEM_PROMPT = """Tu es un expert en analyse de contenu YouTube et en stratégie de création de contenu.
+Ta mission est d'analyser les données d'une chaîne YouTube et les opportunités de contenu identifiées pour suggérer des idées de vidéos pertinentes.
+Tu dois tenir compte du style de la chaîne, de sa taille, et des opportunités spécifiques identifiées.
+Tes suggestions doivent être précises, réalisables et alignées avec les opportunités de contenu identifiées.
+Tu dois TOUJOURS répondre en format JSON valide selon le schéma demandé."""
+
+# Erreurs transitoires pour lesquelles l'appel est retenté
+RETRYABLE_ERRORS = (
+    together_error.RateLimitError,
+    together_error.ServiceUnavailableError,
+    together_error.Timeout,
+    together_error.APIConnectionError,
+    asyncio.TimeoutError,
+)
+
 class AIService:
-    def __init__(self):
+    def __init__(self,
+                 cache: Optional[LLMResponseCache] = None,
+                 timeout: Optional[float] = None,
+                 max_concurrency: Optional[int] = None,
+                 max_retries: Optional[int] = None,
+                 initial_backoff: Optional[float] = None):
         self.api_key = os.getenv('TOGETHER_API_KEY')
         if not self.api_key:
             raise ValueError("TOGETHER_API_KEY non définie dans les variables d'environnement")
-        self.client = Together()
+        self.timeout = timeout or float(os.getenv('LLM_TIMEOUT', 60))
+        self.max_retries = max_retries if max_retries is not None else int(os.getenv('LLM_MAX_RETRIES', 3))
+        self.initial_backoff = initial_backoff or float(os.getenv('LLM_RETRY_BACKOFF', 1.0))
+        # Les nouvelles tentatives sont gérées ici, avec jitter, plutôt que par le client
+        self.client = AsyncTogether(api_key=self.api_key, timeout=self.timeout, max_retries=0)
+        self._semaphore = asyncio.Semaphore(max_concurrency or int(os.getenv('LLM_MAX_CONCURRENCY', 4)))
+        if cache is None and os.getenv('LLM_CACHE_ENABLED', 'true').lower() != 'false':
+            cache = LLMResponseCache()
+        self.cache = cache
 
     async def generate_content_suggestions(self, 
                                         channel_data: Dict,
@@ -20,7 +55,7 @@ class AIService:
         """Génère des suggestions de contenu personnalisées."""
         try:
             prompt = self._create_suggestion_prompt(channel_data, content_gaps)
-            response = self._get_ai_response(prompt)
+            response = await self._get_ai_response(prompt)
             return self._parse_ai_suggestions(response)
         except Exception as e:
             logging.error(f"Erreur lors de la génération des suggestions: {e}")
@@ -32,35 +67,63 @@ class AIService:
         """Analyse la concurrence pour un sujet donné."""
         try:
             prompt = self._create_competition_prompt(topic, existing_videos)
-            response = self._get_ai_response(prompt)
+            response = await self._get_ai_response(prompt)
             return self._parse_competition_analysis(response)
         except Exception as e:
             logging.error(f"Erreur lors de l'analyse de la concurrence: {e}")
             return {}
 
-    def _get_ai_response(self, prompt: str) -> str:
-        """Obtient une réponse via l'API Together.ai."""
+    async def _get_ai_response(self, prompt: str) -> str:
+        """Obtient une réponse via l'API Together.ai, en passant par le cache."""
+        messages = [
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": prompt}
+        ]
+        if not self.cache:
+            return await self._complete(messages)
+
+        key = LLMResponseCache.make_key(MODEL, GENERATION_PARAMS, messages)
+        return await self.cache.get_or_compute(key, lambda: self._complete(messages))
+
+    async def _complete(self, messages: List[Dict]) -> str:
+        """Appel direct au modèle, avec délai maximal et nouvelles tentatives sur les erreurs transitoires."""
+        for attempt in range(self.max_retries + 1):
+            try:
+                async with self._semaphore:
+                    with timer('together', 'chat_completion'):
+                        response = await asyncio.wait_for(
+                            self.client.chat.completions.create(
+                                model=MODEL,
+                                messages=messages,
+                                **GENERATION_PARAMS
+                            ),
+                            timeout=self.timeout
+                        )
+                return response.choices[0].message.content
+            except Exception as e:
+                if attempt == self.max_retries or not self._is_retryable(e):
+                    logging.error(f"Erreur API Together: {e}")
+                    raise
+                delay = self._retry_delay(attempt, e)
+                logging.warning(f"Erreur API Together ({e}), nouvelle tentative dans {delay:.1f}s")
+                await asyncio.sleep(delay)
+
+    @staticmethod
+    def _is_retryable(e: Exception) -> bool:
+        if isinstance(e, RETRYABLE_ERRORS):
+            return True
+        # Erreurs 5xx renvoyées sous forme d'APIError générique
+        return isinstance(e, together_error.APIError) and (e.http_status or 0) >= 500
+
+    def _retry_delay(self, attempt: int, e: Exception) -> float:
+        """Backoff exponentiel avec jitter complet, en respectant Retry-After s'il est fourni."""
+        delay = random.uniform(0, self.initial_backoff * 2 ** attempt)
+        headers = getattr(e, 'headers', None)
+        retry_after = headers.get('retry-after') if hasattr(headers, 'get') else None
         try:
-            response = self.client.chat.completions.create(
-                model="meta-llama/Llama-3.3-70B-Instruct-Turbo",
-                messages=[
-                    {
-                        "role": "system",
-                        "content": """Tu es un expert en analyse de contenu YouTube et en stratégie de création de contenu.
-Ta mission est d'analyser les données d'une chaîne YouTube et les opportunités de contenu identifiées pour suggérer des idées de vidéos pertinentes.
-Tu dois tenir compte du style de la chaîne, de sa taille, et des opportunités spécifiques identifiées.
-Tes suggestions doivent être précises, réalisables et alignées avec les opportunités de contenu identifiées.
-Tu dois TOUJOURS répondre en format JSON valide selon le schéma demandé."""
-                    },
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.7,
-                max_tokens=1000
-            )
-            return response.choices[0].message.content
-        except Exception as e:
-            logging.error(f"Erreur API Together: {e}")
-            raise
+            return max(delay, float(retry_after)) if retry_after else delay
+        except ValueError:
+            return delay
 
     def _create_suggestion_prompt(self, 
                                 channel_data: Dict, 
@@ -164,14 +227,14 @@ Réponds UNIQUEMENT avec un JSON valide au format suivant, sans texte avant ou a
         4. Suggestions d'approches uniques
 
         Réponds uniquement avec un JSON au format suivant:
-        {
-            "market_analysis": {
+        {{
+            "market_analysis": {{
                 "saturation_level": "élevé/moyen/faible",
                 "unexplored_angles": ["angle 1", "angle 2"],
                 "differentiators": ["différenciateur 1", "différenciateur 2"],
                 "recommendations": ["recommandation 1", "recommandation 2"]
-            }
-        }
+            }}
+        }}
         """
 
     def _parse_competition_analysis(self, response: str) -> Dict:
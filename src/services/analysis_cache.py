@@ -0,0 +1,108 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+FRESH = 'HIT'
+STALE = 'STALE'
+
+
+@dataclass
+class CachedAnalysis:
+    channel_id: str
+    version: str
+    etag: str
+    body: bytes
+    created_at: float
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.created_at
+
+
+class AnalysisResponseCache:
+    """Cache en mémoire des réponses d'analyse de chaîne, déjà sérialisées.
+
+    Une entrée n'est valable que pour une version des données de la chaîne
+    (dernière vidéo connue et date du dernier rafraîchissement des
+    statistiques) : dès qu'une synchronisation enregistre un nouveau
+    watermark, l'entrée est ignorée. Au-delà de `ttl`, une entrée reste
+    servie comme périmée pendant `stale_ttl` secondes, le temps qu'un
+    rafraîchissement en arrière-plan la remplace.
+    """
+
+    def __init__(self,
+                 ttl: Optional[int] = None,
+                 stale_ttl: Optional[int] = None,
+                 max_entries: Optional[int] = None):
+        self.ttl = ttl if ttl is not None else int(os.getenv('ANALYSIS_CACHE_TTL', 15 * 60))
+        self.stale_ttl = stale_ttl if stale_ttl is not None else int(os.getenv('ANALYSIS_CACHE_STALE_TTL', 24 * 3600))
+        self.max_entries = max_entries or int(os.getenv('ANALYSIS_CACHE_SIZE', 1000))
+        self._entries: "OrderedDict[str, CachedAnalysis]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def make_version(sync_state: Optional[Dict]) -> Optional[str]:
+        """Version des données d'une chaîne d'après son watermark de synchronisation."""
+        if not sync_state:
+            return None
+        return f"{sync_state.get('last_video_id')}:{sync_state.get('synced_at')}"
+
+    def get(self, channel_id: str, version: Optional[str]) -> Tuple[Optional[CachedAnalysis], Optional[str]]:
+        """Retourne (entrée, FRESH | STALE), ou (None, None) si absente, expirée ou d'une autre version."""
+        with self._lock:
+            entry = self._entries.get(channel_id)
+            if entry is None:
+                self.misses += 1
+                return None, None
+            if entry.version != version or entry.age >= self.ttl + self.stale_ttl:
+                del self._entries[channel_id]
+                self.invalidations += 1
+                self.misses += 1
+                return None, None
+            self._entries.move_to_end(channel_id)
+            if entry.age < self.ttl:
+                self.hits += 1
+                return entry, FRESH
+            self.stale_hits += 1
+            return entry, STALE
+
+    def set(self, channel_id: str, version: str, response: Dict) -> CachedAnalysis:
+        body = json.dumps(response, ensure_ascii=False, default=str).encode('utf-8')
+        entry = CachedAnalysis(
+            channel_id=channel_id,
+            version=version,
+            etag='"' + hashlib.sha256(body).hexdigest()[:32] + '"',
+            body=body,
+            created_at=time.time()
+        )
+        with self._lock:
+            self._entries[channel_id] = entry
+            self._entries.move_to_end(channel_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+    def max_age(self, entry: CachedAnalysis) -> int:
+        """Durée de fraîcheur restante, pour l'en-tête Cache-Control."""
+        return max(0, int(self.ttl - entry.age))
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'max_entries': self.max_entries,
+            'hits': self.hits,
+            'stale_hits': self.stale_hits,
+            'misses': self.misses,
+            'invalidations': self.invalidations,
+            'hit_rate': (self.hits + self.stale_hits) / lookups if lookups else 0.0
+        }
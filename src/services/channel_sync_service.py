@@ -0,0 +1,64 @@
+from datetime import datetime, timezone
+from typing import Dict, List
+import asyncio
+import logging
+
+from src.scrapers.async_youtube_scraper import AsyncYouTubeScraper
+from src.services.storage_backend import StorageBackend
+
+logger = logging.getLogger(__name__)
+
+
+class ChannelSyncService:
+    """Synchronise incrémentalement les vidéos d'une chaîne avec l'index."""
+
+    def __init__(self, scraper: AsyncYouTubeScraper, storage: StorageBackend):
+        self.scraper = scraper
+        self.storage = storage
+
+    async def sync_channel(self, channel_id: str, max_results: int = 50, full_refresh: bool = False) -> List[Dict]:
+        """Retourne les `max_results` vidéos les plus récentes de la chaîne.
+
+        Seules les vidéos publiées depuis la dernière synchronisation sont
+        téléchargées en entier ; les vidéos déjà indexées ne voient que leurs
+        statistiques rafraîchies.
+        """
+        known_videos = [] if full_refresh else await asyncio.to_thread(
+            self.storage.get_channel_videos, channel_id, size=max_results
+        )
+        if not known_videos:
+            videos = await self.scraper.get_channel_videos(channel_id, max_results=max_results)
+            await asyncio.to_thread(self._save_watermark, channel_id, videos, len(videos), 0)
+            return videos
+
+        known_ids = [video['video_id'] for video in known_videos]
+        result = await self.scraper.sync_channel_videos(channel_id, known_ids, max_results=max_results)
+        new_videos = result['new_videos']
+        statistics = result['statistics']
+
+        await asyncio.to_thread(self.storage.update_video_statistics, statistics)
+
+        refreshed = [
+            {**video, **statistics.get(video['video_id'], {})}
+            for video in known_videos
+        ]
+        videos = (new_videos + refreshed)[:max_results]
+        logger.debug(
+            f"Synchronisation de {channel_id}: {len(new_videos)} nouvelles vidéos, "
+            f"{len(statistics)} statistiques rafraîchies"
+        )
+        await asyncio.to_thread(self._save_watermark, channel_id, videos, len(new_videos), len(statistics))
+        return videos
+
+    def _save_watermark(self, channel_id: str, videos: List[Dict], new_count: int, refreshed_count: int):
+        if not videos:
+            return
+        # La liste est ordonnée de la plus récente à la plus ancienne
+        latest = videos[0]
+        self.storage.save_sync_state(channel_id, {
+            'last_video_id': latest.get('video_id', latest.get('id')),
+            'last_published_at': latest['published_at'],
+            'synced_at': datetime.now(timezone.utc).isoformat(),
+            'new_videos': new_count,
+            'refreshed_videos': refreshed_count
+        })
@@ -0,0 +1,154 @@
+import asyncio
+import logging
+import math
+import os
+from typing import Dict, List, Optional, Tuple
+
+from src.analyzers.competitor_analyzer import CompetitorAnalyzer
+from src.scrapers.async_youtube_scraper import AsyncYouTubeScraper
+from src.scrapers.quota_scheduler import QuotaBudget, quota_cost, quota_reservation
+from src.services.channel_sync_service import ChannelSyncService
+from src.services.storage_backend import StorageBackend
+
+logger = logging.getLogger(__name__)
+
+
+class CompetitorComparisonService:
+    """Compare plusieurs chaînes : récupération concurrente, analyse multi-cœurs et comparaison.
+
+    Le nombre de chaînes récupérées simultanément est borné, et chaque chaîne
+    réserve son coût attendu sur un budget de quota avant d'être récupérée :
+    les chaînes qui dépassent le budget sont ignorées plutôt que d'épuiser le
+    quota journalier. Le budget est débité des unités réellement dépensées,
+    ce qui libère pour les chaînes suivantes ce qui n'a pas été utilisé.
+    """
+
+    def __init__(self,
+                 scraper: AsyncYouTubeScraper,
+                 storage: StorageBackend,
+                 analyzer: CompetitorAnalyzer,
+                 max_concurrency: Optional[int] = None,
+                 quota_budget: Optional[int] = None):
+        self.scraper = scraper
+        self.storage = storage
+        self.analyzer = analyzer
+        self.sync_service = ChannelSyncService(scraper, storage)
+        self.max_concurrency = max_concurrency or int(os.getenv('COMPETITOR_MAX_CONCURRENCY', 5))
+        self.quota_budget = quota_budget or int(os.getenv('COMPETITOR_QUOTA_BUDGET', 1000))
+
+    def estimate_quota_cost(self, identifier: str, identifier_type: str, max_results: int) -> int:
+        """Coût attendu de la récupération d'une chaîne.
+
+        Seule la première étape de résolution est comptée : les replis (dont
+        search.list, 100 unités) sont rares et ne sont prélevés sur le budget
+        que s'ils ont réellement lieu.
+        """
+        resolution = 0
+        if not self.scraper.resolver.lookup(identifier, identifier_type):
+            plan = self.scraper.resolver.lookup_plan(identifier, identifier_type)
+            resolution = quota_cost(plan[0][1]) if plan else 0
+        pages = math.ceil(max_results / 50)
+        return (
+            resolution
+            + quota_cost('channels.list')
+            + pages * (quota_cost('playlistItems.list') + quota_cost('videos.list'))
+        )
+
+    async def compare_channels(self,
+                               references: List[Tuple[str, str]],
+                               max_results: int = 50,
+                               quota_budget: Optional[int] = None) -> Dict:
+        """Compare les chaînes désignées par des couples (identifiant, type d'identifiant)."""
+        budget = QuotaBudget(quota_budget or self.quota_budget)
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        fetched = await asyncio.gather(*[
+            self._fetch_channel(semaphore, budget, identifier, identifier_type, max_results)
+            for identifier, identifier_type in references
+        ])
+        channels = [channel for channel in fetched if channel['status'] == 'ok']
+        failed = [channel for channel in fetched if channel['status'] == 'error']
+        skipped = [channel for channel in fetched if channel['status'] == 'skipped']
+
+        # Une même chaîne peut être désignée par plusieurs URL
+        unique = {}
+        for channel in channels:
+            unique.setdefault(channel['channel_id'], channel)
+        channels = list(unique.values())
+
+        analyses = await self.analyzer.analyze_channels({
+            channel['channel_id']: channel['videos'] for channel in channels
+        })
+        for channel in channels:
+            channel['analysis'], channel['video_features'] = analyses[channel['channel_id']]
+
+        await asyncio.gather(*[asyncio.to_thread(self._index_channel, channel) for channel in channels])
+
+        comparison = self.analyzer.compare(channels)
+        return {
+            'channels': [self._channel_summary(channel) for channel in channels] + failed + skipped,
+            'comparison': comparison['metrics'],
+            'shared_topics': comparison['shared_topics'],
+            'cross_channel_gaps': comparison['cross_channel_gaps'],
+            'quota': {'budget': budget.units, 'spent_units': budget.spent}
+        }
+
+    async def _fetch_channel(self, semaphore: asyncio.Semaphore, budget: QuotaBudget, identifier: str,
+                             identifier_type: str, max_results: int) -> Dict:
+        async with semaphore:
+            # Réservée au moment de la récupération : les unités non dépensées par les
+            # chaînes précédentes sont déjà revenues au budget.
+            # L'estimation consulte l'index SQLite des chaînes : elle est faite hors de la boucle
+            cost = await asyncio.to_thread(self.estimate_quota_cost, identifier, identifier_type, max_results)
+            reservation = budget.reserve(cost)
+            if reservation is None:
+                return {'identifier': identifier, 'status': 'skipped', 'error': 'Budget de quota épuisé'}
+            try:
+                with quota_reservation(reservation):
+                    channel_info = await self.scraper.get_channel_info(identifier, identifier_type)
+                    videos = await self.sync_service.sync_channel(channel_info['id'], max_results=max_results)
+            except Exception as e:
+                logger.error(f"Erreur lors de la récupération de {identifier}: {e}")
+                return {'identifier': identifier, 'status': 'error', 'error': str(e)}
+        return {
+            'identifier': identifier,
+            'status': 'ok',
+            'channel_id': channel_info['id'],
+            'channel_info': channel_info,
+            'videos': videos
+        }
+
+    def _index_channel(self, channel: Dict):
+        """Indexe les vidéos des concurrents pour enrichir la recherche d'opportunités."""
+        self.storage.bulk_index_videos([
+            {
+                **video,
+                'channel_id': channel['channel_id'],
+                'engagement_rate': features.get('engagement_rate', 0.0),
+                'keywords': features.get('keywords', []),
+                'analysis': features
+            }
+            for video, features in zip(channel['videos'], channel['video_features'])
+        ])
+
+    @staticmethod
+    def _channel_summary(channel: Dict) -> Dict:
+        channel_info = channel['channel_info']
+        analysis = channel['analysis']
+        return {
+            'identifier': channel['identifier'],
+            'status': 'ok',
+            'channel_id': channel['channel_id'],
+            'title': channel_info.get('title', ''),
+            'subscriber_count': int(channel_info.get('subscriber_count', 0)),
+            'video_count': int(channel_info.get('video_count', 0)),
+            'view_count': int(channel_info.get('view_count', 0)),
+            'analyzed_videos': len(channel['videos']),
+            'performance_metrics': {
+                key: value for key, value in analysis.get('performance_metrics', {}).items()
+                if key != 'top_performing_videos'
+            },
+            'average_engagement_rate': analysis.get('engagement_analysis', {}).get('average_engagement_rate', 0.0),
+            'temporal_patterns': analysis.get('temporal_patterns', {}),
+            'common_keywords': analysis.get('content_patterns', {}).get('common_keywords', [])
+        }
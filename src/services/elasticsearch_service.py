@@ -1,13 +1,25 @@
-from elasticsearch import Elasticsearch
-from typing import Dict, List
+from elasticsearch import Elasticsearch, helpers
+from typing import Dict, Iterable, List, Optional, Tuple
+from collections import OrderedDict
+import copy
 import os
-from datetime import datetime
+import threading
+import time
 import logging
-from elasticsearch.exceptions import ConnectionError
+from elasticsearch.exceptions import ConflictError, ConnectionError, NotFoundError
+from src.analyzers.channel_summary import ChannelSummary
+from src.analyzers.gap_ranker import rank_content_gaps
+from src.services.storage_backend import StorageBackend, TOPIC_SOURCE_FIELDS
+from src.utils.metrics import timed
 
 logger = logging.getLogger(__name__)
 
-class ElasticsearchService:
+# Champs d'une vidéo nécessaires au résumé de sa chaîne
+SUMMARY_SOURCE_FIELDS = ['channel_id', 'view_count', 'like_count', 'comment_count', 'keywords', 'published_at']
+
+class ElasticsearchService(StorageBackend):
+    name = 'elasticsearch'
+
     def __init__(self):
         elasticsearch_url = os.getenv('ELASTICSEARCH_URL')
         if not elasticsearch_url:
@@ -23,8 +35,23 @@ class ElasticsearchService:
             raise ConnectionError(f"Erreur de connexion à Elasticsearch: {str(e)}")
             
         self.index_name = 'youtube_content'
+        self.sync_index_name = 'youtube_channel_sync'
+        self.summary_index_name = 'youtube_channel_summaries'
+        self.summary_max_retries = int(os.getenv('CHANNEL_SUMMARY_MAX_RETRIES', 5))
+        self.bulk_chunk_size = int(os.getenv('ES_BULK_CHUNK_SIZE', 500))
+        self.topic_cache_ttl = int(os.getenv('TOPIC_SEARCH_CACHE_TTL', 300))
+        self.topic_cache_size = int(os.getenv('TOPIC_SEARCH_CACHE_SIZE', 1000))
+        # Partagé par les threads de travail : accès sous verrou, résultats copiés à l'entrée et à la sortie
+        self._topic_cache: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self._topic_cache_lock = threading.Lock()
         self._create_index_if_not_exists()
 
+    def ping(self) -> bool:
+        return self.es.ping()
+
+    def close(self):
+        self.es.close()
+
     def _create_index_if_not_exists(self):
         """Crée l'index avec le mapping approprié s'il n'existe pas."""
         try:
@@ -65,66 +92,484 @@ class ElasticsearchService:
                     }
                 }
                 self.es.indices.create(index=self.index_name, body=mapping)
+
+            if not self.es.indices.exists(index=self.sync_index_name):
+                self.es.indices.create(index=self.sync_index_name, body={
+                    "mappings": {
+                        "properties": {
+                            "channel_id": {"type": "keyword"},
+                            "last_video_id": {"type": "keyword"},
+                            "last_published_at": {"type": "date"},
+                            "synced_at": {"type": "date"},
+                            "new_videos": {"type": "integer"},
+                            "refreshed_videos": {"type": "integer"}
+                        }
+                    }
+                })
+
+            if not self.es.indices.exists(index=self.summary_index_name):
+                self.es.indices.create(index=self.summary_index_name, body={
+                    "mappings": {
+                        "properties": {
+                            "channel_id": {"type": "keyword"},
+                            "video_count": {"type": "integer"},
+                            "average_views": {"type": "double"},
+                            "median_views": {"type": "double"},
+                            "p90_views": {"type": "double"},
+                            "average_likes": {"type": "double"},
+                            "average_comments": {"type": "double"},
+                            "average_engagement_rate": {"type": "float"},
+                            "median_engagement_rate": {"type": "float"},
+                            "total_views": {"type": "long"},
+                            "first_published_at": {"type": "date"},
+                            "last_published_at": {"type": "date"},
+                            "posting_frequency": {"type": "keyword"},
+                            "top_keywords": {"type": "keyword"},
+                            "updated_at": {"type": "date"},
+                            # Sommes et sketches servant aux mises à jour incrémentales, non indexés
+                            "state": {"type": "object", "enabled": False}
+                        }
+                    }
+                })
         except Exception as e:
             logger.error(f"Erreur lors de la création de l'index: {str(e)}")
             raise
 
+    @timed('elasticsearch')
     def index_video(self, video_data: Dict):
         """Indexe une vidéo dans Elasticsearch."""
         try:
-            # Vérifier et nettoyer les données
-            if 'id' in video_data and 'video_id' not in video_data:
-                video_data['video_id'] = video_data['id']
-            
-            if 'video_id' not in video_data:
-                raise ValueError("L'ID de la vidéo est manquant")
+            document = self._prepare_video_document(video_data)
+            previous = self._get_summary_sources([document['video_id']])
+            self.es.index(
+                index=self.index_name,
+                id=document['video_id'],
+                document=document
+            )
+            self._update_channel_summaries([(previous.get(document['video_id']), document)])
+        except Exception as e:
+            logger.error(f"Erreur lors de l'indexation: {e}")
+            raise
 
-            # S'assurer que les champs numériques sont des nombres
-            for field in ['view_count', 'like_count', 'comment_count']:
-                if field in video_data and not isinstance(video_data[field], (int, float)):
-                    video_data[field] = int(video_data[field])
+    @timed('elasticsearch')
+    def bulk_index_videos(self,
+                          videos: List[Dict],
+                          chunk_size: Optional[int] = None,
+                          refresh: bool = True,
+                          max_retries: int = 3,
+                          initial_backoff: float = 2) -> Dict:
+        """Indexe un lot de vidéos via l'API bulk.
 
-            # Formater la date si présente
-            if 'published_at' in video_data:
+        Les chunks rejetés (HTTP 429) sont retentés avec un backoff exponentiel ;
+        l'index n'est rafraîchi qu'une seule fois, à la fin. Les résumés des
+        chaînes concernées sont ensuite mis à jour avec les seules vidéos
+        indexées. Retourne le nombre de documents indexés et les erreurs par
+        document.
+        """
+        errors = []
+        documents: Dict[str, Dict] = {}
+
+        def actions():
+            for video in videos:
                 try:
-                    video_data['published_at'] = datetime.fromisoformat(
-                        video_data['published_at'].replace('Z', '+00:00')
-                    ).isoformat()
+                    document = self._prepare_video_document(video)
                 except Exception as e:
-                    logger.warning(f"Erreur de conversion de la date: {e}")
+                    errors.append({'video_id': video.get('video_id', video.get('id')), 'error': str(e)})
+                    continue
+                documents[document['video_id']] = document
+                yield {
+                    '_op_type': 'index',
+                    '_index': self.index_name,
+                    '_id': document['video_id'],
+                    '_source': document
+                }
 
-            self.es.index(
-                index=self.index_name,
-                id=video_data['video_id'],
-                document=video_data
+        indexed = []
+        try:
+            bulk_actions = list(actions())
+            previous = self._get_summary_sources(list(documents))
+            for ok, item in helpers.streaming_bulk(
+                self.es,
+                bulk_actions,
+                chunk_size=chunk_size or self.bulk_chunk_size,
+                max_retries=max_retries,
+                initial_backoff=initial_backoff,
+                raise_on_error=False,
+                raise_on_exception=False
+            ):
+                result = item.get('index', {})
+                if ok:
+                    indexed.append(result.get('_id'))
+                else:
+                    errors.append({'video_id': result.get('_id'), 'error': result.get('error')})
+
+            if refresh and indexed:
+                self.es.indices.refresh(index=self.index_name)
+            self._update_channel_summaries(
+                (previous.get(video_id), documents[video_id]) for video_id in indexed if video_id in documents
             )
         except Exception as e:
-            logger.error(f"Erreur lors de l'indexation: {e}")
+            logger.error(f"Erreur lors de l'indexation en masse: {e}")
             raise
 
-    def find_content_gaps(self, channel_id: str) -> List[Dict]:
-        """Trouve les opportunités de contenu basées sur les données existantes."""
+        if errors:
+            logger.warning(f"{len(errors)} vidéos n'ont pas pu être indexées")
+        return {'indexed': len(indexed), 'errors': errors}
+
+    @timed('elasticsearch')
+    def find_content_gaps(self, channel_id: str, size: int = 20) -> List[Dict]:
+        """Trouve les opportunités de contenu en comparant la chaîne au reste du corpus indexé.
+
+        Le calcul est fait côté Elasticsearch : significant_terms fait ressortir
+        les mots-clés surreprésentés chez les autres chaînes par rapport à
+        l'ensemble de l'index (donc sous-représentés sur cette chaîne), et un
+        agrégat terms ajoute les sujets qui cumulent le plus de vues. Seule une
+        liste compacte {topic, potential, competition, score} est renvoyée.
+        """
         try:
-            # Rechercher les vidéos les plus performantes
-            query = {
-                "bool": {
-                    "must": [
-                        {"term": {"channel_id": channel_id}}
-                    ]
-                }
+            topic_metrics = {
+                "avg_views": {"avg": {"field": "view_count"}},
+                "avg_engagement": {"avg": {"field": "engagement_rate"}},
+                "channels": {"cardinality": {"field": "channel_id"}}
             }
-            
             response = self.es.search(
                 index=self.index_name,
                 body={
-                    "query": query,
-                    "size": 50,
-                    "sort": [{"view_count": "desc"}]
+                    "size": 0,
+                    "aggs": {
+                        "channel": {
+                            "filter": {"term": {"channel_id": channel_id}},
+                            "aggs": {
+                                "avg_views": {"avg": {"field": "view_count"}},
+                                "keywords": {
+                                    "terms": {"field": "keywords", "size": 1000},
+                                    "aggs": topic_metrics
+                                }
+                            }
+                        },
+                        "corpus": {
+                            "filter": {"bool": {"must_not": [{"term": {"channel_id": channel_id}}]}},
+                            "aggs": {
+                                "channels": {"cardinality": {"field": "channel_id"}},
+                                "significant": {
+                                    "significant_terms": {"field": "keywords", "size": 50, "min_doc_count": 2},
+                                    "aggs": topic_metrics
+                                },
+                                "popular": {
+                                    "terms": {
+                                        "field": "keywords",
+                                        "size": 50,
+                                        "order": {"total_views": "desc"}
+                                    },
+                                    "aggs": {**topic_metrics, "total_views": {"sum": {"field": "view_count"}}}
+                                }
+                            }
+                        }
+                    }
                 }
             )
             
-            hits = response.get('hits', {}).get('hits', [])
-            return [hit['_source'] for hit in hits]
+            aggs = response.get('aggregations', {})
+            channel_agg = aggs.get('channel', {})
+            corpus_agg = aggs.get('corpus', {})
+            channel_terms = {
+                bucket['key']: bucket['doc_count']
+                for bucket in channel_agg.get('keywords', {}).get('buckets', [])
+            }
+            channel_avg_views = channel_agg.get('avg_views', {}).get('value') or 0.0
+
+            if not corpus_agg.get('doc_count'):
+                # Aucune chaîne concurrente indexée : on classe les sujets de la chaîne elle-même
+                candidates = [
+                    self._gap_candidate(bucket)
+                    for bucket in channel_agg.get('keywords', {}).get('buckets', [])
+                ]
+                return rank_content_gaps(candidates, {}, channel_avg_views, 0, size)
+
+            candidates = {}
+            for bucket in corpus_agg.get('popular', {}).get('buckets', []):
+                candidates[bucket['key']] = self._gap_candidate(bucket)
+            for bucket in corpus_agg.get('significant', {}).get('buckets', []):
+                candidates[bucket['key']] = {
+                    **self._gap_candidate(bucket),
+                    'significance': bucket.get('score', 0.0)
+                }
+
+            return rank_content_gaps(
+                list(candidates.values()),
+                channel_terms,
+                channel_avg_views,
+                corpus_agg.get('channels', {}).get('value', 0),
+                size
+            )
         except Exception as e:
             logger.error(f"Erreur lors de la recherche des content gaps: {e}")
-            return []
\ No newline at end of file
+            return []
+
+    def _gap_candidate(self, bucket: Dict) -> Dict:
+        return {
+            'topic': bucket['key'],
+            'avg_views': bucket.get('avg_views', {}).get('value') or 0.0,
+            'avg_engagement': bucket.get('avg_engagement', {}).get('value') or 0.0,
+            'channels': bucket.get('channels', {}).get('value', 0)
+        }
+
+    def _topic_query(self, topic: str) -> Dict:
+        """Requête BM25 multi-champs (analyseur french) pondérée par les vues et l'engagement."""
+        return {
+            "function_score": {
+                "query": {
+                    "multi_match": {
+                        "query": topic,
+                        "fields": ["title^3", "description"],
+                        "type": "best_fields"
+                    }
+                },
+                "functions": [
+                    {"field_value_factor": {"field": "view_count", "modifier": "log1p", "missing": 0}},
+                    {"field_value_factor": {"field": "engagement_rate", "factor": 10, "modifier": "log1p", "missing": 0}}
+                ],
+                "score_mode": "sum",
+                "boost_mode": "multiply"
+            }
+        }
+
+    @timed('elasticsearch')
+    def search_videos_by_topic(self, topic: str, size: int = 20) -> List[Dict]:
+        """Recherche les vidéos les plus pertinentes pour un sujet (résultats mis en cache quelques minutes)."""
+        cache_key = (topic.strip().lower(), size)
+        with self._topic_cache_lock:
+            cached = self._topic_cache.get(cache_key)
+            if cached and cached[0] > time.time():
+                self._topic_cache.move_to_end(cache_key)
+                return copy.deepcopy(cached[1])
+
+        try:
+            response = self.es.search(
+                index=self.index_name,
+                body={
+                    "query": self._topic_query(topic),
+                    "size": size,
+                    "_source": TOPIC_SOURCE_FIELDS
+                }
+            )
+            videos = [hit['_source'] for hit in response.get('hits', {}).get('hits', [])]
+        except Exception as e:
+            logger.error(f"Erreur lors de la recherche par sujet: {e}")
+            raise
+
+        if self.topic_cache_ttl > 0:
+            entry = (time.time() + self.topic_cache_ttl, copy.deepcopy(videos))
+            with self._topic_cache_lock:
+                self._topic_cache[cache_key] = entry
+                self._topic_cache.move_to_end(cache_key)
+                while len(self._topic_cache) > self.topic_cache_size:
+                    self._topic_cache.popitem(last=False)
+        return videos
+
+    @timed('elasticsearch')
+    def search_videos_by_topic_page(self, topic: str, size: int = 100, cursor: Optional[Dict] = None) -> Dict:
+        """Pagination profonde d'une recherche par sujet (point-in-time + search_after).
+
+        Retourne {'videos': [...], 'cursor': {...}} ; passer le curseur à l'appel
+        suivant pour obtenir la page d'après. Le curseur vaut None à la dernière
+        page, le point-in-time est alors fermé.
+        """
+        try:
+            pit_id = cursor['pit_id'] if cursor else self.es.open_point_in_time(
+                index=self.index_name, keep_alive='1m'
+            )['id']
+            body = {
+                "query": self._topic_query(topic),
+                "size": size,
+                "_source": TOPIC_SOURCE_FIELDS,
+                "pit": {"id": pit_id, "keep_alive": "1m"},
+                "sort": [{"_score": "desc"}, {"_shard_doc": "asc"}]
+            }
+            if cursor:
+                body["search_after"] = cursor['search_after']
+
+            response = self.es.search(body=body)
+            hits = response.get('hits', {}).get('hits', [])
+            pit_id = response.get('pit_id', pit_id)
+
+            if len(hits) < size:
+                self.es.close_point_in_time(id=pit_id)
+                next_cursor = None
+            else:
+                next_cursor = {'pit_id': pit_id, 'search_after': hits[-1]['sort']}
+            return {'videos': [hit['_source'] for hit in hits], 'cursor': next_cursor}
+        except Exception as e:
+            logger.error(f"Erreur lors de la pagination par sujet: {e}")
+            raise
+
+    @timed('elasticsearch')
+    def get_channel_videos(self, channel_id: str, size: int = 50) -> List[Dict]:
+        """Récupère les vidéos déjà indexées d'une chaîne, de la plus récente à la plus ancienne."""
+        try:
+            response = self.es.search(
+                index=self.index_name,
+                body={
+                    "query": {"term": {"channel_id": channel_id}},
+                    "size": size,
+                    "sort": [{"published_at": "desc"}]
+                }
+            )
+            return [hit['_source'] for hit in response.get('hits', {}).get('hits', [])]
+        except Exception as e:
+            logger.error(f"Erreur lors de la récupération des vidéos indexées: {e}")
+            return []
+
+    @timed('elasticsearch')
+    def update_video_statistics(self, statistics: Dict[str, Dict]):
+        """Met à jour uniquement les statistiques des vidéos déjà indexées."""
+        if not statistics:
+            return
+        try:
+            previous = self._get_summary_sources(list(statistics))
+            updates = {
+                video_id: {field: int(value) for field, value in stats.items()}
+                for video_id, stats in statistics.items()
+            }
+            # Le taux d'engagement dépend des statistiques : il est recalculé avec elles
+            for video_id, doc in updates.items():
+                if video_id in previous:
+                    doc['engagement_rate'] = ChannelSummary.engagement_rate({**previous[video_id], **doc})
+            actions = (
+                {
+                    "_op_type": "update",
+                    "_index": self.index_name,
+                    "_id": video_id,
+                    "doc": doc
+                }
+                for video_id, doc in updates.items()
+            )
+            _, failures = helpers.bulk(self.es, actions, raise_on_error=False)
+            failed = {failure.get('update', {}).get('_id') for failure in failures}
+            self._update_channel_summaries(
+                (source, {**source, **updates[video_id]})
+                for video_id, source in previous.items() if video_id not in failed
+            )
+        except Exception as e:
+            logger.error(f"Erreur lors de la mise à jour des statistiques: {e}")
+            raise
+
+    # Résumés par chaîne
+
+    @timed('elasticsearch')
+    def get_channel_summary(self, channel_id: str) -> Optional[Dict]:
+        """Retourne le résumé matérialisé d'une chaîne, sans son état interne."""
+        try:
+            source = self.es.get(index=self.summary_index_name, id=channel_id)['_source']
+        except NotFoundError:
+            return None
+        except Exception as e:
+            logger.error(f"Erreur lors de la lecture du résumé de chaîne: {e}")
+            return None
+        return {field: value for field, value in source.items() if field != 'state'}
+
+    def _get_summary_sources(self, video_ids: List[str]) -> Dict[str, Dict]:
+        """Versions déjà indexées des vidéos, pour retirer leur ancienne contribution des résumés."""
+        sources = {}
+        for start in range(0, len(video_ids), self.bulk_chunk_size):
+            response = self.es.mget(
+                index=self.index_name,
+                ids=video_ids[start:start + self.bulk_chunk_size],
+                source=SUMMARY_SOURCE_FIELDS
+            )
+            sources.update({doc['_id']: doc['_source'] for doc in response.get('docs', []) if doc.get('found')})
+        return sources
+
+    def _update_channel_summaries(self, changes: Iterable[Tuple[Optional[Dict], Dict]]):
+        """Applique aux résumés les couples (ancienne version ou None, nouvelle version) des vidéos.
+
+        Les contributions sont regroupées par chaîne : chaque résumé n'est lu et
+        réécrit qu'une fois par lot.
+        """
+        deltas: Dict[str, Tuple[List[Dict], List[Dict]]] = {}
+        for previous, document in changes:
+            if previous and previous.get('channel_id'):
+                deltas.setdefault(previous['channel_id'], ([], []))[0].append(previous)
+            if document.get('channel_id'):
+                deltas.setdefault(document['channel_id'], ([], []))[1].append(document)
+
+        for channel_id, (removed, added) in deltas.items():
+            try:
+                self._apply_summary_delta(channel_id, removed, added)
+            except Exception as e:
+                # Les vidéos restent indexées : le résumé sera reconstruit à la prochaine absence
+                logger.error(f"Erreur lors de la mise à jour du résumé de {channel_id}: {e}")
+
+    def _apply_summary_delta(self, channel_id: str, removed: List[Dict], added: List[Dict]):
+        """Met à jour un résumé par contrôle de concurrence optimiste (if_seq_no / if_primary_term)."""
+        # Après un conflit sur la création, le résumé créé par l'autre écrivain peut déjà
+        # inclure ce lot : appliquer le delta le compterait deux fois, il est donc reconstruit
+        rebuild = False
+        for _ in range(self.summary_max_retries):
+            try:
+                current = self.es.get(index=self.summary_index_name, id=channel_id)
+            except NotFoundError:
+                current = None
+
+            if current is None or rebuild:
+                # Premier résumé de la chaîne (ou index antérieur aux résumés) : reconstruit
+                # à partir des vidéos indexées, qui incluent déjà ce lot
+                summary = self._rebuild_channel_summary(channel_id)
+            else:
+                summary = ChannelSummary.from_state(channel_id, current['_source'].get('state', {}))
+                for document in removed:
+                    summary.remove_video(document)
+                for document in added:
+                    summary.add_video(document)
+            if current is None:
+                write = {'op_type': 'create'}
+            else:
+                write = {'if_seq_no': current['_seq_no'], 'if_primary_term': current['_primary_term']}
+
+            try:
+                self.es.index(
+                    index=self.summary_index_name,
+                    id=channel_id,
+                    document={**summary.to_document(), 'state': summary.to_state()},
+                    **write
+                )
+                return
+            except ConflictError:
+                logger.info(f"Résumé de {channel_id} modifié en parallèle, nouvelle tentative")
+                rebuild = rebuild or current is None
+        raise RuntimeError(f"Résumé de {channel_id} non mis à jour après {self.summary_max_retries} tentatives")
+
+    def _rebuild_channel_summary(self, channel_id: str) -> ChannelSummary:
+        """Recalcule entièrement le résumé d'une chaîne à partir de ses vidéos indexées."""
+        self.es.indices.refresh(index=self.index_name)
+        summary = ChannelSummary(channel_id)
+        for hit in helpers.scan(
+            self.es,
+            index=self.index_name,
+            query={"query": {"term": {"channel_id": channel_id}}, "_source": SUMMARY_SOURCE_FIELDS}
+        ):
+            summary.add_video(hit['_source'])
+        return summary
+
+    @timed('elasticsearch')
+    def get_sync_state(self, channel_id: str) -> Optional[Dict]:
+        """Retourne le watermark de synchronisation d'une chaîne."""
+        try:
+            return self.es.get(index=self.sync_index_name, id=channel_id)['_source']
+        except NotFoundError:
+            return None
+        except Exception as e:
+            logger.error(f"Erreur lors de la lecture de l'état de synchronisation: {e}")
+            return None
+
+    @timed('elasticsearch')
+    def save_sync_state(self, channel_id: str, state: Dict):
+        """Enregistre le watermark de synchronisation d'une chaîne."""
+        try:
+            self.es.index(
+                index=self.sync_index_name,
+                id=channel_id,
+                document={**state, 'channel_id': channel_id}
+            )
+        except Exception as e:
+            logger.error(f"Erreur lors de l'enregistrement de l'état de synchronisation: {e}")
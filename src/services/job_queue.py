@@ -0,0 +1,157 @@
+import asyncio
+import logging
+import os
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+
+
+class JobQueueFull(Exception):
+    """La file d'attente a atteint sa capacité maximale."""
+
+
+@dataclass
+class Job:
+    key: str
+    params: Dict[str, Any]
+    id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    status: str = QUEUED
+    stages: List[str] = field(default_factory=list)
+    result: Optional[Dict] = None
+    error: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (DONE, FAILED)
+
+    def to_dict(self) -> Dict:
+        return {
+            'job_id': self.id,
+            'key': self.key,
+            'status': self.status,
+            'stages': list(self.stages),
+            'result': self.result,
+            'error': self.error,
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at
+        }
+
+
+class JobQueue:
+    """File de tâches en arrière-plan exécutées par un nombre borné de workers.
+
+    Une soumission pour une clé (ex: ID de chaîne) qui a déjà une tâche en
+    attente ou en cours est rattachée à cette tâche au lieu d'en créer une
+    nouvelle. Les tâches terminées restent consultables pendant `result_ttl`
+    secondes.
+    """
+
+    def __init__(self,
+                 runner: Callable[[Job], Awaitable[Dict]],
+                 workers: Optional[int] = None,
+                 max_queued: Optional[int] = None,
+                 result_ttl: Optional[int] = None):
+        self.runner = runner
+        self.workers = workers or int(os.getenv('JOB_WORKERS', 2))
+        self.max_queued = max_queued or int(os.getenv('JOB_QUEUE_SIZE', 100))
+        self.result_ttl = result_ttl if result_ttl is not None else int(os.getenv('JOB_RESULT_TTL', 3600))
+
+        self._jobs: Dict[str, Job] = {}
+        self._active: Dict[str, Job] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+
+        self.submitted = 0
+        self.deduplicated = 0
+        self.completed = 0
+        self.failed = 0
+
+    def start(self):
+        self._queue = asyncio.Queue(maxsize=self.max_queued)
+        self._tasks = [asyncio.create_task(self._worker(i)) for i in range(self.workers)]
+        logger.info(f"File de tâches démarrée avec {self.workers} workers")
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def submit(self, key: str, **params) -> Job:
+        """Soumet une tâche, ou retourne la tâche déjà active pour cette clé."""
+        self._purge()
+        job = self._active.get(key)
+        if job is not None:
+            self.deduplicated += 1
+            logger.debug(f"Tâche {job.id} déjà active pour {key}")
+            return job
+
+        job = Job(key=key, params=params)
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            raise JobQueueFull(f"File de tâches pleine ({self.max_queued} tâches en attente)")
+        self._jobs[job.id] = job
+        self._active[key] = job
+        self.submitted += 1
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        self._purge()
+        return self._jobs.get(job_id)
+
+    async def _worker(self, number: int):
+        while True:
+            job = await self._queue.get()
+            job.status = RUNNING
+            job.started_at = time.time()
+            try:
+                job.result = await self.runner(job)
+                job.status = DONE
+                self.completed += 1
+            except asyncio.CancelledError:
+                job.status = FAILED
+                job.error = "Tâche annulée"
+                raise
+            except Exception as e:
+                logger.error(f"Échec de la tâche {job.id} ({job.key}): {e}")
+                job.status = FAILED
+                job.error = str(e)
+                self.failed += 1
+            finally:
+                job.finished_at = time.time()
+                if self._active.get(job.key) is job:
+                    del self._active[job.key]
+                self._queue.task_done()
+
+    def _purge(self):
+        """Oublie les tâches terminées depuis plus de `result_ttl` secondes."""
+        limit = time.time() - self.result_ttl
+        expired = [job_id for job_id, job in self._jobs.items()
+                   if job.finished and job.finished_at < limit]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    def stats(self) -> Dict:
+        return {
+            'workers': self.workers,
+            'queued': self._queue.qsize() if self._queue else 0,
+            'running': sum(1 for job in self._active.values() if job.status == RUNNING),
+            'stored': len(self._jobs),
+            'submitted': self.submitted,
+            'deduplicated': self.deduplicated,
+            'completed': self.completed,
+            'failed': self.failed
+        }
@@ -0,0 +1,155 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class _Flight:
+    """Appel amont en cours, partagé par toutes les requêtes identiques."""
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class LLMResponseCache:
+    """Cache persistant des réponses LLM, adressé par le contenu de la requête.
+
+    La clé est une empreinte du modèle, des paramètres de génération et des
+    messages. Les requêtes identiques simultanées partagent un seul appel amont
+    (single-flight) ; cet appel n'est annulé que si tous les demandeurs le sont.
+    """
+
+    def __init__(self,
+                 path: Optional[str] = None,
+                 ttl: Optional[int] = None,
+                 max_size_bytes: Optional[int] = None):
+        self.path = path or os.getenv('LLM_CACHE_PATH', '.cache/llm_cache.sqlite')
+        self.ttl = ttl if ttl is not None else int(os.getenv('LLM_CACHE_TTL', 24 * 3600))
+        self.max_size_bytes = max_size_bytes or int(os.getenv('LLM_CACHE_MAX_BYTES', 20 * 1024 * 1024))
+
+        self.hits = 0
+        self.misses = 0
+        self.deduplicated = 0
+        self.evictions = 0
+        self._inflight: Dict[str, _Flight] = {}
+
+        if self.path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS completions (
+                key TEXT PRIMARY KEY,
+                response TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                expires_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )"""
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_completions_access ON completions(last_access)")
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(model: str, params: Dict, messages: List[Dict]) -> str:
+        payload = json.dumps({'model': model, 'params': params, 'messages': messages}, sort_keys=True)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response FROM completions WHERE key = ? AND expires_at > ?", (key, now)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE completions SET last_access = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+        self.hits += 1
+        return row[0]
+
+    def set(self, key: str, response: str):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO completions (key, response, size, expires_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, response, len(response.encode('utf-8')), now + self.ttl, now)
+            )
+            self._evict(now)
+            self._conn.commit()
+
+    def _evict(self, now: float):
+        """Supprime les entrées expirées puis les moins récemment utilisées au-delà de la taille maximale."""
+        self._conn.execute("DELETE FROM completions WHERE expires_at <= ?", (now,))
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM completions").fetchone()[0]
+        if total <= self.max_size_bytes:
+            return
+        rows = self._conn.execute("SELECT key, size FROM completions ORDER BY last_access ASC").fetchall()
+        for key, size in rows:
+            if total <= self.max_size_bytes:
+                break
+            self._conn.execute("DELETE FROM completions WHERE key = ?", (key,))
+            total -= size
+            self.evictions += 1
+
+    async def get_or_compute(self, key: str, compute: Callable[[], Awaitable[str]]) -> str:
+        """Retourne la réponse en cache, ou la calcule une seule fois pour tous les appels identiques."""
+        # Lecture et écriture SQLite bloquantes : exécutées hors de la boucle d'événements
+        cached = await asyncio.to_thread(self.get, key)
+        if cached is not None:
+            return cached
+
+        flight = self._inflight.get(key)
+        if flight is None:
+            flight = _Flight(asyncio.ensure_future(self._compute_and_store(key, compute)))
+            self._inflight[key] = flight
+            flight.task.add_done_callback(lambda _: self._forget(key, flight))
+        else:
+            self.deduplicated += 1
+
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        except asyncio.CancelledError:
+            # Plus personne n'attend la réponse : inutile de poursuivre l'appel amont
+            if flight.waiters == 1 and not flight.task.done():
+                flight.task.cancel()
+            raise
+        finally:
+            flight.waiters -= 1
+
+    async def _compute_and_store(self, key: str, compute: Callable[[], Awaitable[str]]) -> str:
+        response = await compute()
+        if response:
+            await asyncio.to_thread(self.set, key, response)
+        return response
+
+    def _forget(self, key: str, flight: _Flight):
+        if self._inflight.get(key) is flight:
+            del self._inflight[key]
+
+    def stats(self) -> Dict:
+        with self._lock:
+            entries, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM completions"
+            ).fetchone()
+        lookups = self.hits + self.misses
+        return {
+            'entries': entries,
+            'size_bytes': size,
+            'hits': self.hits,
+            'misses': self.misses,
+            'deduplicated': self.deduplicated,
+            'evictions': self.evictions,
+            'in_flight': len(self._inflight),
+            'hit_rate': self.hits / lookups if lookups else 0.0
+        }
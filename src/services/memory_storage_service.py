@@ -0,0 +1,479 @@
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional
+import gzip
+import heapq
+import json
+import logging
+import math
+import os
+import re
+import threading
+
+from src.analyzers.channel_summary import ChannelSummary
+from src.analyzers.gap_ranker import rank_content_gaps
+from src.services.storage_backend import StorageBackend, TOPIC_SOURCE_FIELDS
+from src.utils.metrics import timed
+
+logger = logging.getLogger(__name__)
+
+TOKEN_PATTERN = re.compile(r'\w+')
+ELISION_PATTERN = re.compile(r"\b(?:[cdjlmnst]|qu)['’]")
+FRENCH_STOP_WORDS = {
+    'le', 'la', 'les', 'un', 'une', 'des', 'du', 'de', 'et', 'ou', 'mais', 'donc', 'car',
+    'ni', 'or', 'pour', 'dans', 'sur', 'avec', 'sans', 'par', 'en', 'au', 'aux', 'ce',
+    'ces', 'cet', 'cette', 'il', 'elle', 'ils', 'elles', 'je', 'tu', 'nous', 'vous', 'on',
+    'se', 'sa', 'son', 'ses', 'que', 'qui', 'ne', 'pas', 'est', 'a', 'à'
+}
+
+# Paramètres BM25 (valeurs par défaut d'Elasticsearch)
+BM25_K1 = 1.2
+BM25_B = 0.75
+FIELD_BOOSTS = {'title': 3.0, 'description': 1.0}
+
+
+def analyze_french(text: str, max_tokens: Optional[int] = None) -> List[str]:
+    """Analyse simplifiée proche de l'analyseur `french` (élision, mots vides, pluriels)."""
+    text = ELISION_PATTERN.sub(' ', (text or '').lower())
+    tokens = []
+    for token in TOKEN_PATTERN.findall(text):
+        if token in FRENCH_STOP_WORDS:
+            continue
+        if len(token) > 3 and token[-1] in 'sx':
+            token = token[:-1]
+        tokens.append(token)
+        if max_tokens and len(tokens) >= max_tokens:
+            break
+    return tokens
+
+
+class InMemoryStorageService(StorageBackend):
+    """Backend de stockage en mémoire, sans JVM.
+
+    Maintient un index inversé BM25 (titre et description), des index par
+    chaîne et par mot-clé, ainsi que des agrégats par mot-clé et des résumés
+    par chaîne mis à jour incrémentalement, ce qui rend find_content_gaps
+    proportionnel au nombre de mots-clés plutôt qu'au nombre de vidéos. L'état est sauvegardé sur
+    disque (JSON compressé) périodiquement et à la fermeture, puis rechargé au démarrage.
+    """
+
+    name = 'memory'
+
+    def __init__(self,
+                 snapshot_path: Optional[str] = None,
+                 description_tokens: Optional[int] = None,
+                 snapshot_interval: Optional[float] = None):
+        self.snapshot_path = snapshot_path if snapshot_path is not None else os.getenv(
+            'MEMORY_STORAGE_PATH', '.cache/storage_snapshot.json.gz'
+        )
+        # Intervalle (en secondes) des sauvegardes périodiques ; 0 pour ne sauvegarder qu'à la fermeture
+        self.snapshot_interval = (
+            snapshot_interval if snapshot_interval is not None
+            else float(os.getenv('MEMORY_STORAGE_SNAPSHOT_INTERVAL', 300))
+        )
+        # Seul le début des descriptions est indexé pour borner la mémoire
+        self.description_tokens = description_tokens or int(os.getenv('MEMORY_STORAGE_DESCRIPTION_TOKENS', 64))
+
+        self._lock = threading.RLock()
+        self._docs: Dict[int, Dict] = {}
+        self._doc_numbers: Dict[str, int] = {}
+        self._next_doc = 0
+        self._postings: Dict[str, Dict[str, Dict[int, int]]] = {field: defaultdict(dict) for field in FIELD_BOOSTS}
+        self._field_lengths: Dict[str, Dict[int, int]] = {field: {} for field in FIELD_BOOSTS}
+        self._field_total_length: Dict[str, int] = {field: 0 for field in FIELD_BOOSTS}
+        self._by_channel: Dict[str, set] = defaultdict(set)
+        self._keyword_stats: Dict[str, Dict] = {}
+        self._summaries: Dict[str, ChannelSummary] = {}
+        self._sync_states: Dict[str, Dict] = {}
+        # Nombre de modifications, pour ne sauvegarder que si l'état a changé depuis le dernier snapshot
+        self._changes = 0
+        self._saved_changes = 0
+        self._snapshot_lock = threading.Lock()
+        self._stop_snapshots = threading.Event()
+        self._snapshot_thread: Optional[threading.Thread] = None
+
+        if self.snapshot_path and os.path.exists(self.snapshot_path):
+            self.load_snapshot(self.snapshot_path)
+        if self.snapshot_path and self.snapshot_interval > 0:
+            self._snapshot_thread = threading.Thread(
+                target=self._snapshot_loop, name='memory-storage-snapshot', daemon=True
+            )
+            self._snapshot_thread.start()
+
+    def ping(self) -> bool:
+        return True
+
+    def close(self):
+        self._stop_snapshots.set()
+        if self._snapshot_thread is not None:
+            self._snapshot_thread.join()
+        if self.snapshot_path:
+            self.save_snapshot(self.snapshot_path)
+
+    def _snapshot_loop(self):
+        """Sauvegarde périodique, pour limiter les pertes en cas d'arrêt brutal."""
+        while not self._stop_snapshots.wait(self.snapshot_interval):
+            if self._changes == self._saved_changes:
+                continue
+            try:
+                self.save_snapshot(self.snapshot_path)
+            except Exception as e:
+                logger.error(f"Erreur lors de la sauvegarde périodique du stockage: {e}")
+
+    # Indexation
+
+    @timed('memory_storage')
+    def index_video(self, video_data: Dict):
+        """Indexe une vidéo en mémoire."""
+        try:
+            document = self._prepare_video_document(video_data)
+            with self._lock:
+                self._add(document)
+                self._changes += 1
+        except Exception as e:
+            logger.error(f"Erreur lors de l'indexation: {e}")
+            raise
+
+    @timed('memory_storage')
+    def bulk_index_videos(self, videos: List[Dict], chunk_size: Optional[int] = None, refresh: bool = True) -> Dict:
+        """Indexe un lot de vidéos ; les paramètres de chunk et de refresh sont sans objet ici."""
+        indexed = 0
+        errors = []
+        with self._lock:
+            for video in videos:
+                try:
+                    self._add(self._prepare_video_document(video))
+                    indexed += 1
+                except Exception as e:
+                    errors.append({'video_id': video.get('video_id', video.get('id')), 'error': str(e)})
+            self._changes += 1
+        if errors:
+            logger.warning(f"{len(errors)} vidéos n'ont pas pu être indexées")
+        return {'indexed': indexed, 'errors': errors}
+
+    @timed('memory_storage')
+    def update_video_statistics(self, statistics: Dict[str, Dict]):
+        """Met à jour uniquement les statistiques des vidéos déjà indexées."""
+        with self._lock:
+            for video_id, stats in statistics.items():
+                doc_number = self._doc_numbers.get(video_id)
+                if doc_number is None:
+                    continue
+                # Le texte ne change pas : seuls le document et les agrégats par mot-clé sont mis à jour
+                previous = self._docs[doc_number]
+                document = {**previous, **{field: int(value) for field, value in stats.items()}}
+                # Le taux d'engagement dépend des statistiques : il est recalculé avec elles
+                document['engagement_rate'] = ChannelSummary.engagement_rate(document)
+                for keyword in set(previous.get('keywords') or []):
+                    keyword_stats = self._keyword_stats[keyword]
+                    self._update_keyword_stats(keyword_stats, previous, -1)
+                    self._update_keyword_stats(keyword_stats, document, 1)
+                summary = self._summaries.get(previous.get('channel_id'))
+                if summary is not None:
+                    summary.update_video(previous, document)
+                self._docs[doc_number] = document
+            self._changes += 1
+
+    def _add(self, document: Dict):
+        video_id = document['video_id']
+        doc_number = self._doc_numbers.get(video_id)
+        if doc_number is not None:
+            self._remove(doc_number)
+        else:
+            doc_number = self._next_doc
+            self._next_doc += 1
+            self._doc_numbers[video_id] = doc_number
+
+        self._docs[doc_number] = document
+        for field in FIELD_BOOSTS:
+            max_tokens = self.description_tokens if field == 'description' else None
+            tokens = analyze_french(document.get(field, ''), max_tokens)
+            self._field_lengths[field][doc_number] = len(tokens)
+            self._field_total_length[field] += len(tokens)
+            for term, frequency in Counter(tokens).items():
+                self._postings[field][term][doc_number] = frequency
+
+        channel_id = document.get('channel_id')
+        if channel_id:
+            self._by_channel[channel_id].add(doc_number)
+            summary = self._summaries.get(channel_id)
+            if summary is None:
+                summary = self._summaries[channel_id] = ChannelSummary(channel_id)
+            summary.add_video(document)
+        for keyword in set(document.get('keywords') or []):
+            stats = self._keyword_stats.setdefault(keyword, {
+                'doc_count': 0, 'views': 0, 'engagement_sum': 0.0, 'engagement_count': 0, 'channels': Counter()
+            })
+            self._update_keyword_stats(stats, document, 1)
+
+    def _remove(self, doc_number: int):
+        document = self._docs.pop(doc_number)
+        for field in FIELD_BOOSTS:
+            self._field_total_length[field] -= self._field_lengths[field].pop(doc_number, 0)
+            max_tokens = self.description_tokens if field == 'description' else None
+            for term in set(analyze_french(document.get(field, ''), max_tokens)):
+                postings = self._postings[field].get(term)
+                if postings is not None:
+                    postings.pop(doc_number, None)
+                    if not postings:
+                        del self._postings[field][term]
+
+        channel_id = document.get('channel_id')
+        if channel_id:
+            self._by_channel[channel_id].discard(doc_number)
+            summary = self._summaries.get(channel_id)
+            if summary is not None:
+                summary.remove_video(document)
+                if summary.video_count <= 0:
+                    del self._summaries[channel_id]
+        for keyword in set(document.get('keywords') or []):
+            stats = self._keyword_stats.get(keyword)
+            if stats is not None:
+                self._update_keyword_stats(stats, document, -1)
+                if stats['doc_count'] <= 0:
+                    del self._keyword_stats[keyword]
+
+    @staticmethod
+    def _update_keyword_stats(stats: Dict, document: Dict, sign: int):
+        stats['doc_count'] += sign
+        stats['views'] += sign * int(document.get('view_count') or 0)
+        if document.get('engagement_rate') is not None:
+            stats['engagement_sum'] += sign * float(document['engagement_rate'])
+            stats['engagement_count'] += sign
+        channel_id = document.get('channel_id')
+        if channel_id:
+            stats['channels'][channel_id] += sign
+            if stats['channels'][channel_id] <= 0:
+                del stats['channels'][channel_id]
+
+    # Recherche
+
+    def _topic_candidates(self, topic: str) -> Dict:
+        """Copie de ce qu'il faut pour scorer un sujet (postings des termes, longueurs, documents).
+
+        À appeler sous verrou ; le score est ensuite calculé hors verrou par _score_topic.
+        """
+        terms = set(analyze_french(topic))
+        total_docs = len(self._docs) or 1
+        postings: Dict[str, List[Dict[int, int]]] = {}
+        average_lengths: Dict[str, float] = {}
+        doc_numbers = set()
+        for field in FIELD_BOOSTS:
+            field_postings = [dict(self._postings[field][term]) for term in terms if self._postings[field].get(term)]
+            for term_postings in field_postings:
+                doc_numbers.update(term_postings)
+            postings[field] = field_postings
+            average_lengths[field] = (self._field_total_length[field] / total_docs) or 1
+        return {
+            'total_docs': total_docs,
+            'postings': postings,
+            'average_lengths': average_lengths,
+            'lengths': {
+                field: {doc_number: self._field_lengths[field].get(doc_number, 0) for doc_number in doc_numbers}
+                for field in FIELD_BOOSTS
+            },
+            # Les documents sont remplacés, jamais modifiés en place : les références suffisent
+            'documents': {doc_number: self._docs[doc_number] for doc_number in doc_numbers}
+        }
+
+    @staticmethod
+    def _score_topic(candidates: Dict) -> Dict[int, float]:
+        """Score BM25 best_fields (titre^3, description) multiplié par le boost vues/engagement."""
+        total_docs = candidates['total_docs']
+        field_scores: Dict[str, Dict[int, float]] = {}
+        for field, boost in FIELD_BOOSTS.items():
+            scores: Dict[int, float] = defaultdict(float)
+            avg_length = candidates['average_lengths'][field]
+            lengths = candidates['lengths'][field]
+            for postings in candidates['postings'][field]:
+                idf = math.log(1 + (total_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+                for doc_number, frequency in postings.items():
+                    norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths.get(doc_number, 0) / avg_length)
+                    scores[doc_number] += boost * idf * frequency * (BM25_K1 + 1) / (frequency + norm)
+            field_scores[field] = scores
+
+        combined: Dict[int, float] = {}
+        for scores in field_scores.values():
+            for doc_number, score in scores.items():
+                if score > combined.get(doc_number, 0.0):
+                    combined[doc_number] = score
+
+        for doc_number, score in combined.items():
+            document = candidates['documents'][doc_number]
+            boost = (
+                math.log1p(document.get('view_count') or 0)
+                + math.log1p(10 * (document.get('engagement_rate') or 0))
+            )
+            combined[doc_number] = score * boost
+        return combined
+
+    @timed('memory_storage')
+    def search_videos_by_topic(self, topic: str, size: int = 20) -> List[Dict]:
+        # Seule la copie des candidats est faite sous verrou, le score est calculé en dehors
+        with self._lock:
+            candidates = self._topic_candidates(topic)
+        scores = self._score_topic(candidates)
+        best = heapq.nlargest(size, scores.items(), key=lambda item: item[1])
+        return [self._topic_source(candidates['documents'][doc_number]) for doc_number, _ in best]
+
+    @timed('memory_storage')
+    def search_videos_by_topic_page(self, topic: str, size: int = 100, cursor: Optional[Dict] = None) -> Dict:
+        """Pagination par search_after sur le couple (score décroissant, video_id)."""
+        with self._lock:
+            candidates = self._topic_candidates(topic)
+        documents = candidates['documents']
+        ranked = sorted(
+            ((score, documents[doc_number]['video_id'], doc_number)
+             for doc_number, score in self._score_topic(candidates).items()),
+            key=lambda item: (-item[0], item[1])
+        )
+        if cursor:
+            last_score, last_id = cursor['search_after']
+            ranked = [item for item in ranked if (-item[0], item[1]) > (-last_score, last_id)]
+        page = ranked[:size]
+        next_cursor = (
+            {'search_after': [page[-1][0], page[-1][1]]}
+            if len(page) == size and len(ranked) > size else None
+        )
+        return {
+            'videos': [self._topic_source(documents[doc_number]) for _, _, doc_number in page],
+            'cursor': next_cursor
+        }
+
+    @staticmethod
+    def _topic_source(document: Dict) -> Dict:
+        return {field: document[field] for field in TOPIC_SOURCE_FIELDS if field in document}
+
+    @timed('memory_storage')
+    def get_channel_videos(self, channel_id: str, size: int = 50) -> List[Dict]:
+        with self._lock:
+            documents = [self._docs[doc_number] for doc_number in self._by_channel.get(channel_id, ())]
+        latest = heapq.nlargest(size, documents, key=lambda document: document.get('published_at') or '')
+        return [dict(document) for document in latest]
+
+    # Agrégations
+
+    @timed('memory_storage')
+    def find_content_gaps(self, channel_id: str, size: int = 20) -> List[Dict]:
+        """Équivalent en mémoire des agrégats significant_terms / terms d'Elasticsearch."""
+        try:
+            with self._lock:
+                channel_docs = [self._docs[doc_number] for doc_number in self._by_channel.get(channel_id, ())]
+                channel_views = [int(document.get('view_count') or 0) for document in channel_docs]
+                channel_avg_views = sum(channel_views) / len(channel_views) if channel_views else 0.0
+
+                # Contribution de la chaîne à chaque mot-clé
+                channel_stats: Dict[str, Dict] = {}
+                for document in channel_docs:
+                    for keyword in set(document.get('keywords') or []):
+                        stats = channel_stats.setdefault(keyword, {
+                            'doc_count': 0, 'views': 0, 'engagement_sum': 0.0,
+                            'engagement_count': 0, 'channels': Counter()
+                        })
+                        self._update_keyword_stats(stats, document, 1)
+                channel_terms = {keyword: stats['doc_count'] for keyword, stats in channel_stats.items()}
+
+                total_docs = len(self._docs)
+                corpus_docs = total_docs - len(channel_docs)
+                if corpus_docs <= 0:
+                    candidates = [self._candidate(keyword, stats) for keyword, stats in channel_stats.items()]
+                    return rank_content_gaps(candidates, {}, channel_avg_views, 0, size)
+
+                corpus_channels = len([cid for cid, docs in self._by_channel.items() if docs and cid != channel_id])
+                popular = []
+                significant = []
+                for keyword, stats in self._keyword_stats.items():
+                    own = channel_stats.get(keyword)
+                    corpus = self._subtract(stats, own) if own else stats
+                    if corpus['doc_count'] <= 0:
+                        continue
+                    candidate = self._candidate(keyword, corpus)
+                    popular.append((corpus['views'], candidate))
+
+                    # Score JLH, celui utilisé par défaut par significant_terms
+                    foreground = corpus['doc_count'] / corpus_docs
+                    background = stats['doc_count'] / total_docs
+                    if corpus['doc_count'] >= 2 and foreground > background:
+                        score = (foreground - background) * (foreground / background)
+                        significant.append((score, {**candidate, 'significance': score}))
+
+            candidates = {c['topic']: c for _, c in heapq.nlargest(50, popular, key=lambda item: item[0])}
+            for _, candidate in heapq.nlargest(50, significant, key=lambda item: item[0]):
+                candidates[candidate['topic']] = candidate
+            return rank_content_gaps(list(candidates.values()), channel_terms, channel_avg_views, corpus_channels, size)
+        except Exception as e:
+            logger.error(f"Erreur lors de la recherche des content gaps: {e}")
+            return []
+
+    @staticmethod
+    def _subtract(stats: Dict, own: Dict) -> Dict:
+        return {
+            'doc_count': stats['doc_count'] - own['doc_count'],
+            'views': stats['views'] - own['views'],
+            'engagement_sum': stats['engagement_sum'] - own['engagement_sum'],
+            'engagement_count': stats['engagement_count'] - own['engagement_count'],
+            'channels': stats['channels'] - own['channels']
+        }
+
+    @staticmethod
+    def _candidate(keyword: str, stats: Dict) -> Dict:
+        return {
+            'topic': keyword,
+            'avg_views': stats['views'] / stats['doc_count'] if stats['doc_count'] else 0.0,
+            'avg_engagement': (
+                stats['engagement_sum'] / stats['engagement_count'] if stats['engagement_count'] else 0.0
+            ),
+            'channels': len(stats['channels'])
+        }
+
+    # Résumés par chaîne
+
+    @timed('memory_storage')
+    def get_channel_summary(self, channel_id: str) -> Optional[Dict]:
+        with self._lock:
+            summary = self._summaries.get(channel_id)
+            return summary.to_document() if summary is not None else None
+
+    # État de synchronisation
+
+    @timed('memory_storage')
+    def get_sync_state(self, channel_id: str) -> Optional[Dict]:
+        with self._lock:
+            state = self._sync_states.get(channel_id)
+            return dict(state) if state is not None else None
+
+    @timed('memory_storage')
+    def save_sync_state(self, channel_id: str, state: Dict):
+        with self._lock:
+            self._sync_states[channel_id] = {**state, 'channel_id': channel_id}
+            self._changes += 1
+
+    # Persistance
+
+    def save_snapshot(self, path: str):
+        """Sauvegarde les documents et états de synchronisation (écriture atomique).
+
+        Seules les références sont copiées sous verrou : les documents sont
+        remplacés, jamais modifiés en place, et la sérialisation ne bloque donc
+        pas les écritures concurrentes.
+        """
+        with self._snapshot_lock:
+            with self._lock:
+                payload = {'videos': list(self._docs.values()), 'sync_states': dict(self._sync_states)}
+                changes = self._changes
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            tmp_path = f"{path}.tmp"
+            with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+                json.dump(payload, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+            self._saved_changes = changes
+        logger.info(f"Snapshot du stockage enregistré: {len(payload['videos'])} vidéos")
+
+    def load_snapshot(self, path: str):
+        """Recharge un snapshot et reconstruit les index."""
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            payload = json.load(f)
+        with self._lock:
+            for document in payload.get('videos', []):
+                self._add(document)
+            self._sync_states.update(payload.get('sync_states', {}))
+        logger.info(f"Snapshot du stockage chargé: {len(self._docs)} vidéos")
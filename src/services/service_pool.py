@@ -0,0 +1,245 @@
+import asyncio
+import logging
+import os
+import threading
+import time
+from typing import Callable, Dict, Set
+
+from src.analyzers.competitor_analyzer import CompetitorAnalyzer
+from src.analyzers.content_analyzer import ContentAnalyzer
+from src.scrapers.async_youtube_scraper import AsyncYouTubeScraper, close_shared_session, get_shared_session
+from src.scrapers.quota_scheduler import get_scheduler
+from src.services.ai_service import AIService
+from src.services.analysis_cache import AnalysisResponseCache
+from src.services.channel_sync_service import ChannelSyncService
+from src.services.competitor_service import CompetitorComparisonService
+from src.services.storage_backend import StorageBackend, create_storage_service
+from src.utils import text_processor
+
+logger = logging.getLogger(__name__)
+
+# Délai avant de retenter la construction d'un service en échec, doublé à chaque échec
+SERVICE_RETRY_BACKOFF = float(os.getenv('SERVICE_RETRY_BACKOFF', 5))
+SERVICE_RETRY_MAX_BACKOFF = float(os.getenv('SERVICE_RETRY_MAX_BACKOFF', 300))
+
+
+class ServiceUnavailable(Exception):
+    """Service dont la construction a échoué ; il est reconstruit en arrière-plan."""
+
+
+class ServicePool:
+    """Services partagés pendant toute la durée de vie de l'application.
+
+    Les services sont construits une seule fois au démarrage. Un service
+    indisponible au démarrage (ex: Elasticsearch arrêté) n'empêche pas
+    l'application de démarrer : tant qu'il manque, ses utilisateurs reçoivent
+    ServiceUnavailable immédiatement, et sa construction est retentée dans un
+    thread, avec un délai croissant entre deux tentatives. La boucle
+    d'événements n'exécute donc jamais une construction bloquante.
+    """
+
+    def __init__(self):
+        self._factories: Dict[str, Callable] = {
+            'scraper': AsyncYouTubeScraper,
+            'analyzer': ContentAnalyzer,
+            'storage': create_storage_service,
+            'ai_service': AIService,
+            'competitor_analyzer': CompetitorAnalyzer,
+            'analysis_cache': AnalysisResponseCache,
+        }
+        self._services: Dict[str, object] = {}
+        self.errors: Dict[str, str] = {}
+        # Sérialise les constructions : un service n'est jamais construit deux fois en parallèle
+        self._build_lock = threading.Lock()
+        self._state_lock = threading.Lock()
+        self._rebuilding: Set[str] = set()
+        self._backoff: Dict[str, float] = {}
+        self._retry_at: Dict[str, float] = {}
+
+    def get(self, name: str):
+        """Retourne le service demandé.
+
+        Un service en échec n'est pas reconstruit par l'appelant : une
+        reconstruction est planifiée en arrière-plan et ServiceUnavailable
+        est levée.
+        """
+        service = self._services.get(name)
+        if service is not None:
+            return service
+        error = self.errors.get(name)
+        if error is None:
+            return self._build(name)
+        service = self._services.get(name)
+        if service is not None:
+            # Reconstruit entre-temps
+            return service
+        self._schedule_rebuild(name)
+        raise ServiceUnavailable(f"Service {name} indisponible: {error}")
+
+    def _build(self, name: str):
+        with self._build_lock:
+            service = self._services.get(name)
+            if service is not None:
+                return service
+            try:
+                service = self._factories[name]()
+            except Exception as e:
+                with self._state_lock:
+                    self.errors[name] = str(e)
+                    backoff = self._backoff.get(name)
+                    backoff = SERVICE_RETRY_BACKOFF if backoff is None else min(backoff * 2, SERVICE_RETRY_MAX_BACKOFF)
+                    self._backoff[name] = backoff
+                    self._retry_at[name] = time.monotonic() + backoff
+                raise
+            with self._state_lock:
+                self._services[name] = service
+                self.errors.pop(name, None)
+                self._backoff.pop(name, None)
+                self._retry_at.pop(name, None)
+            return service
+
+    def _schedule_rebuild(self, name: str):
+        """Lance une reconstruction dans un thread, sauf si une est en cours ou si le délai n'est pas écoulé."""
+        with self._state_lock:
+            if name in self._rebuilding or time.monotonic() < self._retry_at.get(name, 0):
+                return
+            self._rebuilding.add(name)
+        threading.Thread(target=self._rebuild, args=(name,), name=f"rebuild-{name}", daemon=True).start()
+
+    def _rebuild(self, name: str):
+        try:
+            self._build(name)
+            logger.info(f"Service {name} reconstruit")
+        except Exception as e:
+            logger.warning(f"Reconstruction du service {name} échouée (nouvel essai dans {self._backoff.get(name)}s): {e}")
+        finally:
+            with self._state_lock:
+                self._rebuilding.discard(name)
+
+    @property
+    def scraper(self) -> AsyncYouTubeScraper:
+        return self.get('scraper')
+
+    @property
+    def analyzer(self) -> ContentAnalyzer:
+        return self.get('analyzer')
+
+    @property
+    def storage(self) -> StorageBackend:
+        return self.get('storage')
+
+    @property
+    def ai_service(self) -> AIService:
+        return self.get('ai_service')
+
+    @property
+    def analysis_cache(self) -> AnalysisResponseCache:
+        return self.get('analysis_cache')
+
+    @property
+    def sync_service(self) -> ChannelSyncService:
+        return ChannelSyncService(self.scraper, self.storage)
+
+    @property
+    def competitor_service(self) -> CompetitorComparisonService:
+        return CompetitorComparisonService(self.scraper, self.storage, self.get('competitor_analyzer'))
+
+    async def startup(self):
+        """Construit les services et effectue les initialisations coûteuses une seule fois."""
+        for name in self._factories:
+            try:
+                # La construction du stockage est bloquante (ping et création d'index pour Elasticsearch)
+                await asyncio.to_thread(self.get, name)
+            except Exception as e:
+                logger.error(f"Service {name} indisponible au démarrage: {e}")
+
+        # Préchauffage : chargement du modèle spaCy et ouverture du pool HTTP
+        await asyncio.to_thread(text_processor.get_nlp)
+        get_shared_session()
+        logger.info("Services initialisés")
+
+    async def shutdown(self):
+        await close_shared_session()
+        # Consommation de quota pas encore écrite sur disque
+        await asyncio.to_thread(get_scheduler().flush)
+        competitor_analyzer = self._services.get('competitor_analyzer')
+        if competitor_analyzer is not None:
+            competitor_analyzer.close()
+        storage = self._services.get('storage')
+        if storage is not None:
+            # Le backend mémoire sauvegarde son snapshot à la fermeture
+            await asyncio.to_thread(storage.close)
+        self._services.clear()
+
+    def cache_stats(self) -> Dict[str, Dict]:
+        """Compteurs des caches déjà construits (sans construire de service)."""
+        caches = {'keywords': text_processor.keyword_cache_stats()}
+        scraper = self._services.get('scraper')
+        if scraper is not None and scraper.cache:
+            caches['youtube_api'] = scraper.cache.stats()
+        ai_service = self._services.get('ai_service')
+        if ai_service is not None and ai_service.cache:
+            caches['llm'] = ai_service.cache.stats()
+        analysis_cache = self._services.get('analysis_cache')
+        if analysis_cache is not None:
+            caches['analysis'] = analysis_cache.stats()
+        return caches
+
+    def _youtube_health(self) -> Dict:
+        scraper = self.get('scraper')
+        return {
+            'status': 'ok',
+            'cache': scraper.cache.stats() if scraper.cache else None,
+            'channel_index': scraper.resolver.stats(),
+            'quota': scraper.scheduler.stats()
+        }
+
+    def _together_health(self) -> Dict:
+        ai_service = self.get('ai_service')
+        return {
+            'status': 'ok',
+            'cache': ai_service.cache.stats() if ai_service.cache else None
+        }
+
+    async def health(self) -> Dict:
+        """État de chaque dépendance."""
+        dependencies = {}
+
+        try:
+            storage = await asyncio.to_thread(self.get, 'storage')
+            reachable = await asyncio.to_thread(storage.ping)
+            dependencies['storage'] = {'status': 'ok' if reachable else 'error', 'backend': storage.name}
+        except Exception as e:
+            dependencies['storage'] = {'status': 'error', 'detail': str(e)}
+
+        # Les statistiques des caches et de l'index des chaînes sont lues en SQLite, hors de la boucle
+        try:
+            dependencies['youtube'] = await asyncio.to_thread(self._youtube_health)
+        except Exception as e:
+            dependencies['youtube'] = {'status': 'error', 'detail': str(e)}
+
+        try:
+            dependencies['together'] = await asyncio.to_thread(self._together_health)
+        except Exception as e:
+            dependencies['together'] = {'status': 'error', 'detail': str(e)}
+
+        # Le modèle n'est jamais chargé ici : avant la fin du préchauffage, il est signalé comme en chargement
+        nlp_report = text_processor.nlp_load_report()
+        if not nlp_report['loaded']:
+            spacy_status = 'loading'
+        else:
+            spacy_status = 'ok' if text_processor.get_nlp() else 'fallback'
+        dependencies['spacy'] = {
+            'status': spacy_status,
+            **nlp_report,
+            'keyword_cache': text_processor.keyword_cache_stats()
+        }
+
+        try:
+            analysis_cache = await asyncio.to_thread(self.get, 'analysis_cache')
+            dependencies['analysis_cache'] = {'status': 'ok', **analysis_cache.stats()}
+        except Exception as e:
+            dependencies['analysis_cache'] = {'status': 'error', 'detail': str(e)}
+
+        healthy = all(dep['status'] != 'error' for dep in dependencies.values())
+        return {'status': 'ok' if healthy else 'degraded', 'dependencies': dependencies}
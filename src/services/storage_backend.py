@@ -0,0 +1,102 @@
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Dict, List, Optional
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+# Champs renvoyés par la recherche par sujet (ceux utilisés par le prompt de concurrence)
+TOPIC_SOURCE_FIELDS = [
+    'video_id', 'channel_id', 'title', 'view_count', 'like_count',
+    'comment_count', 'engagement_rate', 'published_at', 'keywords'
+]
+
+
+class StorageBackend(ABC):
+    """Interface commune des backends de stockage des vidéos."""
+
+    name = 'abstract'
+
+    @abstractmethod
+    def ping(self) -> bool:
+        """Indique si le backend est joignable."""
+
+    @abstractmethod
+    def index_video(self, video_data: Dict):
+        """Indexe (ou remplace) une vidéo."""
+
+    @abstractmethod
+    def bulk_index_videos(self, videos: List[Dict], chunk_size: Optional[int] = None, refresh: bool = True) -> Dict:
+        """Indexe un lot de vidéos ; retourne {'indexed': int, 'errors': [...]}."""
+
+    @abstractmethod
+    def find_content_gaps(self, channel_id: str, size: int = 20) -> List[Dict]:
+        """Liste classée de {topic, potential, competition, score}."""
+
+    @abstractmethod
+    def search_videos_by_topic(self, topic: str, size: int = 20) -> List[Dict]:
+        """Vidéos les plus pertinentes pour un sujet."""
+
+    @abstractmethod
+    def search_videos_by_topic_page(self, topic: str, size: int = 100, cursor: Optional[Dict] = None) -> Dict:
+        """Page de résultats {'videos': [...], 'cursor': {...} | None}."""
+
+    @abstractmethod
+    def get_channel_videos(self, channel_id: str, size: int = 50) -> List[Dict]:
+        """Vidéos indexées d'une chaîne, de la plus récente à la plus ancienne."""
+
+    @abstractmethod
+    def update_video_statistics(self, statistics: Dict[str, Dict]):
+        """Met à jour uniquement les statistiques de vidéos déjà indexées."""
+
+    @abstractmethod
+    def get_channel_summary(self, channel_id: str) -> Optional[Dict]:
+        """Résumé matérialisé d'une chaîne (moyennes, médianes, fréquence, mots-clés)."""
+
+    @abstractmethod
+    def get_sync_state(self, channel_id: str) -> Optional[Dict]:
+        """Watermark de synchronisation d'une chaîne."""
+
+    @abstractmethod
+    def save_sync_state(self, channel_id: str, state: Dict):
+        """Enregistre le watermark de synchronisation d'une chaîne."""
+
+    def close(self):
+        """Libère les ressources du backend."""
+
+    def _prepare_video_document(self, video_data: Dict) -> Dict:
+        """Vérifie et normalise un document vidéo avant indexation."""
+        video_data = dict(video_data)
+        if 'id' in video_data and 'video_id' not in video_data:
+            video_data['video_id'] = video_data['id']
+        
+        if 'video_id' not in video_data:
+            raise ValueError("L'ID de la vidéo est manquant")
+
+        # S'assurer que les champs numériques sont des nombres
+        for field in ['view_count', 'like_count', 'comment_count']:
+            if field in video_data and not isinstance(video_data[field], (int, float)):
+                video_data[field] = int(video_data[field])
+
+        # Formater la date si présente
+        if 'published_at' in video_data:
+            try:
+                video_data['published_at'] = datetime.fromisoformat(
+                    video_data['published_at'].replace('Z', '+00:00')
+                ).isoformat()
+            except Exception as e:
+                logger.warning(f"Erreur de conversion de la date: {e}")
+        return video_data
+
+
+def create_storage_service() -> StorageBackend:
+    """Instancie le backend choisi par STORAGE_BACKEND ('elasticsearch' par défaut, ou 'memory')."""
+    backend = os.getenv('STORAGE_BACKEND', 'elasticsearch').lower()
+    if backend == 'memory':
+        from src.services.memory_storage_service import InMemoryStorageService
+        return InMemoryStorageService()
+    if backend == 'elasticsearch':
+        from src.services.elasticsearch_service import ElasticsearchService
+        return ElasticsearchService()
+    raise ValueError(f"STORAGE_BACKEND inconnu: {backend}")
@@ -0,0 +1,53 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+
+class KeywordCache:
+    """Cache LRU borné des mots-clés extraits, indexé par l'empreinte du texte normalisé."""
+
+    def __init__(self, max_entries: int = 50000):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[bytes, List[str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(normalized_text: str) -> bytes:
+        return hashlib.blake2b(normalized_text.encode('utf-8'), digest_size=16).digest()
+
+    def get(self, key: bytes) -> Optional[List[str]]:
+        with self._lock:
+            keywords = self._entries.get(key)
+            if keywords is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return keywords
+
+    def set(self, key: bytes, keywords: List[str]):
+        with self._lock:
+            self._entries[key] = keywords
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'max_entries': self.max_entries,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / lookups if lookups else 0.0
+        }
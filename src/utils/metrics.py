@@ -0,0 +1,262 @@
+import asyncio
+import contextvars
+import functools
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+METRIC_PREFIX = 'content_gap_'
+
+# Bornes (en secondes) adaptées à des opérations de quelques ms (cache, stockage) à une minute (LLM)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+LabelValues = Tuple[str, ...]
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+class _Metric:
+    type = 'untyped'
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = ()):
+        self.name = METRIC_PREFIX + name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        return tuple(str(labels.get(name, '')) for name in self.label_names)
+
+    def _labels(self, key: LabelValues, extra: Optional[Dict[str, str]] = None) -> str:
+        pairs = list(zip(self.label_names, key)) + list((extra or {}).items())
+        if not pairs:
+            return ''
+        return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type}"] + self._samples()
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    type = 'counter'
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = ()):
+        super().__init__(name, documentation, label_names)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            values = dict(self._values)
+        return [f"{self.name}{self._labels(key)} {_format_value(value)}" for key, value in sorted(values.items())]
+
+
+class Gauge(_Metric):
+    type = 'gauge'
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = ()):
+        super().__init__(name, documentation, label_names)
+        self._values: Dict[LabelValues, float] = {}
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            values = dict(self._values)
+        return [f"{self.name}{self._labels(key)} {_format_value(value)}" for key, value in sorted(values.items())]
+
+
+class Histogram(_Metric):
+    type = 'histogram'
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, label_names)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        # Par jeu de labels : [comptes par bucket (non cumulés), somme, nombre]
+        self._values: Dict[LabelValues, list] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = next(i for i, bound in enumerate(self.buckets) if value <= bound)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            values = {key: (list(state[0]), state[1], state[2]) for key, state in self._values.items()}
+        lines = []
+        for key, (counts, total, count) in sorted(values.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                lines.append(f"{self.name}_bucket{self._labels(key, {'le': _format_value(bound)})} {cumulative}")
+            lines.append(f"{self.name}_sum{self._labels(key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{self._labels(key)} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """Métriques du processus, rendues au format texte de Prometheus."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, documentation: str, label_names: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, label_names))
+
+    def gauge(self, name: str, documentation: str, label_names: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, label_names))
+
+    def histogram(self, name: str, documentation: str, label_names: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, label_names, buckets))
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return '\n'.join(line for metric in metrics for line in metric.render()) + '\n'
+
+
+registry = MetricsRegistry()
+
+OPERATION_DURATION = registry.histogram(
+    'operation_duration_seconds',
+    "Durée des opérations par composant (youtube, analyzer, spacy, storage, together)",
+    ('component', 'operation')
+)
+OPERATION_ERRORS = registry.counter(
+    'operation_errors_total',
+    "Opérations terminées par une exception",
+    ('component', 'operation')
+)
+HTTP_REQUEST_DURATION = registry.histogram(
+    'http_request_duration_seconds',
+    "Durée des requêtes HTTP, jusqu'à l'envoi des en-têtes de réponse",
+    ('method', 'route', 'status')
+)
+
+# Durées des opérations de la requête HTTP en cours, pour l'en-tête Server-Timing.
+# La liste est partagée avec les threads (asyncio.to_thread copie le contexte).
+_request_timings: contextvars.ContextVar[Optional[List[Tuple[str, float]]]] = contextvars.ContextVar(
+    'request_timings', default=None
+)
+
+
+def record(component: str, operation: str, duration: float, failed: bool = False):
+    """Enregistre la durée d'une opération déjà mesurée."""
+    if not METRICS_ENABLED:
+        return
+    OPERATION_DURATION.observe(duration, component=component, operation=operation)
+    if failed:
+        OPERATION_ERRORS.inc(component=component, operation=operation)
+    timings = _request_timings.get()
+    if timings is not None:
+        timings.append((f"{component}.{operation}", duration))
+
+
+@contextmanager
+def timer(component: str, operation: str) -> Iterator[None]:
+    """Chronomètre le bloc (y compris en cas d'exception) et l'attribue à component/operation.
+
+    Une annulation (CancelledError, KeyboardInterrupt...) est chronométrée mais
+    n'est pas comptée comme une erreur.
+    """
+    start = time.perf_counter()
+    failed = False
+    try:
+        yield
+    except Exception:
+        failed = True
+        raise
+    finally:
+        record(component, operation, time.perf_counter() - start, failed)
+
+
+def timed(component: str, operation: Optional[str] = None) -> Callable:
+    """Décorateur équivalent à timer(), pour les fonctions synchrones comme asynchrones.
+
+    Par défaut l'opération est le nom de la fonction, sans le préfixe '_'.
+    """
+    def decorator(func: Callable) -> Callable:
+        name = operation or func.__name__.lstrip('_')
+
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with timer(component, name):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with timer(component, name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def start_request_timing() -> contextvars.Token:
+    return _request_timings.set([])
+
+
+def finish_request_timing(token: contextvars.Token) -> List[Tuple[str, float]]:
+    timings = _request_timings.get() or []
+    _request_timings.reset(token)
+    return timings
+
+
+def server_timing_header(timings: List[Tuple[str, float]], total: float) -> str:
+    """En-tête Server-Timing : durée cumulée par opération, avec le nombre d'appels."""
+    aggregated: Dict[str, List[float]] = {}
+    for name, duration in timings:
+        entry = aggregated.setdefault(name, [0.0, 0])
+        entry[0] += duration
+        entry[1] += 1
+    parts = [
+        f'{name};dur={duration * 1000:.1f};desc="x{count}"' if count > 1 else f'{name};dur={duration * 1000:.1f}'
+        for name, (duration, count) in sorted(aggregated.items(), key=lambda item: -item[1][0])
+    ]
+    parts.append(f'total;dur={total * 1000:.1f}')
+    return ', '.join(parts)
+
+
+def render_metrics() -> str:
+    return registry.render()
@@ -0,0 +1,92 @@
+import math
+from typing import Dict, Optional
+
+
+class DDSketch:
+    """Sketch de quantiles à erreur relative bornée (DDSketch), fusionnable.
+
+    Chaque valeur positive est comptée dans le bucket ceil(log_gamma(v)) ; un
+    quantile est estimé avec une erreur relative d'au plus `relative_accuracy`.
+    Les comptes par bucket étant exacts, une valeur peut aussi être retirée
+    (ex: ancienne statistique d'une vidéo mise à jour). Les valeurs nulles ou
+    négatives sont comptées à part.
+    """
+
+    def __init__(self, relative_accuracy: float = 0.01):
+        if not 0 < relative_accuracy < 1:
+            raise ValueError("relative_accuracy doit être compris entre 0 et 1")
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.bins: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+
+    def _key(self, value: float) -> int:
+        return math.ceil(math.log(value) / self._log_gamma)
+
+    def _value(self, key: int) -> float:
+        # Milieu du bucket (gamma^(k-1), gamma^k] au sens de l'erreur relative
+        return 2 * self.gamma ** key / (self.gamma + 1)
+
+    def add(self, value: float, count: int = 1):
+        if value <= 0:
+            self.zero_count += count
+        else:
+            key = self._key(value)
+            self.bins[key] = self.bins.get(key, 0) + count
+        self.count += count
+
+    def remove(self, value: float, count: int = 1):
+        """Retire une valeur précédemment ajoutée."""
+        if value <= 0:
+            removed = min(count, self.zero_count)
+            self.zero_count -= removed
+        else:
+            key = self._key(value)
+            removed = min(count, self.bins.get(key, 0))
+            if removed:
+                self.bins[key] -= removed
+                if not self.bins[key]:
+                    del self.bins[key]
+        self.count -= removed
+
+    def merge(self, other: 'DDSketch'):
+        if other.gamma != self.gamma:
+            raise ValueError("Impossible de fusionner des sketches de précisions différentes")
+        for key, count in other.bins.items():
+            self.bins[key] = self.bins.get(key, 0) + count
+        self.zero_count += other.zero_count
+        self.count += other.count
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Valeur au quantile q (0 <= q <= 1), ou None si le sketch est vide."""
+        if not 0 <= q <= 1:
+            raise ValueError("Le quantile doit être compris entre 0 et 1")
+        if self.count <= 0:
+            return None
+
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if rank < seen:
+            return 0.0
+        for key in sorted(self.bins):
+            seen += self.bins[key]
+            if rank < seen:
+                return self._value(key)
+        return self._value(max(self.bins))
+
+    def to_dict(self) -> Dict:
+        return {
+            'relative_accuracy': self.relative_accuracy,
+            'zero_count': self.zero_count,
+            'bins': {str(key): count for key, count in self.bins.items()}
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'DDSketch':
+        sketch = cls(data.get('relative_accuracy', 0.01))
+        sketch.zero_count = data.get('zero_count', 0)
+        sketch.bins = {int(key): count for key, count in data.get('bins', {}).items()}
+        sketch.count = sketch.zero_count + sum(sketch.bins.values())
+        return sketch
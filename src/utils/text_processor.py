@@ -1,59 +1,187 @@
-import spacy
-from typing import List
+from typing import Dict, List, Optional, Sequence
 import logging
+import os
 import re
+import threading
+import time
 from collections import Counter
+from src.utils.keyword_cache import KeywordCache
+from src.utils.metrics import timer
 
 logger = logging.getLogger(__name__)
 
-def load_spacy_model():
+SPACY_MODEL = os.getenv('SPACY_MODEL', 'fr_core_news_sm')
+# extract_keywords n'utilise que les étiquettes POS et les mots vides
+DEFAULT_EXCLUDED_COMPONENTS = ('parser', 'ner', 'lemmatizer')
+
+_nlp = None
+_nlp_loaded = False
+_nlp_lock = threading.Lock()
+_load_report: Dict = {}
+
+# Partagé entre les étapes d'analyse et les requêtes : chaque texte distinct
+# ne passe qu'une seule fois dans le pipeline NLP
+_keyword_cache = KeywordCache(max_entries=int(os.getenv('KEYWORD_CACHE_SIZE', 50000)))
+
+def _excluded_components() -> List[str]:
+    """Composants spaCy exclus, configurables via SPACY_EXCLUDE (liste séparée par des virgules)."""
+    value = os.getenv('SPACY_EXCLUDE')
+    if value is None:
+        return list(DEFAULT_EXCLUDED_COMPONENTS)
+    return [name.strip() for name in value.split(',') if name.strip()]
+
+def _current_rss_kb() -> Optional[int]:
+    """Mémoire résidente actuelle du processus (Linux), en Ko."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') // 1024
+    except (OSError, ValueError, AttributeError):
+        return None
+
+def load_spacy_model(exclude: Optional[Sequence[str]] = None):
     """Charge le modèle spaCy avec gestion des erreurs."""
+    if not SPACY_MODEL:
+        logger.info("SPACY_MODEL vide. Utilisation de la méthode de repli.")
+        return None
     try:
-        return spacy.load('fr_core_news_sm')
-    except OSError:
+        import spacy
+        return spacy.load(SPACY_MODEL, exclude=list(exclude if exclude is not None else _excluded_components()))
+    except (ImportError, OSError):
         logger.warning("Modèle spaCy français non trouvé. Utilisation d'une méthode de repli.")
         return None
 
-nlp = load_spacy_model()
+def get_nlp():
+    """Retourne le pipeline spaCy, chargé paresseusement au premier appel."""
+    global _nlp, _nlp_loaded
+    if not _nlp_loaded:
+        with _nlp_lock:
+            if not _nlp_loaded:
+                rss_before = _current_rss_kb()
+                start = time.perf_counter()
+                _nlp = load_spacy_model()
+                _load_report.update({
+                    'model': SPACY_MODEL if _nlp else None,
+                    'components': list(_nlp.pipe_names) if _nlp else [],
+                    'excluded': _excluded_components(),
+                    'load_seconds': round(time.perf_counter() - start, 4),
+                    'rss_before_kb': rss_before,
+                    'rss_after_kb': _current_rss_kb()
+                })
+                _nlp_loaded = True
+    return _nlp
+
+def nlp_load_report() -> Dict:
+    """Rapport de chargement du modèle (durée, composants, mémoire résidente)."""
+    return {'loaded': _nlp_loaded, **_load_report}
+
+KEYWORD_POS = {'NOUN', 'PROPN', 'ADJ'}
+FALLBACK_STOP_WORDS = {'le', 'la', 'les', 'un', 'une', 'des', 'et', 'ou', 'mais', 'donc',
+                       'car', 'pour', 'dans', 'sur', 'avec', 'sans', 'par'}
+PUNCTUATION_PATTERN = re.compile(r'[^\w\s]')
+
+def _clean_text(text: str) -> str:
+    """Nettoyage basique du texte."""
+    return PUNCTUATION_PATTERN.sub(' ', text.lower())
+
+def _doc_keywords(doc) -> List[str]:
+    """Extrait les noms et adjectifs significatifs d'un Doc spaCy."""
+    return [token.text for token in doc if token.pos_ in KEYWORD_POS
+            and not token.is_stop and len(token.text) > 2]
+
+def _fallback_keywords(text: str) -> List[str]:
+    """Méthode de repli simple basée sur la fréquence des mots."""
+    return [word for word in text.split() if len(word) > 2 and word not in FALLBACK_STOP_WORDS]
+
+def _most_common(keywords: List[str], max_keywords: int) -> List[str]:
+    """Retourne les mots-clés les plus fréquents."""
+    return [word for word, count in Counter(keywords).most_common(max_keywords)]
+
+def _raw_keywords_batch(texts: Sequence[str],
+                        batch_size: Optional[int] = None,
+                        n_process: Optional[int] = None) -> List[List[str]]:
+    """Mots-clés (avec répétitions) de chaque texte, via le cache puis nlp.pipe pour les textes inconnus."""
+    normalized = [' '.join(_clean_text(text or '').split()) for text in texts]
+    keys = [KeywordCache.make_key(text) for text in normalized]
+
+    results: Dict[bytes, List[str]] = {}
+    missing: Dict[bytes, str] = {}
+    for key, text in zip(keys, normalized):
+        if key in results or key in missing:
+            continue
+        cached = _keyword_cache.get(key)
+        if cached is None:
+            missing[key] = text
+        else:
+            results[key] = cached
+
+    if missing:
+        nlp = get_nlp()
+        if nlp:
+            batch_size = batch_size or int(os.getenv('SPACY_BATCH_SIZE', 256))
+            n_process = n_process or int(os.getenv('SPACY_N_PROCESS', 1))
+            # Le coût de démarrage des processus n'est amorti que sur de gros volumes
+            if len(missing) < batch_size * n_process:
+                n_process = 1
+            with timer('spacy', 'pipe'):
+                docs = nlp.pipe(missing.values(), batch_size=batch_size, n_process=n_process)
+                extracted = [_doc_keywords(doc) for doc in docs]
+        else:
+            with timer('spacy', 'fallback'):
+                extracted = [_fallback_keywords(text) for text in missing.values()]
+        for key, keywords in zip(missing, extracted):
+            _keyword_cache.set(key, keywords)
+            results[key] = keywords
+
+    return [results[key] for key in keys]
 
 def extract_keywords(text: str, max_keywords: int = 10) -> List[str]:
     """Extrait les mots-clés d'un texte."""
     try:
-        # Nettoyage basique du texte
-        text = text.lower()
-        text = re.sub(r'[^\w\s]', ' ', text)
-        
-        if nlp:
-            # Utiliser spaCy si disponible
-            doc = nlp(text)
-            # Extraire les noms et adjectifs significatifs
-            keywords = [token.text for token in doc if token.pos_ in ['NOUN', 'PROPN', 'ADJ'] 
-                       and not token.is_stop and len(token.text) > 2]
-        else:
-            # Méthode de repli simple basée sur la fréquence des mots
-            words = text.split()
-            # Filtrer les mots courts et les mots vides courants
-            stop_words = {'le', 'la', 'les', 'un', 'une', 'des', 'et', 'ou', 'mais', 'donc',
-                         'car', 'pour', 'dans', 'sur', 'avec', 'sans', 'par'}
-            keywords = [word for word in words if len(word) > 2 and word not in stop_words]
-        
-        # Compter les occurrences
-        keyword_counts = Counter(keywords)
-        
-        # Retourner les mots-clés les plus fréquents
-        return [word for word, count in keyword_counts.most_common(max_keywords)]
+        return _most_common(_raw_keywords_batch([text])[0], max_keywords)
         
     except Exception as e:
         logger.error(f"Erreur lors de l'extraction des mots-clés: {e}")
         return []
 
+def extract_keywords_batch(texts: Sequence[str],
+                           max_keywords: int = 10,
+                           batch_size: Optional[int] = None,
+                           n_process: Optional[int] = None) -> List[List[str]]:
+    """Extrait les mots-clés de plusieurs textes en un seul passage nlp.pipe.
+
+    `batch_size` et `n_process` sont configurables via SPACY_BATCH_SIZE et
+    SPACY_N_PROCESS ; n_process > 1 répartit le traitement sur plusieurs cœurs.
+    Les textes déjà traités sont servis par le cache de mots-clés.
+    """
+    try:
+        return [
+            _most_common(keywords, max_keywords)
+            for keywords in _raw_keywords_batch(texts, batch_size, n_process)
+        ]
+    except Exception as e:
+        logger.error(f"Erreur lors de l'extraction des mots-clés par lot: {e}")
+        return [[] for _ in texts]
+
+def count_keywords(texts: Sequence[str]) -> Counter:
+    """Compte les occurrences de mots-clés sur un ensemble de textes."""
+    counts = Counter()
+    try:
+        for keywords in _raw_keywords_batch(texts):
+            counts.update(keywords)
+    except Exception as e:
+        logger.error(f"Erreur lors du comptage des mots-clés: {e}")
+    return counts
+
+def keyword_cache_stats() -> Dict:
+    """Statistiques du cache de mots-clés (taille, hits, évictions)."""
+    return _keyword_cache.stats()
+
 def analyze_sentiment(text: str) -> str:
     """Analyse le sentiment d'un texte."""
     try:
-        if not nlp:
+        if not get_nlp():
             return "neutre"
             
-        doc = nlp(text)
         # Analyse simple basée sur des mots positifs/négatifs
         positive_words = {'super', 'génial', 'excellent', 'incroyable', 'parfait', 'merci'}
         negative_words = {'mauvais', 'nul', 'terrible', 'horrible', 'problème', 'bug'}
@@ -70,4 +198,11 @@ def analyze_sentiment(text: str) -> str:
         
     except Exception as e:
         logger.error(f"Erreur lors de l'analyse du sentiment: {e}")
-        return "neutre"
\ No newline at end of file
+        return "neutre"
+
+if __name__ == "__main__":
+    import json
+
+    # python -m src.utils.text_processor : rapport de chargement du modèle
+    get_nlp()
+    print(json.dumps(nlp_load_report(), indent=2))
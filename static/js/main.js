@@ -55,10 +55,10 @@ document.addEventListener('DOMContentLoaded', function() {
             
             // Encoder l'URL pour la requête GET
             const encodedUrl = encodeURIComponent(channelUrl);
-            const response = await fetch(`/api/analyze-channel?channel_url=${encodedUrl}`, {
+            const response = await fetch(`/api/analyze-channel/stream?channel_url=${encodedUrl}`, {
                 method: 'GET',
                 headers: {
-                    'Accept': 'application/json'
+                    'Accept': 'application/x-ndjson'
                 }
             });
 
@@ -67,154 +67,242 @@ document.addEventListener('DOMContentLoaded', function() {
                 throw new Error(errorData.detail || 'Erreur lors de l\'analyse de la chaîne');
             }
 
-            const data = await response.json();
+            // Les sections arrivent une par ligne (NDJSON) dès qu'elles sont prêtes
+            const sections = displayResults();
             hideLoading();
-            displayResults(data);
+            let completed = false;
+            await readStream(response, (event, data) => {
+                if (event === 'error') {
+                    throw new Error(data.detail || 'Erreur lors de l\'analyse de la chaîne');
+                }
+                if (event === 'done') {
+                    completed = true;
+                }
+                sections.render(event, data);
+            });
+            // Flux coupé avant l'événement final : les sections reçues restent affichées
+            if (!completed) {
+                sections.fail('Connexion interrompue avant la fin de l\'analyse');
+            }
         } catch (error) {
             console.error('Erreur:', error);
             showError(error.message);
         }
     }
 
-    // Fonction pour afficher les résultats
-    function displayResults(data) {
+    // Lit une réponse NDJSON et appelle onEvent pour chaque ligne complète
+    async function readStream(response, onEvent) {
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+
+        while (true) {
+            const { value, done } = await reader.read();
+            if (done) break;
+            buffer += decoder.decode(value, { stream: true });
+
+            const lines = buffer.split('\n');
+            buffer = lines.pop();
+            for (const line of lines) {
+                if (line.trim()) {
+                    const { event, data } = JSON.parse(line);
+                    onEvent(event, data);
+                }
+            }
+        }
+        if (buffer.trim()) {
+            const { event, data } = JSON.parse(buffer);
+            onEvent(event, data);
+        }
+    }
+
+    // Fonction pour afficher les résultats : le squelette est affiché tout de suite,
+    // chaque section est remplie à l'arrivée de ses données
+    function displayResults() {
         const formatNumber = (num) => num?.toLocaleString() || '0';
         const calculateEngagementRate = (likes, views) => ((likes / views) * 100).toFixed(2);
+        const pending = `
+            <div class="section-pending">
+                <i class="fas fa-circle-notch fa-spin"></i> Chargement...
+            </div>
+        `;
 
-        const html = `
+        resultsContainer.innerHTML = `
             <div class="results-container">
                 <!-- Vue d'ensemble de la chaîne -->
-                <div class="channel-card">
-                    <div class="channel-header">
-                        <h2 class="channel-title">${data.channel_info?.title || 'Chaîne YouTube'}</h2>
-                    </div>
-                    <div class="channel-stats">
-                        <div class="stat-box">
-                            <div class="stat-value">${formatNumber(data.channel_info?.subscriber_count)}</div>
-                            <div class="stat-label">Abonnés</div>
-                        </div>
-                        <div class="stat-box">
-                            <div class="stat-value">${formatNumber(data.channel_info?.video_count)}</div>
-                            <div class="stat-label">Vidéos</div>
-                        </div>
-                        <div class="stat-box">
-                            <div class="stat-value">${formatNumber(data.channel_info?.view_count)}</div>
-                            <div class="stat-label">Vues totales</div>
-                        </div>
-                    </div>
-                </div>
+                <div class="channel-card" data-section="channel_info">${pending}</div>
 
                 <!-- Métriques de performance -->
                 <div class="metrics-grid">
                     <div class="metric-card">
                         <h3><i class="fas fa-chart-line"></i> Performance Moyenne</h3>
-                        <div class="metric-content">
-                            <div class="metric-item">
-                                <div class="metric-item-value">${formatNumber(data.analysis?.performance_metrics?.average_views)}</div>
-                                <div class="metric-item-label">Vues</div>
-                            </div>
-                            <div class="metric-item">
-                                <div class="metric-item-value">${formatNumber(data.analysis?.performance_metrics?.average_likes)}</div>
-                                <div class="metric-item-label">Likes</div>
-                            </div>
-                            <div class="metric-item">
-                                <div class="metric-item-value">${formatNumber(data.analysis?.performance_metrics?.average_comments)}</div>
-                                <div class="metric-item-label">Commentaires</div>
-                            </div>
-                        </div>
+                        <div class="metric-content" data-section="average_performance">${pending}</div>
                     </div>
                     <div class="metric-card">
                         <h3><i class="fas fa-clock"></i> Timing Optimal</h3>
-                        <div class="metric-content">
-                            <div class="metric-item">
-                            <div class="metric-item-value">${data.analysis?.temporal_patterns?.best_days || 'N/A'}</div>
-                            <div class="metric-item-label">Meilleur jour</div>
-                            </div>
-                            <div class="metric-item">
-                            <div class="metric-item-value">${data.analysis?.temporal_patterns?.best_hours || 'N/A'}h</div>
-                            <div class="metric-item-label">Meilleure heure</div>
-                            </div>
-                            <div class="metric-item">
-                            <div class="metric-item-value">${data.analysis?.temporal_patterns?.posting_frequency || 'N/A'}</div>
-                            <div class="metric-item-label">Fréquence</div>
-                            </div>
-                        </div>
+                        <div class="metric-content" data-section="temporal_patterns">${pending}</div>
                     </div>
                 </div>
 
                 <!-- Meilleures vidéos -->
                 <div class="videos-section">
                     <h3><i class="fas fa-trophy"></i> Vidéos les Plus Performantes</h3>
-                    <div class="videos-grid">
-                        ${data.analysis?.performance_metrics?.top_performing_videos?.map((video, index) => `
-                            <div class="video-card">
-                                <span class="video-rank">#${index + 1}</span>
-                                <h4 class="video-title">${video.title}</h4>
-                                <div class="video-metrics">
-                                    <div class="video-metric">
-                                        <div class="video-metric-value">${formatNumber(video.view_count)}</div>
-                                        <div class="video-metric-label">Vues</div>
-                                    </div>
-                                    <div class="video-metric">
-                                        <div class="video-metric-value">${formatNumber(video.like_count)}</div>
-                                        <div class="video-metric-label">Likes</div>
-                                    </div>
-                                    <div class="video-metric">
-                                        <div class="video-metric-value">${calculateEngagementRate(video.like_count, video.view_count)}%</div>
-                                        <div class="video-metric-label">Engagement</div>
-                                    </div>
-                                </div>
-                            </div>
-                        `).join('')}
-                    </div>
+                    <div class="videos-grid" data-section="top_videos">${pending}</div>
                 </div>
 
                 <!-- Mots-clés -->
                 <div class="keywords-section">
                     <h3><i class="fas fa-tags"></i> Mots-clés Populaires</h3>
-                    <div class="keywords-cloud">
-                        ${data.analysis?.content_patterns?.common_keywords?.map(keyword => 
-                            `<span class="keyword-tag">${keyword}</span>`
-                        ).join('')}
-                    </div>
+                    <div class="keywords-cloud" data-section="content_patterns">${pending}</div>
+                </div>
+
+                <!-- Opportunités de contenu -->
+                <div class="keywords-section">
+                    <h3><i class="fas fa-search-plus"></i> Opportunités de Contenu</h3>
+                    <div class="keywords-cloud" data-section="content_gaps">${pending}</div>
                 </div>
 
                 <!-- Suggestions de l'IA -->
                 <div class="ai-suggestions-section">
                     <h3><i class="fas fa-lightbulb"></i> Suggestions de Vidéos</h3>
-                    <div class="suggestions-grid">
-                        ${data.ai_suggestions?.map((suggestion, index) => `
-                            <div class="suggestion-card">
-                                <div class="suggestion-header">
-                                    <span class="suggestion-number">#${index + 1}</span>
-                                    <div class="suggestion-potential">
-                                        <i class="fas fa-chart-line"></i>
-                                        ${suggestion.estimated_potential}
-                                    </div>
-                                </div>
-                                <h4 class="suggestion-title">${suggestion.title}</h4>
-                                <p class="suggestion-description">${suggestion.description}</p>
-                                <div class="suggestion-topic">
-                                    <i class="fas fa-bullseye"></i>
-                                    ${suggestion.topic}
-                                </div>
-                                <div class="suggestion-key-points">
-                                    <h5><i class="fas fa-check-circle"></i> Points Clés:</h5>
-                                    <ul>
-                                        ${suggestion.key_points.map(point => 
-                                            `<li>${point}</li>`
-                                        ).join('')}
-                                    </ul>
-                                </div>
-                            </div>
-                        `).join('')}
-                    </div>
+                    <div class="suggestions-grid" data-section="ai_suggestions">${pending}</div>
                 </div>
             </div>
         `;
 
+        const fill = (name, html) => {
+            const element = resultsContainer.querySelector(`[data-section="${name}"]`);
+            if (element) element.innerHTML = html;
+        };
 
-        resultsContainer.innerHTML = html;
+        const renderers = {
+            channel_info: (channelInfo) => fill('channel_info', `
+                <div class="channel-header">
+                    <h2 class="channel-title">${channelInfo?.title || 'Chaîne YouTube'}</h2>
+                </div>
+                <div class="channel-stats">
+                    <div class="stat-box">
+                        <div class="stat-value">${formatNumber(channelInfo?.subscriber_count)}</div>
+                        <div class="stat-label">Abonnés</div>
+                    </div>
+                    <div class="stat-box">
+                        <div class="stat-value">${formatNumber(channelInfo?.video_count)}</div>
+                        <div class="stat-label">Vidéos</div>
+                    </div>
+                    <div class="stat-box">
+                        <div class="stat-value">${formatNumber(channelInfo?.view_count)}</div>
+                        <div class="stat-label">Vues totales</div>
+                    </div>
+                </div>
+            `),
+
+            performance_metrics: (metrics) => {
+                fill('average_performance', `
+                    <div class="metric-item">
+                        <div class="metric-item-value">${formatNumber(metrics?.average_views)}</div>
+                        <div class="metric-item-label">Vues</div>
+                    </div>
+                    <div class="metric-item">
+                        <div class="metric-item-value">${formatNumber(metrics?.average_likes)}</div>
+                        <div class="metric-item-label">Likes</div>
+                    </div>
+                    <div class="metric-item">
+                        <div class="metric-item-value">${formatNumber(metrics?.average_comments)}</div>
+                        <div class="metric-item-label">Commentaires</div>
+                    </div>
+                `);
+                fill('top_videos', (metrics?.top_performing_videos || []).map((video, index) => `
+                    <div class="video-card">
+                        <span class="video-rank">#${index + 1}</span>
+                        <h4 class="video-title">${video.title}</h4>
+                        <div class="video-metrics">
+                            <div class="video-metric">
+                                <div class="video-metric-value">${formatNumber(video.view_count)}</div>
+                                <div class="video-metric-label">Vues</div>
+                            </div>
+                            <div class="video-metric">
+                                <div class="video-metric-value">${formatNumber(video.like_count)}</div>
+                                <div class="video-metric-label">Likes</div>
+                            </div>
+                            <div class="video-metric">
+                                <div class="video-metric-value">${calculateEngagementRate(video.like_count, video.view_count)}%</div>
+                                <div class="video-metric-label">Engagement</div>
+                            </div>
+                        </div>
+                    </div>
+                `).join(''));
+            },
+
+            temporal_patterns: (patterns) => fill('temporal_patterns', `
+                <div class="metric-item">
+                    <div class="metric-item-value">${patterns?.best_days || 'N/A'}</div>
+                    <div class="metric-item-label">Meilleur jour</div>
+                </div>
+                <div class="metric-item">
+                    <div class="metric-item-value">${patterns?.best_hours || 'N/A'}h</div>
+                    <div class="metric-item-label">Meilleure heure</div>
+                </div>
+                <div class="metric-item">
+                    <div class="metric-item-value">${patterns?.posting_frequency || 'N/A'}</div>
+                    <div class="metric-item-label">Fréquence</div>
+                </div>
+            `),
+
+            content_patterns: (patterns) => fill('content_patterns',
+                (patterns?.common_keywords || []).map(keyword =>
+                    `<span class="keyword-tag">${keyword}</span>`
+                ).join('')
+            ),
+
+            content_gaps: (gaps) => fill('content_gaps',
+                (gaps || []).map(gap =>
+                    `<span class="keyword-tag" title="Potentiel: ${gap.potential} · Compétition: ${gap.competition}">${gap.topic}</span>`
+                ).join('')
+            ),
+
+            ai_suggestions: (suggestions) => fill('ai_suggestions', (suggestions || []).map((suggestion, index) => `
+                <div class="suggestion-card">
+                    <div class="suggestion-header">
+                        <span class="suggestion-number">#${index + 1}</span>
+                        <div class="suggestion-potential">
+                            <i class="fas fa-chart-line"></i>
+                            ${suggestion.estimated_potential}
+                        </div>
+                    </div>
+                    <h4 class="suggestion-title">${suggestion.title}</h4>
+                    <p class="suggestion-description">${suggestion.description}</p>
+                    <div class="suggestion-topic">
+                        <i class="fas fa-bullseye"></i>
+                        ${suggestion.topic}
+                    </div>
+                    <div class="suggestion-key-points">
+                        <h5><i class="fas fa-check-circle"></i> Points Clés:</h5>
+                        <ul>
+                            ${suggestion.key_points.map(point => 
+                                `<li>${point}</li>`
+                            ).join('')}
+                        </ul>
+                    </div>
+                </div>
+            `).join(''))
+        };
+
+        return {
+            render(event, data) {
+                const renderer = renderers[event];
+                if (renderer) renderer(data);
+            },
+            // Remplace les sections encore en attente par un message d'erreur
+            fail(message) {
+                resultsContainer.querySelectorAll('.section-pending').forEach((element) => {
+                    element.outerHTML = `
+                        <div class="section-pending section-failed">
+                            <i class="fas fa-exclamation-circle"></i> ${message}
+                        </div>
+                    `;
+                });
+            }
+        };
     }
 
     // Activer/désactiver le bouton en fonction de l'input
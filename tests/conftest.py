@@ -0,0 +1,9 @@
+import os
+import sys
+
+# Tests hors ligne : méthode de repli de text_processor plutôt qu'un modèle spaCy
+os.environ.setdefault('SPACY_MODEL', '')
+# Aucun cache ni index persistant écrit dans le dépôt pendant les tests
+os.environ.setdefault('YOUTUBE_QUOTA_PATH', '')
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
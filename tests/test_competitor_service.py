@@ -0,0 +1,117 @@
+import asyncio
+
+from src.analyzers.competitor_analyzer import CompetitorAnalyzer, analyze_videos
+from src.scrapers.async_youtube_scraper import AsyncYouTubeScraper
+from src.scrapers.channel_resolver import ChannelResolver
+from src.scrapers.quota_scheduler import QuotaScheduler
+from src.services.competitor_service import CompetitorComparisonService
+from src.services.memory_storage_service import InMemoryStorageService
+
+VIDEOS_PER_CHANNEL = 3
+
+
+class FakeResponse:
+    status = 200
+
+    def __init__(self, data: dict):
+        self.data = data
+
+    async def json(self):
+        return self.data
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+
+class FakeYouTubeSession:
+    """Simule l'API YouTube Data : chaque @handle existe et publie quelques vidéos."""
+
+    def __init__(self):
+        self.calls = []
+
+    def get(self, url: str, params: dict, headers: dict):
+        resource = url.rsplit('/', 1)[-1]
+        self.calls.append(resource)
+        return FakeResponse(getattr(self, resource)(params))
+
+    def channels(self, params: dict) -> dict:
+        if 'forHandle' in params:
+            return {'items': [{'id': f"UC{params['forHandle'].lstrip('@')}"}]}
+        channel_id = params['id']
+        return {'items': [{
+            'id': channel_id,
+            'snippet': {'title': channel_id, 'description': ''},
+            'statistics': {'subscriberCount': '100', 'videoCount': '3', 'viewCount': '3000'},
+            'contentDetails': {'relatedPlaylists': {'uploads': f"UU{channel_id}"}}
+        }]}
+
+    def playlistItems(self, params: dict) -> dict:
+        return {'items': [
+            {'contentDetails': {'videoId': f"{params['playlistId']}-{index}"}}
+            for index in range(min(VIDEOS_PER_CHANNEL, params['maxResults']))
+        ]}
+
+    def videos(self, params: dict) -> dict:
+        return {'items': [
+            {
+                'id': video_id,
+                'snippet': {
+                    'title': f"Recette de cuisine {video_id}",
+                    'description': '',
+                    'publishedAt': f"2024-03-0{index + 1}T10:00:00Z"
+                },
+                'statistics': {'viewCount': '1000', 'likeCount': '50', 'commentCount': '5'}
+            }
+            for index, video_id in enumerate(params['id'].split(','))
+        ]}
+
+    def search(self, params: dict) -> dict:
+        return {'items': []}
+
+
+class InlineCompetitorAnalyzer(CompetitorAnalyzer):
+    """Analyse dans le processus courant, pour des tests sans pool de processus."""
+
+    async def analyze_channels(self, videos_by_channel):
+        return {channel_id: analyze_videos(videos) for channel_id, videos in videos_by_channel.items()}
+
+
+def make_service(session: FakeYouTubeSession, **kwargs) -> CompetitorComparisonService:
+    scraper = AsyncYouTubeScraper(
+        resolver=ChannelResolver(':memory:'),
+        session=session,
+        scheduler=QuotaScheduler(keys=['test-key'])
+    )
+    return CompetitorComparisonService(
+        scraper, InMemoryStorageService(snapshot_path=''), InlineCompetitorAnalyzer(), **kwargs
+    )
+
+
+def test_twenty_channels_fit_in_default_budget(monkeypatch):
+    monkeypatch.setenv('YOUTUBE_CACHE_ENABLED', 'false')
+    session = FakeYouTubeSession()
+    service = make_service(session)
+    references = [(f"chaine{index}", 'handle') for index in range(20)]
+
+    result = asyncio.run(service.compare_channels(references))
+
+    assert [channel['status'] for channel in result['channels']] == ['ok'] * 20
+    assert 'search' not in session.calls
+    assert result['quota']['budget'] == 1000
+    assert result['quota']['spent_units'] == len(session.calls)
+
+
+def test_channels_beyond_budget_are_skipped(monkeypatch):
+    monkeypatch.setenv('YOUTUBE_CACHE_ENABLED', 'false')
+    session = FakeYouTubeSession()
+    service = make_service(session, max_concurrency=1)
+    references = [(f"chaine{index}", 'handle') for index in range(3)]
+
+    # Une chaîne inconnue coûte 5 unités sans cache : la deuxième ne tient plus dans le reste
+    result = asyncio.run(service.compare_channels(references, quota_budget=8))
+
+    assert [channel['status'] for channel in result['channels']] == ['ok', 'skipped', 'skipped']
+    assert result['quota']['spent_units'] == 5
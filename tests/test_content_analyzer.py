@@ -0,0 +1,55 @@
+import json
+import math
+
+from src.analyzers.content_analyzer import ContentAnalyzer
+from src.services.memory_storage_service import InMemoryStorageService
+
+
+def api_video(video_id: str, title: str, published_at: str) -> dict:
+    """Vidéo telle que renvoyée par le client YouTube : seulement 'id'."""
+    return {
+        'id': video_id,
+        'title': title,
+        'description': '',
+        'published_at': published_at,
+        'view_count': 1000,
+        'like_count': 50,
+        'comment_count': 5
+    }
+
+
+def stored_video(video_id: str, title: str, published_at: str) -> dict:
+    """Vidéo relue depuis le stockage : 'id' et 'video_id'."""
+    return {**api_video(video_id, title, published_at), 'video_id': video_id, 'channel_id': 'UCchannel'}
+
+
+def test_video_features_keep_ids_of_new_and_stored_videos():
+    videos = [
+        api_video('vNEW', 'Nouvelle recette de gâteau', '2024-03-02T10:00:00Z'),
+        stored_video('vOLD1', 'Recette facile de crêpes', '2024-02-20T10:00:00Z'),
+        stored_video('vOLD2', 'Les erreurs à éviter en cuisine', '2024-02-10T10:00:00Z'),
+    ]
+
+    _, features = ContentAnalyzer().analyze_channel_and_videos(videos)
+
+    assert [feature['video_id'] for feature in features] == ['vNEW', 'vOLD1', 'vOLD2']
+
+
+def test_indexed_analysis_of_new_video_has_no_nan():
+    videos = [
+        api_video('vNEW', 'Nouvelle recette de gâteau', '2024-03-02T10:00:00Z'),
+        stored_video('vOLD1', 'Recette facile de crêpes', '2024-02-20T10:00:00Z'),
+    ]
+    _, features = ContentAnalyzer().analyze_channel_and_videos(videos)
+
+    storage = InMemoryStorageService(snapshot_path='')
+    storage.bulk_index_videos([
+        {**video, 'channel_id': 'UCchannel', 'analysis': feature}
+        for video, feature in zip(videos, features)
+    ])
+
+    document = next(video for video in storage.get_channel_videos('UCchannel') if video['video_id'] == 'vNEW')
+    assert document['analysis']['video_id'] == 'vNEW'
+    # Le snapshot (comme le corps bulk d'Elasticsearch) doit rester du JSON valide
+    json.dumps(document, allow_nan=False)
+    assert not any(isinstance(value, float) and math.isnan(value) for value in document['analysis'].values())
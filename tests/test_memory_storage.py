@@ -0,0 +1,27 @@
+from src.services.memory_storage_service import InMemoryStorageService
+
+
+def test_topic_pages_cover_every_match_once():
+    storage = InMemoryStorageService(snapshot_path='')
+    storage.bulk_index_videos([
+        {
+            'video_id': f"v{index}",
+            'channel_id': 'UCchannel',
+            'title': f"Recette facile numéro {index}",
+            'description': '',
+            'view_count': 100 * (index + 1),
+            'engagement_rate': 0.05,
+            'published_at': '2024-03-01T10:00:00Z'
+        }
+        for index in range(12)
+    ])
+
+    seen = []
+    page = storage.search_videos_by_topic_page('recette', size=5)
+    seen += [video['video_id'] for video in page['videos']]
+    while page['cursor']:
+        page = storage.search_videos_by_topic_page('recette', size=5, cursor=page['cursor'])
+        seen += [video['video_id'] for video in page['videos']]
+
+    assert sorted(seen) == sorted(f"v{index}" for index in range(12))
+    assert seen[:5] == [video['video_id'] for video in storage.search_videos_by_topic('recette', size=5)]
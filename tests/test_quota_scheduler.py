@@ -0,0 +1,41 @@
+import asyncio
+import time
+
+import pytest
+
+from src.scrapers.quota_scheduler import BACKGROUND, INTERACTIVE, QuotaExhausted, QuotaScheduler
+
+
+def make_scheduler(burst: int, **kwargs) -> QuotaScheduler:
+    # Remplissage rapide (10 jetons/s) : toute attente utile tient largement dans max_wait
+    return QuotaScheduler(
+        keys=['test-key'],
+        daily_quota=burst + 10 * 86400,
+        burst=burst,
+        max_wait={INTERACTIVE: 30, BACKGROUND: 30},
+        **kwargs
+    )
+
+
+def test_call_larger_than_burst_is_rejected_without_waiting():
+    scheduler = make_scheduler(burst=50, interactive_reserve=0)
+
+    started = time.monotonic()
+    with pytest.raises(QuotaExhausted):
+        asyncio.run(scheduler.acquire('search.list'))
+
+    assert time.monotonic() - started < 1
+    assert scheduler.waits == 0
+    assert scheduler.rejected == 1
+
+
+def test_background_call_cannot_dip_into_interactive_reserve():
+    scheduler = make_scheduler(burst=120, interactive_reserve=30)
+
+    started = time.monotonic()
+    with pytest.raises(QuotaExhausted):
+        asyncio.run(scheduler.acquire('search.list', priority=BACKGROUND))
+    assert time.monotonic() - started < 1
+
+    # La même requête reste servie immédiatement en file interactive
+    assert asyncio.run(scheduler.acquire('search.list')) == 'test-key'